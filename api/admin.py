@@ -1,12 +1,19 @@
 from django.contrib import admin
+from django.db.models import Q
+
+from . import search
 from .models import (
     User,
     Meeting,
+    MeetingException,
     VideoRoom,
     Document,
     DocumentSignature,
+    DocumentVersion,
     Wallet,
     Transaction,
+    LedgerEntry,
+    RevokedToken,
 )
 
 # -------------------------
@@ -18,15 +25,29 @@ class UserAdmin(admin.ModelAdmin):
     list_filter = ("role", "is_active", "date_joined")
     search_fields = ("username", "email")
 
+    def get_search_results(self, request, queryset, search_term):
+        """Words go to the discovery index (api.search) rather than icontains scans; emails match exactly."""
+        words = search.words(search_term)
+        if not words:
+            return super().get_search_results(request, queryset, search_term)
+        ids = search.backend().search(words, limit=None)
+        return queryset.filter(Q(pk__in=ids) | Q(email__iexact=search_term.strip())), False
+
 
 # -------------------------
 # Meeting & VideoRoom
 # -------------------------
+class MeetingExceptionInline(admin.TabularInline):
+    model = MeetingException
+    extra = 0
+
+
 @admin.register(Meeting)
 class MeetingAdmin(admin.ModelAdmin):
-    list_display = ("id", "title", "organizer", "start_time", "end_time", "status")
-    list_filter = ("status", "start_time")
+    list_display = ("id", "title", "organizer", "start_time", "end_time", "recurrence", "status")
+    list_filter = ("status", "recurrence", "start_time")
     search_fields = ("title", "organizer__username")
+    inlines = (MeetingExceptionInline,)
 
 
 @admin.register(VideoRoom)
@@ -45,6 +66,16 @@ class DocumentAdmin(admin.ModelAdmin):
     search_fields = ("title", "owner__username")
 
 
+@admin.register(DocumentVersion)
+class DocumentVersionAdmin(admin.ModelAdmin):
+    list_display = ("id", "document", "number", "kind", "size", "stored_size", "created_at")
+    list_filter = ("kind",)
+    search_fields = ("document__title",)
+    raw_id_fields = ("document", "base", "created_by")
+    # api.versions owns the chain; an edited row would stop rebuilding
+    readonly_fields = ("kind", "base", "blob", "sha256", "size", "stored_size")
+
+
 @admin.register(DocumentSignature)
 class DocumentSignatureAdmin(admin.ModelAdmin):
     list_display = ("id", "document", "signed_by", "signed_at")
@@ -59,6 +90,7 @@ class DocumentSignatureAdmin(admin.ModelAdmin):
 class WalletAdmin(admin.ModelAdmin):
     list_display = ("id", "user", "balance")
     search_fields = ("user__username",)
+    readonly_fields = ("balance",)   # only api.ledger moves money
 
 
 @admin.register(Transaction)
@@ -66,3 +98,32 @@ class TransactionAdmin(admin.ModelAdmin):
     list_display = ("id", "transaction_type", "amount", "status", "sender", "receiver", "created_at")
     list_filter = ("transaction_type", "status", "created_at")
     search_fields = ("sender__username", "receiver__username")
+
+
+@admin.register(LedgerEntry)
+class LedgerEntryAdmin(admin.ModelAdmin):
+    list_display = ("id", "wallet", "transaction", "amount", "created_at")
+    list_select_related = ("wallet__user", "transaction")
+    search_fields = ("wallet__user__username",)
+    raw_id_fields = ("wallet", "transaction")
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def has_delete_permission(self, request, obj=None):
+        return False
+
+
+# -------------------------
+# Auth tokens
+# -------------------------
+@admin.register(RevokedToken)
+class RevokedTokenAdmin(admin.ModelAdmin):
+    list_display = ("jti", "revoked_at", "expires_at")
+    search_fields = ("jti",)
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
@@ -0,0 +1,188 @@
+"""
+Async-native versions of the hottest endpoints, mounted under /api/async/.
+
+Under daphne every DRF view is a sync view: Django hands the whole request
+to its one thread-sensitive executor, so a slow request holds that thread
+for all of its Python work, not just its queries. These are plain
+`async def` Django views that run on the event loop and touch the database
+only through the async ORM. Password hashing, the one CPU-heavy step, is
+awaited on api.credentials' bounded pool, where hashlib runs without the GIL.
+
+Responses are byte-for-byte those of the DRF routes: same JSONRenderer,
+same error bodies, and user/wallet dicts built the way FastReadSerializer
+builds them (a ModelSerializer rebuilds its fields on every call, which
+costs more than the query). Only JWT bearer auth is supported; session
+auth and the browsable API stay on the sync routes.
+"""
+import functools
+import json
+from decimal import Decimal
+
+from asgiref.sync import sync_to_async
+from django.contrib.auth import get_user_model
+from django.db import IntegrityError, transaction
+from django.http import HttpResponse
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import require_http_methods
+from rest_framework.exceptions import APIException, AuthenticationFailed, NotAuthenticated, ParseError
+from rest_framework.renderers import JSONRenderer
+from rest_framework_simplejwt.exceptions import InvalidToken
+from rest_framework_simplejwt.settings import api_settings as jwt_settings
+
+from . import credentials
+from .authentication import CachedJWTAuthentication, cache_key, tokens_for, user_cache
+from .fieldsets import Fieldset
+from .models import Document, DocumentSignature, Wallet
+from .pagination import MeetingPagination
+from .querysets import meeting_queryset
+from .serializers import UserSerializer, FastMeetingSerializer, _decimal_converter
+
+User = get_user_model()
+
+renderer = JSONRenderer()
+jwt = CachedJWTAuthentication()
+balance_string = _decimal_converter(Wallet._meta.get_field("balance"))
+
+
+def render(data, status=200):
+    return HttpResponse(renderer.render(data), status=status, content_type="application/json")
+
+
+def user_data(user):
+    """UserSerializer(user).data: every field is a plain column."""
+    return {name: getattr(user, name) for name in UserSerializer.Meta.fields}
+
+
+def error_response(exc):
+    """What DRF's exception handler returns for `exc`."""
+    data = exc.detail if isinstance(exc.detail, (list, dict)) else {"detail": exc.detail}
+    response = render(data, exc.status_code)
+    if isinstance(exc, (NotAuthenticated, AuthenticationFailed)):
+        response["WWW-Authenticate"] = jwt.authenticate_header(None)
+    if getattr(exc, "wait", None):
+        response["Retry-After"] = str(exc.wait)
+    return response
+
+
+async def authenticate(request, select_related=()):
+    """
+    The user of the request's bearer token, None without one
+    (CachedJWTAuthentication on the async ORM, sharing its user cache).
+    `select_related` JOINs the user's one-to-one rows into the same query
+    instead; such users are not cached.
+    """
+    header = jwt.get_header(request)
+    raw = None if header is None else jwt.get_raw_token(header)
+    if raw is None:
+        return None
+    token = jwt.get_validated_token(raw)
+    if jwt_settings.USER_ID_CLAIM not in token:
+        raise InvalidToken("Token contained no recognizable user identification")
+    if not select_related and (user := user_cache().get(cache_key(token))) is not None:
+        return user
+    users = User.objects.select_related(*select_related) if select_related else User.objects
+    user = await users.filter(**{jwt_settings.USER_ID_FIELD: token[jwt_settings.USER_ID_CLAIM]}).afirst()
+    if user is None:
+        raise AuthenticationFailed("User not found", code="user_not_found")
+    if jwt_settings.CHECK_USER_IS_ACTIVE and not user.is_active:
+        raise AuthenticationFailed("User is inactive", code="user_inactive")
+    if not select_related:
+        user_cache().put(cache_key(token), user)
+    return user
+
+
+def endpoint(*methods, authenticated=True, select_related=()):
+    """
+    Decorator for the views below: method check, no CSRF (bearer auth, no
+    cookies), `request.user` from the JWT and APIExceptions rendered the
+    way DRF renders them.
+    """
+    def decorate(view):
+        @csrf_exempt
+        @require_http_methods(methods)
+        @functools.wraps(view)
+        async def wrapper(request, *args, **kwargs):
+            try:
+                if authenticated:
+                    request.user = await authenticate(request, select_related)
+                    if request.user is None:
+                        raise NotAuthenticated()
+                return await view(request, *args, **kwargs)
+            except APIException as exc:
+                return error_response(exc)
+        return wrapper
+    return decorate
+
+
+@endpoint("POST", authenticated=False)
+async def login(request):
+    """POST /api/async/auth/login/ - same contract as LoginView."""
+    try:
+        data = json.loads(request.body or b"{}")
+    except ValueError as exc:
+        raise ParseError(f"JSON parse error - {exc}")
+    if not isinstance(data, dict):
+        raise ParseError("Expected a JSON object.")
+
+    identifier = data.get("username") or data.get("email")
+    password = data.get("password")
+    if not identifier or not password:
+        return render({"non_field_errors": ["Username/email and password are required."]}, 400)
+
+    user = await credentials.aauthenticate(password, username=data.get("username"), email=data.get("email"))
+    if user is not None:
+        return render(tokens_for(user))
+    return render({"non_field_errors": ["Invalid credentials."]}, 400)
+
+
+@endpoint("GET")
+async def profile(request):
+    """GET /api/async/auth/profile/"""
+    return render(user_data(request.user))
+
+
+@endpoint("GET", select_related=("wallet",))
+async def wallet(request):
+    """GET /api/async/wallet/ - zero balance until the first posting, like WalletView. One query."""
+    wallet = getattr(request.user, "wallet", None)
+    return render({
+        "id": wallet and wallet.id,
+        "user": user_data(request.user),
+        "balance": balance_string(wallet.balance if wallet else Decimal("0.00")),
+    })
+
+
+@sync_to_async
+def add_signature(document, user):
+    # Single INSERT in a savepoint; the (document, signed_by) unique constraint
+    # rejects duplicates. Django has no async atomic(), so this one hop runs
+    # on the thread-sensitive executor, which is all acreate() does anyway.
+    with transaction.atomic():
+        DocumentSignature.objects.create(document=document, signed_by=user)
+
+
+@endpoint("POST")
+async def sign_document(request, doc_id):
+    """POST /api/async/documents/<doc_id>/sign/"""
+    document = await Document.objects.filter(id=doc_id).afirst()
+    if document is None:
+        return render({"error": "Document not found"}, 404)
+    try:
+        await add_signature(document, request.user)
+    except IntegrityError:
+        return render({"error": "You already signed this document."}, 400)
+    if document.status != "signed":
+        document.status = "signed"
+        await document.asave(update_fields=["status"])
+    return render({"status": f"Document '{document.title}' signed"})
+
+
+@endpoint("GET", authenticated=False)
+async def meetings(request):
+    """GET /api/async/meetings/ - the MeetingViewSet list: keyset pages, 2 queries."""
+    paginator = MeetingPagination()
+    fieldset = Fieldset.from_request(request)
+    serializer = FastMeetingSerializer(context={"request": request, "fieldset": fieldset})
+    keys = [name.lstrip("-") for name in paginator.ordering]
+    rows = await paginator.apaginate_queryset(serializer.values(meeting_queryset(fieldset), extra=keys), request)
+    return render(paginator.get_paginated_data(await serializer.ato_representation(rows)))
@@ -0,0 +1,141 @@
+"""
+JWT authentication without a user query on every request.
+
+`CachedJWTAuthentication` (the default, see REST_FRAMEWORK in settings)
+validates the token as simplejwt does and takes `request.user` from a
+per-process LRU of user objects, keyed by (user id, token `iat`) so a token
+issued after a change never sees a user cached for an older one. Entries
+live JWT_USER_CACHE_TTL seconds at most and are dropped as soon as the user
+is saved or deleted in this process (api.signals), so profile edits and
+deactivation apply on the next request here and within the TTL in other
+workers. `QuerySet.update()` bypasses signals: only the TTL covers it.
+
+`ClaimsJWTAuthentication` is the opt-in zero-query variant for endpoints
+that use the user only as a key (filters, ownership checks): the user is
+built from the token's claims alone, see `tokens_for`.
+"""
+import copy
+import functools
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import InvalidToken
+from rest_framework_simplejwt.settings import api_settings as jwt_settings
+from rest_framework_simplejwt.tokens import RefreshToken
+
+User = get_user_model()
+
+
+class UserCache:
+    """Thread-safe LRU of user objects with a TTL. `size=0` disables it."""
+
+    def __init__(self, size, ttl):
+        self.size, self.ttl = size, ttl
+        self.entries = OrderedDict()   # (str(user_id), iat) -> (expires_at, user)
+        self.keys = {}                 # str(user_id) -> {(str(user_id), iat), ...}
+        self.lock = threading.Lock()
+        self.hits = self.misses = 0
+
+    def get(self, key):
+        """A private copy of the cached user, or None."""
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None or entry[0] < time.monotonic():
+                if entry is not None:
+                    self.discard(key)
+                self.misses += 1
+                return None
+            self.entries.move_to_end(key)
+            self.hits += 1
+        return copy.copy(entry[1])
+
+    def put(self, key, user):
+        if not self.size:
+            return
+        with self.lock:
+            self.entries[key] = (time.monotonic() + self.ttl, copy.copy(user))
+            self.entries.move_to_end(key)
+            self.keys.setdefault(key[0], set()).add(key)
+            while len(self.entries) > self.size:
+                self.discard(next(iter(self.entries)))
+
+    def invalidate(self, user_id):
+        with self.lock:
+            for key in list(self.keys.get(str(user_id), ())):
+                self.discard(key)
+
+    def discard(self, key):
+        # Caller holds the lock
+        self.entries.pop(key, None)
+        keys = self.keys.get(key[0])
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del self.keys[key[0]]
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+            self.keys.clear()
+
+
+@functools.lru_cache(maxsize=None)
+def user_cache():
+    return UserCache(
+        size=getattr(settings, "JWT_USER_CACHE_SIZE", 10000),
+        ttl=getattr(settings, "JWT_USER_CACHE_TTL", 60),
+    )
+
+
+def cache_key(token):
+    # simplejwt writes the id claim as a string; signals pass the pk
+    return str(token[jwt_settings.USER_ID_CLAIM]), token.get("iat")
+
+
+def tokens_for(user):
+    """Refresh/access pair for `user`, carrying the claims ClaimsJWTAuthentication reads."""
+    refresh = RefreshToken.for_user(user)
+    refresh["username"] = user.get_username()
+    refresh["is_staff"] = user.is_staff
+    return {"refresh": str(refresh), "access": str(refresh.access_token)}
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    def get_user(self, validated_token):
+        if jwt_settings.USER_ID_CLAIM not in validated_token:
+            return super().get_user(validated_token)   # raises InvalidToken
+        cache = user_cache()
+        key = cache_key(validated_token)
+        user = cache.get(key)
+        if user is None:
+            user = super().get_user(validated_token)
+            cache.put(key, user)
+        return user
+
+
+class ClaimsJWTAuthentication(JWTAuthentication):
+    """
+    No query at all: `request.user` is a User holding only the id, username
+    and is_staff from the token. Tokens from before `tokens_for` carry no
+    is_staff claim and so never pass staff checks; a revoked staff flag
+    lasts until the access token expires.
+    """
+
+    def get_user(self, validated_token):
+        if jwt_settings.USER_ID_CLAIM not in validated_token:
+            raise InvalidToken("Token contained no recognizable user identification")
+        id_field = User._meta.get_field(jwt_settings.USER_ID_FIELD)
+        user = User(**{
+            id_field.attname: id_field.to_python(validated_token[jwt_settings.USER_ID_CLAIM]),
+            User.USERNAME_FIELD: validated_token.get("username", ""),
+            "is_staff": bool(validated_token.get("is_staff")),
+            "is_active": True,
+        })
+        # A stored row as far as the ORM is concerned, so filter(user=...) accepts it
+        user._state.adding = False
+        user._state.db = "default"
+        return user
@@ -0,0 +1,139 @@
+"""
+Free/busy and scheduling conflicts for meetings.
+
+A user is busy during every meeting they organize or attend that is not
+canceled. `bookings()` fetches all of that for many users in one query: a
+UNION ALL of organized meetings (index organizer, start_time) and
+attended ones (the participants table's user index, joined to the
+meeting by primary key). The database returns the rows ordered by user
+and start. Recurring series come back as one row each and are expanded
+to their occurrences in the window (api.recurrence), after one more
+query for their exceptions. One linear sweep per user then merges
+overlapping and touching meetings into busy intervals, and a k-way merge
+of those lists gives the slots when everyone is free.
+
+Creating or updating a meeting through MeetingViewSet calls
+`ensure_free()` in the same transaction as the write. Under SQLite's
+IMMEDIATE transactions, two bookings of the same slot cannot both pass;
+the loser gets a 409 naming who is booked in which meeting.
+"""
+import heapq
+from bisect import bisect_left
+
+from rest_framework.exceptions import APIException
+
+from . import recurrence
+from .models import Meeting, MeetingException
+
+
+class SchedulingConflict(APIException):
+    """409 listing who is booked where, as ids (a ValidationError would stringify them)."""
+    status_code = 409
+    default_detail = "Someone in this meeting is already booked at that time."
+    default_code = "conflict"
+
+    def __init__(self, found):
+        super().__init__()
+        self.detail = {"detail": self.detail, "conflicts": found}
+
+
+def exceptions(meeting_ids):
+    """meeting id -> its exceptions as a tuple of recurrence.Change, for recurrence.expand()."""
+    found = {}
+    rows = MeetingException.objects.filter(meeting_id__in=meeting_ids).values_list(
+        "meeting_id", "original_start", "canceled", "start_time", "end_time",
+    )
+    for meeting_id, *change in rows.order_by("meeting_id", "original_start"):
+        found.setdefault(meeting_id, []).append(recurrence.Change(*change))
+    return {meeting_id: tuple(changes) for meeting_id, changes in found.items()}
+
+
+def bookings(user_ids, start, end, exclude=None):
+    """(user id, meeting id, start, end) of every live meeting or occurrence of `user_ids` overlapping [start, end)."""
+    organized = Meeting.objects.filter(
+        recurrence.overlapping(start, end), organizer_id__in=user_ids,
+    ).exclude(status="canceled")
+    attending = Meeting.participants.through.objects.filter(
+        recurrence.overlapping(start, end, "meeting__"), user_id__in=user_ids,
+    ).exclude(meeting__status="canceled")
+    if exclude is not None:
+        organized = organized.exclude(pk=exclude)
+        attending = attending.exclude(meeting_id=exclude)
+    rows = list(organized.values_list("organizer_id", "id", "start_time", "end_time", *recurrence.RULE_FIELDS).union(
+        attending.values_list("user_id", "meeting_id", "meeting__start_time", "meeting__end_time",
+                              *(f"meeting__{name}" for name in recurrence.RULE_FIELDS)), all=True,
+    ).order_by("organizer_id", "start_time"))
+    series = {row[1] for row in rows if row[4]}
+    changes = exceptions(series) if series else {}
+    for user_id, meeting_id, meeting_start, meeting_end, *rule in rows:
+        if not rule[0]:
+            yield user_id, meeting_id, meeting_start, meeting_end
+            continue
+        for _, occurrence_start, occurrence_end in recurrence.expand(
+            recurrence.Rule(meeting_start, meeting_end, *rule), start, end, changes.get(meeting_id, ()),
+        ):
+            yield user_id, meeting_id, occurrence_start, occurrence_end
+
+
+def merge(intervals):
+    """Merge (start, end) pairs sorted by start; overlapping and touching ones join."""
+    merged = []
+    for start, end in intervals:
+        if merged and start <= merged[-1][1]:
+            if end > merged[-1][1]:
+                merged[-1][1] = end
+        else:
+            merged.append([start, end])
+    return merged
+
+
+def busy(user_ids, start, end):
+    """user id -> merged busy [start, end] intervals within the window (every id present)."""
+    rows, result = {}, {user_id: [] for user_id in user_ids}
+    for user_id, _, meeting_start, meeting_end in bookings(user_ids, start, end):
+        rows.setdefault(user_id, []).append((max(meeting_start, start), min(meeting_end, end)))
+    for user_id, intervals in rows.items():
+        result[user_id] = merge(sorted(intervals))   # occurrences of series arrive out of order
+    return result
+
+
+def free(busy_by_user, start, end, duration=None):
+    """Gaps in [start, end] when none of the users is busy, at least `duration` long."""
+    slots, cursor = [], start
+    for busy_start, busy_end in merge(heapq.merge(*busy_by_user.values())):
+        if busy_start > cursor:
+            slots.append([cursor, busy_start])
+        cursor = max(cursor, busy_end)
+    if cursor < end:
+        slots.append([cursor, end])
+    if duration is not None:
+        slots = [slot for slot in slots if slot[1] - slot[0] >= duration]
+    return slots
+
+
+def conflicts(user_ids, start, end, exclude=None, during=None):
+    """
+    {"user", "meeting"} for each user already booked in [start, end), by
+    user. `during`, the sorted (start, end) occurrences of a series within
+    that span, narrows it to bookings overlapping one of them.
+    """
+    if during is not None:
+        during = merge(during)
+        starts = [interval[0] for interval in during]
+    seen, found = set(), []
+    for user_id, meeting_id, booked_start, booked_end in bookings(user_ids, start, end, exclude):
+        if during is not None:
+            i = bisect_left(starts, booked_end) - 1   # the last occurrence starting before this booking ends
+            if i < 0 or during[i][1] <= booked_start:
+                continue
+        if (user_id, meeting_id) not in seen:   # organizers listed as participants too
+            seen.add((user_id, meeting_id))
+            found.append({"user": user_id, "meeting": meeting_id})
+    return found
+
+
+def ensure_free(user_ids, start, end, exclude=None, during=None):
+    """Raise SchedulingConflict if any of `user_ids` is booked in [start, end) (see conflicts())."""
+    found = conflicts(user_ids, start, end, exclude, during)
+    if found:
+        raise SchedulingConflict(found)
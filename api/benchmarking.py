@@ -0,0 +1,107 @@
+"""
+Shared helpers for the `bench_*` management commands.
+
+Every benchmark writes one JSON report so runs can be diffed between
+releases: `{"benchmark": ..., "meta": {...}, "config": {...}, "results": ...}`.
+"""
+import json
+import os
+import platform
+import subprocess
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone as dt_timezone
+
+from django.conf import settings
+from django.db import connection
+
+# Accounts created by `seed_benchmark_data`; `bench_http` logs in as the first.
+SEED_USER_PREFIX = "load_"
+SEED_PASSWORD = "load-test-password"
+
+
+def percentile(values, pct):
+    """Nearest-rank percentile of an unsorted sequence (None when empty)."""
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = max(1, min(len(ordered), round(pct / 100 * len(ordered) + 0.5)))
+    return ordered[rank - 1]
+
+
+def latency_summary(seconds):
+    """p50/p95/p99/max of a list of durations, in milliseconds."""
+    summary = {}
+    for label, pct in (("p50", 50), ("p95", 95), ("p99", 99), ("max", 100)):
+        value = percentile(seconds, pct)
+        summary[label] = None if value is None else round(value * 1000, 3)
+    return summary
+
+
+def git_revision():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=settings.BASE_DIR, capture_output=True, text=True, timeout=5,
+        ).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def report_meta():
+    return {
+        "created_at": datetime.now(dt_timezone.utc).isoformat(),
+        "git": git_revision(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "database": connection.vendor,
+    }
+
+
+def write_report(path, benchmark, config, results):
+    """Write a benchmark report as JSON; returns the payload."""
+    payload = {"benchmark": benchmark, "meta": report_meta(), "config": config, "results": results}
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(path, "w") as fh:
+        json.dump(payload, fh, indent=2)
+    return payload
+
+
+def rss_bytes(pid):
+    """Resident set size of a process (Linux /proc), or None if unavailable."""
+    try:
+        with open(f"/proc/{pid}/status") as fh:
+            for line in fh:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        return None
+    return None
+
+
+class QueryStats:
+    count = 0
+    seconds = 0.0
+
+
+@contextmanager
+def query_stats(conn=connection):
+    """
+    Count queries and their wall time on `conn`. Unlike
+    CaptureQueriesContext this keeps full timer precision (sub-millisecond
+    queries are the norm here) and does not force the debug cursor.
+    """
+    stats = QueryStats()
+
+    def timed(execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            stats.count += 1
+            stats.seconds += time.perf_counter() - start
+
+    with conn.execute_wrapper(timed):
+        yield stats
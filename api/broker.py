@@ -0,0 +1,519 @@
+"""
+Cross-process channel layer for Django Channels.
+
+`BrokerServer` is a small asyncio message broker (run it with
+`python manage.py runbroker`); `BrokerChannelLayer` is the channel layer
+backend every daphne/worker process points at. Consumers in different
+processes or on different hosts see each other's messages, so
+MeetingConsumer can run on N workers.
+
+Wire format: every frame is a 4-byte big-endian length followed by a
+msgpack array `[request_id, op, *args]`; replies are
+`[request_id, status, value]`. Message bodies are packed once by the
+sending client and stored/forwarded by the broker as opaque bytes.
+
+Semantics follow channels' InMemoryChannelLayer:
+- per-channel capacity (`capacity` / `channel_capacity` globs); a full
+  channel raises ChannelFull on send and is skipped by group_send;
+- messages expire after `expiry` seconds; a channel whose message expired
+  is considered dead and removed from all its groups;
+- group memberships expire after `group_expiry` seconds.
+
+With a single broker host group_send is fanned out by the broker in one
+round trip. With several hosts channels and groups are sharded by CRC32;
+group_send fetches the members once and sends one batched `send_many`
+frame per host.
+"""
+import asyncio
+import re
+import struct
+import time
+import uuid
+import weakref
+import zlib
+from collections import deque
+from functools import lru_cache
+
+import msgpack
+from channels.exceptions import ChannelFull
+from channels.layers import BaseChannelLayer
+
+DEFAULT_PORT = 6390
+MAX_FRAME = 16 * 1024 * 1024
+HEADER = struct.Struct("!I")
+
+OK, ERROR, FULL, CANCELLED = "ok", "error", "full", "cancelled"
+NO_REPLY = 0
+
+
+def pack_frame(value):
+    body = msgpack.packb(value, use_bin_type=True)
+    return HEADER.pack(len(body)) + body
+
+
+async def read_frame(reader):
+    (size,) = HEADER.unpack(await reader.readexactly(HEADER.size))
+    if size > MAX_FRAME:
+        raise ConnectionError(f"Frame of {size} bytes exceeds {MAX_FRAME}")
+    return msgpack.unpackb(await reader.readexactly(size), raw=False)
+
+
+@lru_cache(maxsize=256)
+def compile_patterns(patterns):
+    return [(re.compile(pattern), capacity) for pattern, capacity in patterns]
+
+
+def capacity_for(channel, capacity, patterns):
+    for pattern, value in compile_patterns(patterns):
+        if pattern.match(channel):
+            return value
+    return capacity
+
+
+# -------------------------
+# Broker (server side)
+# -------------------------
+class _Session:
+    """One client connection: reads requests, writes replies."""
+
+    def __init__(self, broker, reader, writer):
+        self.broker = broker
+        self.reader = reader
+        self.writer = writer
+        self.waiting = {}   # request_id -> channel (parked receives)
+        self.alive = True
+
+    def reply(self, request_id, status, value=None):
+        if self.alive and request_id != NO_REPLY:
+            self.writer.write(pack_frame([request_id, status, value]))
+
+    async def run(self):
+        try:
+            while True:
+                request_id, op, *args = await read_frame(self.reader)
+                handler = getattr(self.broker, f"op_{op}", None)
+                if handler is None:
+                    self.reply(request_id, ERROR, f"Unknown op {op!r}")
+                    continue
+                try:
+                    handler(self, request_id, *args)
+                except Exception as exc:
+                    self.reply(request_id, ERROR, f"{op}: {exc}")
+                await self.writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionError, asyncio.CancelledError):
+            pass
+        finally:
+            self.alive = False
+            for channel in self.waiting.values():
+                self.broker.drop_waiters(channel, self)
+            self.waiting.clear()
+            self.writer.close()
+
+
+class Broker:
+    """In-memory broker state; every op runs to completion on the event loop."""
+
+    def __init__(self):
+        self.channels = {}      # channel -> deque[(expires_at, payload)]
+        self.waiters = {}       # channel -> deque[(session, request_id)]
+        self.groups = {}        # group -> {channel: expires_at}
+        self.memberships = {}   # channel -> set(groups)
+
+    # -- delivery --------------------------------------------------------
+    def push(self, channel, payload, ttl, capacity, front=False):
+        waiters = self.waiters.get(channel)
+        while waiters:
+            session, request_id = waiters.popleft()
+            if not waiters:
+                del self.waiters[channel]
+            if session.alive and session.waiting.pop(request_id, None) is not None:
+                session.reply(request_id, OK, payload)
+                return True
+        queue = self.channels.setdefault(channel, deque())
+        if not front and len(queue) >= capacity:
+            return False
+        entry = (time.monotonic() + ttl, payload)
+        if front:
+            queue.appendleft(entry)
+        else:
+            queue.append(entry)
+        return True
+
+    def fan_out(self, channels, payload, ttl, capacity, patterns):
+        delivered = 0
+        for channel in channels:
+            if self.push(channel, payload, ttl, capacity_for(channel, capacity, tuple(patterns))):
+                delivered += 1
+        return delivered
+
+    def pop(self, channel):
+        queue = self.channels.get(channel)
+        now = time.monotonic()
+        while queue:
+            expires_at, payload = queue.popleft()
+            if expires_at >= now:
+                if not queue:
+                    del self.channels[channel]
+                return payload
+            self.forget_channel(channel)
+        self.channels.pop(channel, None)
+        return None
+
+    def drop_waiters(self, channel, session, request_id=None):
+        waiters = self.waiters.get(channel)
+        if not waiters:
+            return
+        kept = deque(w for w in waiters if w[0] is not session or (request_id is not None and w[1] != request_id))
+        if kept:
+            self.waiters[channel] = kept
+        else:
+            del self.waiters[channel]
+
+    # -- groups ----------------------------------------------------------
+    def forget_channel(self, channel):
+        """A message expired unread: the consumer is gone, leave all groups."""
+        for group in self.memberships.pop(channel, ()):
+            members = self.groups.get(group)
+            if members is not None:
+                members.pop(channel, None)
+                if not members:
+                    del self.groups[group]
+
+    def members(self, group):
+        members = self.groups.get(group)
+        if not members:
+            return []
+        now = time.monotonic()
+        for channel in [c for c, expires_at in members.items() if expires_at < now]:
+            del members[channel]
+            self.memberships.get(channel, set()).discard(group)
+        return list(members)
+
+    def sweep(self):
+        now = time.monotonic()
+        for channel in list(self.channels):
+            queue = self.channels[channel]
+            while queue and queue[0][0] < now:
+                queue.popleft()
+                self.forget_channel(channel)
+            if not queue:
+                del self.channels[channel]
+        for group in list(self.groups):
+            self.members(group)
+            if not self.groups.get(group):
+                self.groups.pop(group, None)
+
+    # -- ops -------------------------------------------------------------
+    def op_send(self, session, request_id, channel, payload, ttl, capacity):
+        session.reply(request_id, OK if self.push(channel, payload, ttl, capacity) else FULL)
+
+    def op_send_many(self, session, request_id, channels, payload, ttl, capacity, patterns):
+        session.reply(request_id, OK, self.fan_out(channels, payload, ttl, capacity, patterns))
+
+    def op_receive(self, session, request_id, channel):
+        payload = self.pop(channel)
+        if payload is not None:
+            session.reply(request_id, OK, payload)
+            return
+        session.waiting[request_id] = channel
+        self.waiters.setdefault(channel, deque()).append((session, request_id))
+
+    def op_cancel(self, session, request_id, target):
+        channel = session.waiting.pop(target, None)
+        if channel is not None:
+            self.drop_waiters(channel, session, target)
+            session.reply(target, CANCELLED)
+
+    def op_requeue(self, session, request_id, channel, payload, ttl):
+        self.push(channel, payload, ttl, capacity=0, front=True)
+
+    def op_group_add(self, session, request_id, group, channel, group_expiry):
+        self.groups.setdefault(group, {})[channel] = time.monotonic() + group_expiry
+        self.memberships.setdefault(channel, set()).add(group)
+        session.reply(request_id, OK)
+
+    def op_group_discard(self, session, request_id, group, channel):
+        members = self.groups.get(group)
+        if members is not None:
+            members.pop(channel, None)
+            if not members:
+                del self.groups[group]
+        groups = self.memberships.get(channel)
+        if groups is not None:
+            groups.discard(group)
+            if not groups:
+                del self.memberships[channel]
+        session.reply(request_id, OK)
+
+    def op_group_channels(self, session, request_id, group):
+        session.reply(request_id, OK, self.members(group))
+
+    def op_group_send(self, session, request_id, group, payload, ttl, capacity, patterns):
+        session.reply(request_id, OK, self.fan_out(self.members(group), payload, ttl, capacity, patterns))
+
+    def op_flush(self, session, request_id):
+        self.channels.clear()
+        self.groups.clear()
+        self.memberships.clear()
+        session.reply(request_id, OK)
+
+
+class BrokerServer:
+    """asyncio TCP server exposing one Broker; `port=0` picks a free port."""
+
+    def __init__(self, host="127.0.0.1", port=DEFAULT_PORT, sweep_interval=1.0):
+        self.host = host
+        self.port = port
+        self.sweep_interval = sweep_interval
+        self.broker = Broker()
+        self.server = None
+        self.sweeper = None
+        self.sessions = set()
+
+    async def start(self):
+        self.server = await asyncio.start_server(self.handle, self.host, self.port)
+        self.port = self.server.sockets[0].getsockname()[1]
+        self.sweeper = asyncio.create_task(self.sweep_forever())
+        return self
+
+    async def handle(self, reader, writer):
+        session = _Session(self.broker, reader, writer)
+        self.sessions.add(session)
+        try:
+            await session.run()
+        finally:
+            self.sessions.discard(session)
+
+    async def sweep_forever(self):
+        while True:
+            await asyncio.sleep(self.sweep_interval)
+            self.broker.sweep()
+
+    async def serve_forever(self):
+        await self.start()
+        async with self.server:
+            await self.server.serve_forever()
+
+    async def stop(self):
+        if self.sweeper:
+            self.sweeper.cancel()
+        if self.server:
+            self.server.close()
+            for session in list(self.sessions):
+                session.writer.close()
+            await self.server.wait_closed()
+
+
+# -------------------------
+# Channel layer (client side)
+# -------------------------
+class _Connection:
+    """A multiplexed connection to one broker host, bound to one event loop."""
+
+    def __init__(self, host, port):
+        self.host = host
+        self.port = port
+        self.writer = None
+        self.reader_task = None
+        self.pending = {}     # request_id -> future
+        self.receives = {}    # request_id -> (channel, ttl) of receives awaiting their reply
+        self.next_id = 1
+
+    async def open(self):
+        reader, self.writer = await asyncio.open_connection(self.host, self.port)
+        self.reader_task = asyncio.create_task(self.read_loop(reader))
+
+    @property
+    def closed(self):
+        return self.writer is None or self.writer.is_closing()
+
+    def write(self, op, *args, reply=True):
+        request_id = NO_REPLY
+        if reply:
+            request_id, self.next_id = self.next_id, self.next_id + 1
+        self.writer.write(pack_frame([request_id, op, *args]))
+        return request_id
+
+    async def call(self, op, *args):
+        request_id = self.write(op, *args)
+        future = asyncio.get_running_loop().create_future()
+        self.pending[request_id] = future
+        await self.writer.drain()
+        return await future
+
+    def requeue(self, channel, ttl, status, value):
+        """Push a message delivered to a receive nobody is awaiting back onto its channel."""
+        if status == OK and not self.closed:
+            self.write("requeue", channel, value, ttl, reply=False)
+
+    async def receive(self, channel, ttl):
+        request_id = self.write("receive", channel)
+        future = asyncio.get_running_loop().create_future()
+        self.pending[request_id] = future
+        self.receives[request_id] = (channel, ttl)
+        try:
+            return await future
+        except asyncio.CancelledError:
+            # The consumer went away. The message may already be in `future`
+            # (cancelled after delivery, before this task resumed): push it
+            # back. Otherwise ask the broker to unpark the receive; a reply
+            # already on its way is pushed back by read_loop.
+            if future.done() and not future.cancelled():
+                self.requeue(channel, ttl, *future.result())
+            elif self.pending.pop(request_id, None) is not None and not self.closed:
+                self.write("cancel", request_id, reply=False)
+            raise
+
+    async def read_loop(self, reader):
+        try:
+            while True:
+                request_id, status, value = await read_frame(reader)
+                future = self.pending.pop(request_id, None)
+                target = self.receives.pop(request_id, None)
+                if future is not None and not future.done():
+                    future.set_result((status, value))
+                elif target is not None and (future is None or future.cancelled()):
+                    # A receive cancelled before its reply came: don't drop the message
+                    self.requeue(*target, status, value)
+        except Exception as exc:
+            error = exc
+        except asyncio.CancelledError:
+            error = ConnectionError("Broker connection closed")
+        for future in self.pending.values():
+            if not future.done():
+                future.set_exception(ConnectionError(f"Lost broker {self.host}:{self.port}: {error}"))
+        self.pending.clear()
+        self.receives.clear()
+        if self.writer is not None:
+            self.writer.close()
+
+    async def close(self):
+        if self.reader_task is not None:
+            self.reader_task.cancel()
+        if self.writer is not None:
+            self.writer.close()
+
+
+class BrokerChannelLayer(BaseChannelLayer):
+    """
+    Channel layer backed by one or more BrokerServer hosts.
+
+        CHANNEL_LAYERS = {
+            "default": {
+                "BACKEND": "api.broker.BrokerChannelLayer",
+                "CONFIG": {"hosts": ["broker-1:6390", "broker-2:6390"]},
+            },
+        }
+    """
+
+    extensions = ["groups", "flush"]
+
+    def __init__(self, hosts=None, expiry=60, group_expiry=86400, capacity=100, channel_capacity=None):
+        super().__init__(expiry=expiry, capacity=capacity, channel_capacity=channel_capacity)
+        self.hosts = [self.parse_host(host) for host in hosts or [("127.0.0.1", DEFAULT_PORT)]]
+        self.group_expiry = group_expiry
+        self.channel_capacity = self.compile_capacities(self.channel_capacity)
+        self.wire_patterns = [[pattern.pattern, value] for pattern, value in self.channel_capacity]
+        self.client_id = uuid.uuid4().hex[:12]
+        self._connections = weakref.WeakKeyDictionary()   # loop -> {index: _Connection}
+        self._locks = weakref.WeakKeyDictionary()
+
+    @staticmethod
+    def parse_host(host):
+        if isinstance(host, str):
+            name, _, port = host.rpartition(":")
+            return (name or "127.0.0.1", int(port or DEFAULT_PORT))
+        return (host[0], int(host[1]))
+
+    # -- connections -----------------------------------------------------
+    def shard(self, name):
+        if len(self.hosts) == 1:
+            return 0
+        return zlib.crc32(self.non_local_name(name).encode()) % len(self.hosts)
+
+    async def connection(self, index):
+        loop = asyncio.get_running_loop()
+        connections = self._connections.setdefault(loop, {})
+        conn = connections.get(index)
+        if conn is not None and not conn.closed:
+            return conn
+        lock = self._locks.setdefault(loop, asyncio.Lock())
+        async with lock:
+            conn = connections.get(index)
+            if conn is None or conn.closed:
+                conn = _Connection(*self.hosts[index])
+                await conn.open()
+                connections[index] = conn
+        return conn
+
+    async def call(self, index, op, *args):
+        conn = await self.connection(index)
+        status, value = await conn.call(op, *args)
+        if status == ERROR:
+            raise RuntimeError(f"Broker error: {value}")
+        return status, value
+
+    # -- serialization ---------------------------------------------------
+    def serialize(self, message):
+        assert isinstance(message, dict), "message is not a dict"
+        assert "__asgi_channel__" not in message
+        return msgpack.packb(message, use_bin_type=True)
+
+    def deserialize(self, payload):
+        return msgpack.unpackb(payload, raw=False)
+
+    # -- channel layer API -----------------------------------------------
+    async def send(self, channel, message):
+        self.require_valid_channel_name(channel)
+        status, _ = await self.call(
+            self.shard(channel), "send", channel, self.serialize(message), self.expiry, self.get_capacity(channel)
+        )
+        if status == FULL:
+            raise ChannelFull(channel)
+
+    async def receive(self, channel):
+        self.require_valid_channel_name(channel)
+        conn = await self.connection(self.shard(channel))
+        status, value = await conn.receive(channel, self.expiry)
+        if status != OK:
+            raise RuntimeError(f"Broker error: {value}")
+        return self.deserialize(value)
+
+    async def new_channel(self, prefix="specific"):
+        return f"{prefix}.{self.client_id}!{uuid.uuid4().hex[:12]}"
+
+    async def flush(self):
+        for index in range(len(self.hosts)):
+            await self.call(index, "flush")
+
+    async def close(self):
+        loop = asyncio.get_running_loop()
+        for conn in self._connections.pop(loop, {}).values():
+            await conn.close()
+
+    # -- groups extension ------------------------------------------------
+    async def group_add(self, group, channel):
+        self.require_valid_group_name(group)
+        self.require_valid_channel_name(channel)
+        await self.call(self.shard(group), "group_add", group, channel, self.group_expiry)
+
+    async def group_discard(self, group, channel):
+        self.require_valid_group_name(group)
+        self.require_valid_channel_name(channel)
+        await self.call(self.shard(group), "group_discard", group, channel)
+
+    async def group_send(self, group, message):
+        self.require_valid_group_name(group)
+        payload = self.serialize(message)
+        args = (payload, self.expiry, self.capacity, self.wire_patterns)
+        if len(self.hosts) == 1:
+            await self.call(0, "group_send", group, *args)
+            return
+
+        _, channels = await self.call(self.shard(group), "group_channels", group)
+        batches = {}
+        for channel in channels:
+            batches.setdefault(self.shard(channel), []).append(channel)
+        await asyncio.gather(*(
+            self.call(index, "send_many", batch, *args) for index, batch in batches.items()
+        ))
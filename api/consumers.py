@@ -1,47 +1,216 @@
+import asyncio
 import json
+import uuid
+
+import msgpack
+from channels.exceptions import ChannelFull
 from channels.generic.websocket import AsyncWebsocketConsumer
+from django.conf import settings
+
+SIGNAL_TYPES = ("offer", "answer", "candidate")
+
+# WebSocket subprotocols, in server preference order. Clients that offer
+# none get JSON text frames.
+SUBPROTOCOL_MSGPACK = "signal.msgpack"
+SUBPROTOCOL_JSON = "signal.json"
+
 
 class MeetingConsumer(AsyncWebsocketConsumer):
+    """
+    WebRTC signaling for one meeting room.
+
+    Every connection gets a peer id and keeps a roster of the other peers in
+    the room (peer id -> channel name). The roster is built from presence
+    messages, so it works across worker processes without shared state:
+    a joining peer broadcasts `peer.join`, and every member adds it and
+    answers directly with `peer.present`.
+
+    Only join/leave is broadcast to the room group. Offers, answers and
+    candidates carry a `to` peer id and go straight to that peer's channel.
+
+    Trickle ICE candidates are coalesced per target for
+    SIGNALING_CANDIDATE_WINDOW seconds (or SIGNALING_CANDIDATE_BATCH
+    candidates) and delivered as one `candidates` frame. An offer/answer
+    to the same target flushes pending candidates first, keeping order.
+
+    Clients that offer the `signal.msgpack` subprotocol exchange MessagePack
+    binary frames instead of JSON text.
+
+    Client -> server:
+        {"type": "offer" | "answer" | "candidate", "to": "<peer id>", ...}
+    Server -> client:
+        {"type": "welcome", "peer_id": "<your peer id>"}
+        {"type": "peer-joined", "peer_id": "...", "user": "..."}
+        {"type": "peer-left", "peer_id": "..."}
+        {"type": "offer" | "answer", "from": "<peer id>", ...}
+        {"type": "candidates", "from": "<peer id>", "candidates": [{...}, ...]}
+        {"type": "error", "error": "...", ...}
+    """
+
+    candidate_window = getattr(settings, "SIGNALING_CANDIDATE_WINDOW", 0.025)
+    candidate_batch = getattr(settings, "SIGNALING_CANDIDATE_BATCH", 32)
+
     async def connect(self):
-        self.room_name = self.scope['url_route']['kwargs']['room_id']
+        self.room_name = self.scope['url_route']['kwargs']['room_name']
         self.room_group_name = f"meeting_{self.room_name}"
+        self.peer_id = uuid.uuid4().hex[:12]
+        self.roster = {}
+        self.pending_candidates = {}   # target peer id -> [candidate, ...]
+        self.flushers = {}             # target peer id -> flush task
+
+        offered = self.scope.get("subprotocols") or []
+        self.subprotocol = next(
+            (p for p in (SUBPROTOCOL_MSGPACK, SUBPROTOCOL_JSON) if p in offered), None
+        )
+        self.binary = self.subprotocol == SUBPROTOCOL_MSGPACK
+
+        user = self.scope.get("user")
+        self.username = user.username if user is not None and user.is_authenticated else None
 
         # Join room group
         await self.channel_layer.group_add(
             self.room_group_name,
             self.channel_name
         )
-        await self.accept()
+        await self.accept(subprotocol=self.subprotocol)
+        await self.send_json({"type": "welcome", "peer_id": self.peer_id})
+
+        # Announce ourselves; members answer with peer.present
+        await self.channel_layer.group_send(
+            self.room_group_name,
+            {"type": "peer.join", **self.presence()},
+        )
 
     async def disconnect(self, close_code):
+        for task in self.flushers.values():
+            task.cancel()
+
         # Leave room group
         await self.channel_layer.group_discard(
             self.room_group_name,
             self.channel_name
         )
+        await self.channel_layer.group_send(
+            self.room_group_name,
+            {"type": "peer.leave", "peer_id": self.peer_id},
+        )
 
-    async def receive(self, text_data):
+    async def receive(self, text_data=None, bytes_data=None):
         """
-        Handles incoming WebSocket messages.
-        Expected message format: {"type": "offer/answer/candidate", "sdp/candidate": "..."}
+        Handles incoming WebSocket messages (JSON text or MessagePack binary).
+        Expected message format: {"type": "offer/answer/candidate", "to": "<peer id>", "sdp/candidate": "..."}
         """
-        data = json.loads(text_data)
+        try:
+            if bytes_data is not None and self.binary:
+                data = msgpack.unpackb(bytes_data, raw=False)
+            elif text_data is not None:
+                data = json.loads(text_data)
+            else:
+                return
+        except (ValueError, msgpack.UnpackException):
+            # A bad frame is the client's problem; keep the socket open
+            await self.send_json({"type": "error", "error": "Malformed message"})
+            return
+        if not isinstance(data, dict):
+            return
         msg_type = data.get("type")
 
-        if msg_type in ["offer", "answer", "candidate"]:
-            # Broadcast signaling message to all peers in the room
-            await self.channel_layer.group_send(
-                self.room_group_name,
-                {
-                    "type": "signal_message",
-                    "message": data,
-                    "sender": self.channel_name,  # track sender
-                }
-            )
+        if msg_type == "candidate":
+            await self.queue_candidate(data)
+        elif msg_type in SIGNAL_TYPES:
+            await self.relay(data)
+
+    async def relay(self, data):
+        """Send a signaling message to the single peer named in `to`."""
+        target = data.pop("to", None)
+        # Peer ids are strings; a list or dict would not even hash
+        channel = self.roster.get(target) if isinstance(target, str) else None
+        if channel is None:
+            await self.send_json({"type": "error", "error": "Unknown peer", "to": target})
+            return
+
+        if target in self.pending_candidates:
+            await self.flush_candidates(target)
+        data["from"] = self.peer_id
+        await self.deliver(target, channel, {"type": "signal.message", "message": data})
+
+    async def deliver(self, target, channel, event):
+        try:
+            await self.channel_layer.send(channel, event)
+        except ChannelFull:
+            await self.send_json({"type": "error", "error": "Peer is not keeping up", "to": target})
+
+    # ---------------- candidate coalescing ----------------
+
+    async def queue_candidate(self, data):
+        target = data.pop("to", None)
+        if not isinstance(target, str) or target not in self.roster:
+            await self.send_json({"type": "error", "error": "Unknown peer", "to": target})
+            return
+        data.pop("type", None)
+
+        batch = self.pending_candidates.setdefault(target, [])
+        batch.append(data)
+        if len(batch) >= self.candidate_batch or self.candidate_window <= 0:
+            await self.flush_candidates(target)
+        elif target not in self.flushers:
+            self.flushers[target] = asyncio.create_task(self.flush_later(target))
+
+    async def flush_later(self, target):
+        await asyncio.sleep(self.candidate_window)
+        self.flushers.pop(target, None)
+        await self.flush_candidates(target)
+
+    async def flush_candidates(self, target):
+        task = self.flushers.pop(target, None)
+        if task is not None and task is not asyncio.current_task():
+            task.cancel()
+        batch = self.pending_candidates.pop(target, None)
+        channel = self.roster.get(target)
+        if not batch or channel is None:
+            return
+        await self.deliver(target, channel, {
+            "type": "signal.message",
+            "message": {"type": "candidates", "from": self.peer_id, "candidates": batch},
+        })
+
+    # ---------------- presence ----------------
+
+    def presence(self):
+        return {"peer_id": self.peer_id, "channel": self.channel_name, "user": self.username}
+
+    async def add_peer(self, event):
+        if event["peer_id"] == self.peer_id or event["peer_id"] in self.roster:
+            return False
+        self.roster[event["peer_id"]] = event["channel"]
+        await self.send_json({"type": "peer-joined", "peer_id": event["peer_id"], "user": event["user"]})
+        return True
+
+    async def peer_join(self, event):
+        """A new peer entered the room: add it and tell it we are here."""
+        if await self.add_peer(event):
+            await self.deliver(event["peer_id"], event["channel"], {"type": "peer.present", **self.presence()})
+
+    async def peer_present(self, event):
+        """An existing member answered our join."""
+        await self.add_peer(event)
+
+    async def peer_leave(self, event):
+        self.pending_candidates.pop(event["peer_id"], None)
+        if self.roster.pop(event["peer_id"], None) is not None:
+            await self.send_json({"type": "peer-left", "peer_id": event["peer_id"]})
+
+    # ---------------- signaling ----------------
 
     async def signal_message(self, event):
         """
-        Sends signaling messages to all peers except the sender.
+        Delivers a signaling message addressed to this peer.
         """
-        if event["sender"] != self.channel_name:
-            await self.send(text_data=json.dumps(event["message"]))
+        await self.send_json(event["message"])
+
+    async def send_json(self, message):
+        """Send one frame in the encoding negotiated at connect."""
+        if self.binary:
+            await self.send(bytes_data=msgpack.packb(message, use_bin_type=True))
+        else:
+            await self.send(text_data=json.dumps(message))
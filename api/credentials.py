@@ -0,0 +1,107 @@
+"""
+Login credential checks: one user query, password hashing on a bounded pool.
+
+`authenticate()` replaces django.contrib.auth.authenticate for the login
+endpoints. It
+  1. resolves the user by username or by email in a single query (the old
+     email path looked the user up, then authenticate() fetched it again);
+  2. runs the PBKDF2 check on a small, process-wide thread pool. hashlib
+     releases the GIL, so a login burst uses at most LOGIN_HASH_WORKERS
+     cores and leaves the request threads (and, from async views, the
+     event loop) free for everything else;
+  3. admits at most LOGIN_HASH_QUEUE checks at once, running or waiting.
+     Past that a login fails fast with 429 and Retry-After instead of
+     queueing behind a burst it cannot finish in time;
+  4. rehashes the password in the same pool when the hasher or its
+     iteration count has changed, and stores it with one UPDATE.
+
+Unknown users still cost one hash, as with ModelBackend, so response time
+does not reveal which usernames exist. Only the model backend is consulted;
+a custom AUTHENTICATION_BACKENDS entry would have to be added here.
+"""
+import asyncio
+import functools
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password, verify_password
+from django.contrib.auth.signals import user_login_failed
+from rest_framework.exceptions import Throttled
+
+User = get_user_model()
+
+
+class LoginBusy(Throttled):
+    default_detail = "Too many logins in progress; retry shortly."
+    default_code = "login_busy"
+
+    def __init__(self):
+        super().__init__(wait=1)
+
+
+@functools.lru_cache(maxsize=None)
+def hash_pool():
+    """(executor, admission semaphore), created on first use."""
+    workers = getattr(settings, "LOGIN_HASH_WORKERS", None) or min(4, os.cpu_count() or 1)
+    queue = getattr(settings, "LOGIN_HASH_QUEUE", None) or workers * 8
+    return ThreadPoolExecutor(max_workers=workers, thread_name_prefix="login-hash"), threading.BoundedSemaphore(queue)
+
+
+def submit(fn, *args):
+    """Run `fn` on the hash pool; raises LoginBusy when the pool is saturated."""
+    pool, slots = hash_pool()
+    if not slots.acquire(blocking=False):
+        raise LoginBusy()
+    future = pool.submit(fn, *args)
+    future.add_done_callback(lambda _: slots.release())
+    return future
+
+
+def check(password, encoded):
+    """
+    On the pool: (is_correct, new encoded password or None). A new hash is
+    made when the stored one uses an outdated hasher or iteration count.
+    Without a stored hash, hash anyway and fail.
+    """
+    if encoded is None:
+        make_password(password)
+        return False, None
+    is_correct, must_update = verify_password(password, encoded)
+    return is_correct, make_password(password) if is_correct and must_update else None
+
+
+def lookup(username=None, email=None):
+    """Users filtered by email when given, else by username; at most one row is read."""
+    if email:
+        return User.objects.filter(email=email).order_by("pk")
+    return User.objects.filter(**{User.USERNAME_FIELD: username})
+
+
+def finish(user, is_correct, credentials):
+    if user is not None and is_correct and user.is_active:
+        return user
+    user_login_failed.send(sender=__name__, credentials=credentials)
+    return None
+
+
+def authenticate(password, username=None, email=None):
+    """The active user with these credentials, or None. Raises LoginBusy."""
+    user = lookup(username, email).first()
+    is_correct, rehashed = submit(check, password, user and user.password).result()
+    if rehashed:
+        User.objects.filter(pk=user.pk).update(password=rehashed)
+        user.password = rehashed
+    return finish(user, is_correct, {"username": username or email})
+
+
+async def aauthenticate(password, username=None, email=None):
+    """authenticate() for async views: the event loop only waits on the pool."""
+    user = await lookup(username, email).afirst()
+    is_correct, rehashed = await asyncio.wrap_future(submit(check, password, user and user.password))
+    if rehashed:
+        await User.objects.filter(pk=user.pk).aupdate(password=rehashed)
+        user.password = rehashed
+    return finish(user, is_correct, {"username": username or email})
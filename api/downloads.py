@@ -0,0 +1,188 @@
+"""
+Document downloads: Django checks access, the OS or the front proxy moves the bytes.
+
+`serve()` answers GET/HEAD /api/documents/<id>/download/ (and snapshot
+versions, api.versions) in one of three ways (DOCUMENT_SENDFILE in settings):
+
+  * "x-accel-redirect": an empty response whose X-Accel-Redirect header
+    sends nginx to DOCUMENT_ACCEL_REDIRECT_PREFIX + the file name, an
+    `internal` location aliased to MEDIA_ROOT. nginx serves the file and
+    applies Range/If-Range against the ETag set here.
+  * "x-sendfile": the same through Apache's mod_xsendfile or lighttpd,
+    with the file's absolute path.
+  * "" (default): a FileResponse over exactly the requested byte range.
+    Under gunicorn and other servers with `wsgi.file_wrapper`, the range
+    goes out with sendfile(2) and never passes through Python. Elsewhere
+    it is read 256 KiB at a time. Under ASGI each read runs in a thread,
+    so the event loop never blocks on disk and the file is never buffered.
+
+The ETag is the content's SHA-256 (api.uploads), so it is strong and the
+same across renames and re-uploads of identical bytes. A single Range is
+honoured; If-Range must match that ETag. Multiple or malformed ranges get
+the whole file, as RFC 9110 allows.
+"""
+import mimetypes
+import os
+import re
+from urllib.parse import quote
+
+from django.conf import settings
+from django.core.files.storage import default_storage
+from django.core.handlers.asgi import ASGIRequest
+from django.http import FileResponse, HttpResponse, HttpResponseNotModified
+from django.utils.http import content_disposition_header, parse_etags
+from rest_framework.exceptions import NotFound
+from rest_framework.negotiation import DefaultContentNegotiation
+
+from .exports import aiter_sync
+
+RANGE = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+
+class RangeNotSatisfiable(Exception):
+    pass
+
+
+class FileRange:
+    """
+    `length` bytes of `file` from `start`. read() stops at the end of the
+    window; fileno() and the file position let a WSGI server sendfile it,
+    bounded by Content-Length. No tell()/seek(), so FileResponse leaves
+    Content-Length to the caller.
+    """
+
+    def __init__(self, file, start, length):
+        file.seek(start)
+        self.file, self.remaining = file, length
+
+    def read(self, size=-1):
+        if self.remaining <= 0:
+            return b""
+        data = self.file.read(self.remaining if size < 0 else min(size, self.remaining))
+        self.remaining -= len(data)
+        return data
+
+    def fileno(self):
+        return self.file.fileno()
+
+    def close(self):
+        self.file.close()
+
+
+class AnyAccept(DefaultContentNegotiation):
+    """A download answers with the file whatever Accept says; only errors are rendered (as JSON)."""
+
+    def select_renderer(self, request, renderers, format_suffix=None):
+        return renderers[0], renderers[0].media_type
+
+
+class DocumentFileResponse(FileResponse):
+    block_size = 256 * 1024   # fallback reads when the server cannot sendfile
+
+
+def download_name(title, name):
+    """`title`, with stored file `name`'s extension when the title has none."""
+    _, ext = os.path.splitext(name)
+    return title if os.path.splitext(title)[1] or not ext else f"{title}{ext}"
+
+
+def requested_range(request, etag, size):
+    """(first, last) byte of a satisfiable single Range, None for the whole file."""
+    header = request.headers.get("Range")
+    if not header:
+        return None
+    if_range = request.headers.get("If-Range")
+    if if_range is not None and (etag is None or if_range.strip() != etag):
+        return None   # changed since the client's partial copy
+    match = RANGE.match(header.strip())
+    if not match or match.groups() == ("", ""):
+        return None
+    first, last = match.groups()
+    if not first:   # the last N bytes
+        if int(last) == 0:
+            raise RangeNotSatisfiable()
+        return max(0, size - int(last)), size - 1
+    first = int(first)
+    if last and int(last) < first:
+        return None
+    if first >= size:
+        raise RangeNotSatisfiable()
+    return first, min(int(last), size - 1) if last else size - 1
+
+
+def file_headers(filename, sha256):
+    headers = {
+        "Accept-Ranges": "bytes",
+        "Content-Type": mimetypes.guess_type(filename)[0] or "application/octet-stream",
+        "Content-Disposition": content_disposition_header(True, filename),
+    }
+    if sha256:
+        headers["ETag"] = f'"{sha256}"'
+    return headers
+
+
+def not_modified(request, headers):
+    etag = headers.get("ETag")
+    if etag and etag in parse_etags(request.headers.get("If-None-Match", "")):
+        return HttpResponseNotModified(headers={"ETag": etag})
+    return None
+
+
+def unsatisfiable(size):
+    return HttpResponse(status=416, headers={"Accept-Ranges": "bytes", "Content-Range": f"bytes */{size}"})
+
+
+def serve(request, name, filename, sha256=""):
+    """The download response for stored file `name`; access must already be checked."""
+    if not name:
+        raise NotFound("This document has no file.")
+    headers = file_headers(filename, sha256)
+    if (response := not_modified(request, headers)) is not None:
+        return response
+
+    sendfile = getattr(settings, "DOCUMENT_SENDFILE", "")
+    if sendfile == "x-accel-redirect":
+        headers["X-Accel-Redirect"] = getattr(settings, "DOCUMENT_ACCEL_REDIRECT_PREFIX", "/protected-media/") + quote(name)
+        return HttpResponse(headers=headers)
+    if sendfile == "x-sendfile":
+        headers["X-Sendfile"] = default_storage.path(name)
+        return HttpResponse(headers=headers)
+
+    try:
+        size = default_storage.size(name)
+    except FileNotFoundError:
+        raise NotFound("The document's file is missing.")
+    try:
+        byte_range = requested_range(request, headers.get("ETag"), size)
+    except RangeNotSatisfiable:
+        return unsatisfiable(size)
+    first, last = byte_range or (0, size - 1)
+    length = last - first + 1 if size else 0
+
+    body = FileRange(default_storage.open(name, "rb"), first, length)
+    # Explicit, or FileResponse guesses again from the (nameless) file
+    content_type = headers.pop("Content-Type")
+    response = DocumentFileResponse(body, status=206 if byte_range else 200, content_type=content_type, headers=headers)
+    response["Content-Length"] = str(length)
+    if byte_range:
+        response["Content-Range"] = f"bytes {first}-{last}/{size}"
+    if isinstance(request, ASGIRequest):
+        # File reads only: off the shared sync thread, so downloads run side by side
+        response.streaming_content = aiter_sync(iter(lambda: body.read(response.block_size), b""), thread_sensitive=False)
+    return response
+
+
+def serve_content(request, content, filename, sha256=""):
+    """The same for content already in memory, such as a rebuilt version (api.versions)."""
+    headers = file_headers(filename, sha256)
+    if (response := not_modified(request, headers)) is not None:
+        return response
+    try:
+        byte_range = requested_range(request, headers.get("ETag"), len(content))
+    except RangeNotSatisfiable:
+        return unsatisfiable(len(content))
+    if byte_range is None:
+        return HttpResponse(content, headers=headers)
+    first, last = byte_range
+    headers["Content-Range"] = f"bytes {first}-{last}/{len(content)}"
+    return HttpResponse(content[first:last + 1], status=206, headers=headers)
@@ -0,0 +1,219 @@
+"""
+Constant-memory exports of transactions, meetings and documents.
+
+Rows are read with `.values().iterator(chunk_size)` (a server-side cursor
+where the database has one, fetchmany elsewhere), related data that
+`.values()` cannot join - meeting participants - is fetched once per
+chunk, and every chunk is rendered to one CSV or NDJSON byte string before
+the next is read. Memory is bounded by the chunk size, not the table.
+Recurring meetings are exported once per occurrence, generated as the
+chunk is written (api.recurrence); open-ended series stop
+RECURRENCE_HORIZON_DAYS from now unless ?until= is given.
+"""
+import csv
+import datetime
+import decimal
+import io
+import json
+from itertools import islice
+
+from asgiref.sync import sync_to_async
+from django.db.models import Q
+
+from . import availability, recurrence
+from .models import Meeting, Document, Transaction
+
+CHUNK_SIZE = 2000
+OUTPUTS = {"csv": "text/csv", "ndjson": "application/x-ndjson"}
+
+
+def plain(value):
+    """Reduce a database value to something csv and json both write the same way."""
+    if isinstance(value, datetime.datetime):
+        return value.isoformat()
+    if isinstance(value, decimal.Decimal):
+        return str(value)
+    return value
+
+
+class Export:
+    model = None
+    date_field = None         # ?since= / ?until= filter on this column
+    columns = ()              # output name -> .values() lookup
+    extra = ()                # lookups filled per chunk by extend(), not by the query
+    hidden = ()               # lookups read for extend() but not written
+
+    def window(self, since=None, until=None):
+        window = Q()
+        if since is not None:
+            window &= Q(**{f"{self.date_field}__gte": since})
+        if until is not None:
+            window &= Q(**{f"{self.date_field}__lt": until})
+        return window
+
+    def queryset(self, since=None, until=None):
+        lookups = [lookup for _, lookup in self.columns if lookup not in self.extra]
+        return self.model.objects.filter(self.window(since, until)).order_by("pk").values(*lookups, *self.hidden)
+
+    @property
+    def header(self):
+        return [name for name, _ in self.columns]
+
+    def chunks(self, since=None, until=None, chunk_size=CHUNK_SIZE):
+        """Yield lists of output rows (lists of plain values), one list per chunk."""
+        rows = self.queryset(since, until).iterator(chunk_size=chunk_size)
+        lookups = [lookup for _, lookup in self.columns]
+        while chunk := list(islice(rows, chunk_size)):
+            # extend() may yield more rows than it was given (occurrences): still `chunk_size` at a time
+            extended = iter(self.extend(chunk, since, until))
+            while part := list(islice(extended, chunk_size)):
+                yield [[plain(row[lookup]) for lookup in lookups] for row in part]
+
+    def extend(self, chunk, since=None, until=None):
+        """Hook to add per-chunk related data to the rows."""
+        return chunk
+
+
+class TransactionExport(Export):
+    model = Transaction
+    date_field = "created_at"
+    columns = (
+        ("id", "id"),
+        ("created_at", "created_at"),
+        ("transaction_type", "transaction_type"),
+        ("status", "status"),
+        ("amount", "amount"),
+        ("sender_id", "sender_id"),
+        ("sender", "sender__username"),
+        ("receiver_id", "receiver_id"),
+        ("receiver", "receiver__username"),
+    )
+
+
+class MeetingExport(Export):
+    model = Meeting
+    date_field = "start_time"
+    columns = (
+        ("id", "id"),
+        ("title", "title"),
+        ("organizer_id", "organizer_id"),
+        ("organizer", "organizer__username"),
+        ("start_time", "start_time"),
+        ("end_time", "end_time"),
+        ("status", "status"),
+        ("occurrence", "occurrence"),
+        ("participant_ids", "participant_ids"),
+    )
+    extra = ("participant_ids", "occurrence")
+    hidden = recurrence.RULE_FIELDS
+
+    def window(self, since=None, until=None):
+        """Meetings starting in the window, and series with an occurrence that may."""
+        if since is None and until is None:
+            return Q()
+        series = ~Q(recurrence="")
+        if until is not None:
+            series &= Q(start_time__lt=until)
+        if since is not None:
+            series &= Q(series_end__isnull=True) | Q(series_end__gt=since)
+        return (Q(recurrence="") & super().window(since, until)) | series
+
+    def extend(self, chunk, since=None, until=None):
+        """
+        One through-table query per chunk for its participants, one for the
+        exceptions of its series; each series becomes a row per occurrence
+        starting in the window, `occurrence` being the start its rule gives it.
+        """
+        participants = {row["id"]: [] for row in chunk}
+        pairs = (
+            Meeting.participants.through.objects
+            .filter(meeting_id__in=list(participants))
+            .order_by("meeting_id", "user_id")
+            .values_list("meeting_id", "user_id")
+        )
+        for meeting_id, user_id in pairs:
+            participants[meeting_id].append(user_id)
+        series = [row["id"] for row in chunk if row["recurrence"]]
+        changes = availability.exceptions(series) if series else {}
+        for row in chunk:
+            row["participant_ids"] = participants[row["id"]]
+            if not row["recurrence"]:
+                row["occurrence"] = None
+                yield row
+                continue
+            rule = recurrence.rule_of(row)
+            start, end = recurrence.span(rule)
+            start, end = max(start, since) if since else start, min(end, until) if until else end
+            # Not expand(): a one-off window would only crowd the cache
+            for original, begins, ends in recurrence.occurrences(rule, start, end, changes.get(row["id"], ())):
+                if since is None or begins >= since:
+                    yield {**row, "start_time": begins, "end_time": ends, "occurrence": original}
+
+
+class DocumentExport(Export):
+    model = Document
+    date_field = "uploaded_at"
+    columns = (
+        ("id", "id"),
+        ("title", "title"),
+        ("owner_id", "owner_id"),
+        ("owner", "owner__username"),
+        ("file", "file"),
+        ("version", "version"),
+        ("status", "status"),
+        ("uploaded_at", "uploaded_at"),
+    )
+
+
+EXPORTS = {
+    "transactions": TransactionExport(),
+    "meetings": MeetingExport(),
+    "documents": DocumentExport(),
+}
+
+
+def render_csv(export, chunks):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+
+    def flush():
+        data = buffer.getvalue().encode()
+        buffer.seek(0)
+        buffer.truncate()
+        return data
+
+    writer.writerow(export.header)
+    yield flush()
+    for rows in chunks:
+        # Lists (participant ids) become "3;8;21" in a single cell
+        writer.writerows(
+            [";".join(map(str, value)) if isinstance(value, list) else value for value in row] for row in rows
+        )
+        yield flush()
+
+
+def render_ndjson(export, chunks):
+    header = export.header
+    for rows in chunks:
+        yield "".join(json.dumps(dict(zip(header, row))) + "\n" for row in rows).encode()
+
+
+def export_stream(name, output, since=None, until=None, chunk_size=CHUNK_SIZE):
+    """Iterator of byte strings: the whole `name` export as CSV or NDJSON."""
+    export = EXPORTS[name]
+    render = render_csv if output == "csv" else render_ndjson
+    return render(export, export.chunks(since, until, chunk_size))
+
+
+async def aiter_sync(iterator, thread_sensitive=True):
+    """
+    Serve a sync iterator from an async one, one item per thread hop.
+    StreamingHttpResponse under ASGI would otherwise read a sync iterator
+    to the end (into memory) before sending the first byte. Iterators that
+    query the database must stay on Django's shared sync thread; plain
+    file reads pass thread_sensitive=False and run on the thread pool.
+    """
+    iterator = iter(iterator)
+    step = sync_to_async(next, thread_sensitive=thread_sensitive)
+    while (item := await step(iterator, None)) is not None:
+        yield item
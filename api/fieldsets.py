@@ -0,0 +1,60 @@
+"""
+Sparse fieldsets: the `?fields=` and `?expand=` query parameters.
+
+    ?fields=id,title,organizer.username
+        Render only these fields. A dotted name selects inside a relation
+        (and expands it); without `fields` every field is rendered.
+    ?expand=organizer,meeting.participants
+        Render these relations as objects. Unexpanded relations render as
+        primary keys, and are neither joined nor prefetched in full.
+
+Both accept comma-separated names, repeated parameters, or both. Unknown
+names are a 400, so a typo does not silently return the default shape.
+"""
+from rest_framework.exceptions import ValidationError
+
+
+def names(params, key):
+    return [name.strip() for value in params.getlist(key) for name in value.split(",") if name.strip()]
+
+
+class Fieldset:
+    """The response shape one request asks for; `Fieldset()` is the default shape."""
+
+    def __init__(self, fields=None, expand=()):
+        self.fields = None if fields is None else set(fields)
+        self.expand = set(expand)
+
+    @classmethod
+    def from_request(cls, request):
+        params = getattr(request, "query_params", request.GET)
+        return cls(names(params, "fields") or None, names(params, "expand"))
+
+    def selects(self, name):
+        return self.fields is None or name in self.fields or any(field.startswith(f"{name}.") for field in self.fields)
+
+    def expands(self, name):
+        paths = self.expand | (self.fields or set())
+        return name in self.expand or any(path.startswith(f"{name}.") for path in paths)
+
+    def nested(self, name):
+        """The Fieldset inside relation `name`; `fields=organizer` alone means all of it."""
+        prefix = f"{name}."
+        inner = [field[len(prefix):] for field in self.fields or () if field.startswith(prefix)]
+        return Fieldset(inner or None, [path[len(prefix):] for path in self.expand if path.startswith(prefix)])
+
+    def check(self, available, relations):
+        """Raise a 400 for names not among `available` fields / expandable `relations` at this level."""
+        errors = {}
+        unknown = sorted({field.split(".")[0] for field in self.fields or ()} - set(available))
+        if unknown:
+            errors["fields"] = [f"Unknown field {name!r}." for name in unknown]
+        unknown = sorted(
+            {path.split(".")[0] for path in self.expand}
+            | {field.split(".")[0] for field in self.fields or () if "." in field}
+        )
+        unknown = [name for name in unknown if name not in relations]
+        if unknown:
+            errors["expand"] = [f"{name!r} cannot be expanded." for name in unknown]
+        if errors:
+            raise ValidationError(errors)
@@ -0,0 +1,129 @@
+"""
+Bulk transaction ingest for settlement imports.
+
+Rows come in as an iterable of dicts (a parsed JSON array, or NDJSON lines
+parsed lazily) and are handled `batch_size` at a time:
+
+  1. every row is checked in Python; the users it names are resolved with
+     one query for the whole batch;
+  2. the valid rows go through `ledger.post_batch`, i.e. one transaction
+     with bulk INSERTs and a single wallet update.
+
+A bad row is reported with its 0-based position and never aborts the rest
+of its batch, so an import can be fixed and re-run with just the failures.
+"""
+import json
+from itertools import islice
+
+from django.contrib.auth import get_user_model
+
+from . import ledger
+
+User = get_user_model()
+
+# Which parties each transaction type needs
+PARTIES = {"deposit": ("receiver",), "withdraw": ("sender",), "transfer": ("sender", "receiver")}
+
+
+def chunked(iterable, size):
+    iterator = iter(iterable)
+    while batch := list(islice(iterator, size)):
+        yield batch
+
+
+def ndjson_rows(lines):
+    """Lazily parse NDJSON; a malformed line is yielded as a ValueError and reported as that row's error."""
+    for line in lines:
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            yield json.loads(line)
+        except ValueError as exc:
+            yield ValueError(f"Invalid JSON: {exc}")
+
+
+def row_error(position, field, message):
+    return {"row": position, "errors": {field: [message]}}
+
+
+def validate_batch(rows, offset=0):
+    """
+    Check a batch of rows. Returns (postings, positions, errors) where
+    `postings` are ready for ledger.post_batch and `positions` maps each
+    back to its row number.
+    """
+    errors, candidates = [], []
+    for position, row in enumerate(rows, start=offset):
+        if isinstance(row, ValueError):
+            errors.append(row_error(position, "non_field_errors", str(row)))
+            continue
+        if not isinstance(row, dict):
+            errors.append(row_error(position, "non_field_errors", "Expected a JSON object."))
+            continue
+
+        problems = {}
+        kind = row.get("transaction_type", "transfer")
+        if kind not in PARTIES:
+            problems["transaction_type"] = [f'"{kind}" is not a valid choice.']
+        try:
+            amount = ledger.to_amount(row.get("amount"))
+        except ledger.LedgerError as exc:
+            problems["amount"] = [str(exc)]
+
+        parties = {}
+        for field in ("sender", "receiver"):
+            value = row.get(field)
+            needed = field in PARTIES.get(kind, ())
+            if value is None:
+                if needed:
+                    problems[field] = ["This field is required."]
+            elif not needed:
+                problems[field] = [f"Not allowed for a {kind}."]
+            elif isinstance(value, int) and not isinstance(value, bool):
+                parties[field] = value
+            elif isinstance(value, str) and value.isascii() and value.isdigit():
+                parties[field] = int(value)
+            else:
+                # Not int(): it takes true as 1 and 1.9 as 1, posting to the wrong account
+                problems[field] = ["A valid integer is required."]
+        if "sender" in parties and parties.get("sender") == parties.get("receiver"):
+            problems["receiver"] = ["Cannot transfer to yourself."]
+
+        if problems:
+            errors.append({"row": position, "errors": problems})
+        else:
+            candidates.append((position, kind, amount, parties.get("sender"), parties.get("receiver")))
+
+    # One query resolves every user named in the batch
+    referenced = {user_id for *_, sender, receiver in candidates for user_id in (sender, receiver) if user_id}
+    known = set(User.objects.filter(pk__in=referenced).values_list("pk", flat=True)) if referenced else set()
+
+    postings, positions = [], []
+    for position, kind, amount, sender, receiver in candidates:
+        missing = [field for field, user_id in (("sender", sender), ("receiver", receiver)) if user_id and user_id not in known]
+        if missing:
+            errors.append({"row": position, "errors": {field: ["User does not exist."] for field in missing}})
+            continue
+        postings.append((kind, amount, sender, receiver))
+        positions.append(position)
+    return postings, positions, errors
+
+
+def ingest(rows, batch_size=1000, max_errors=1000):
+    """Validate and post `rows` batch by batch. Returns a summary with per-row errors."""
+    summary = {"received": 0, "created": 0, "failed": 0, "errors": [], "errors_truncated": False}
+    for batch in chunked(rows, batch_size):
+        postings, positions, errors = validate_batch(batch, offset=summary["received"])
+        for position, result in zip(positions, ledger.post_batch(postings)):
+            if isinstance(result, ledger.LedgerError):
+                errors.append(row_error(position, "non_field_errors", str(result)))
+            else:
+                summary["created"] += 1
+
+        summary["received"] += len(batch)
+        summary["failed"] += len(errors)
+        room = max_errors - len(summary["errors"])
+        summary["errors"].extend(sorted(errors, key=lambda error: error["row"])[:room])
+        summary["errors_truncated"] |= len(errors) > room
+    return summary
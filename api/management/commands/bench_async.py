@@ -0,0 +1,202 @@
+import asyncio
+import json
+import time
+from urllib.parse import urlsplit
+
+from django.core.management.base import BaseCommand, CommandError
+
+from api.benchmarking import SEED_PASSWORD, SEED_USER_PREFIX, latency_summary, write_report
+from api.models import User
+
+LOGIN = {"username": f"{SEED_USER_PREFIX}0", "password": SEED_PASSWORD}
+
+# name -> (method, sync path, async path, body)
+ENDPOINTS = {
+    "login": ("POST", "/api/auth/login/", "/api/async/auth/login/", LOGIN),
+    "profile": ("GET", "/api/auth/profile/", "/api/async/auth/profile/", None),
+    "wallet": ("GET", "/api/wallet/", "/api/async/wallet/", None),
+    "meetings-list": ("GET", "/api/meetings/", "/api/async/meetings/", None),
+}
+
+
+# -------------------------
+# Transports
+# -------------------------
+class ASGITransport:
+    """In-process: calls iecapi.asgi.application with raw ASGI messages (no sockets)."""
+
+    def __init__(self):
+        from iecapi.asgi import application
+
+        self.application = application
+
+    async def open(self):
+        return None
+
+    async def request(self, connection, method, path, headers, body):
+        path, _, query = path.partition("?")
+        headers = {**headers, "Content-Length": str(len(body))}
+        scope = {
+            "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1",
+            "method": method, "scheme": "http", "path": path, "raw_path": path.encode(),
+            "query_string": query.encode(), "root_path": "",
+            "headers": [(b"host", b"testserver")] + [(k.lower().encode(), v.encode()) for k, v in headers.items()],
+            "server": ("testserver", 80), "client": ("127.0.0.1", 0),
+        }
+        sent = False
+
+        async def receive():
+            nonlocal sent
+            if not sent:
+                sent = True
+                return {"type": "http.request", "body": body, "more_body": False}
+            # Never disconnect; Django cancels this wait once the response is out
+            await asyncio.Future()
+
+        status, chunks = None, []
+
+        async def send(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            elif message["type"] == "http.response.body":
+                chunks.append(message.get("body", b""))
+
+        await self.application(scope, receive, send)
+        return status, b"".join(chunks)
+
+    async def close(self, connection):
+        pass
+
+
+class SocketTransport:
+    """HTTP/1.1 keep-alive against a running server (`--url http://host:port`), one connection per worker."""
+
+    def __init__(self, url):
+        parts = urlsplit(url)
+        self.host, self.port = parts.hostname, parts.port or 80
+
+    async def open(self):
+        return await asyncio.open_connection(self.host, self.port)
+
+    async def request(self, connection, method, path, headers, body):
+        reader, writer = connection
+        head = [f"{method} {path} HTTP/1.1", f"Host: {self.host}", f"Content-Length: {len(body)}"]
+        head += [f"{k}: {v}" for k, v in headers.items()]
+        writer.write(("\r\n".join(head) + "\r\n\r\n").encode() + body)
+        await writer.drain()
+
+        status_line = await reader.readline()
+        if not status_line:
+            raise ConnectionError("Server closed the connection")
+        length = None
+        while (line := await reader.readline()) not in (b"\r\n", b""):
+            name, _, value = line.decode().partition(":")
+            if name.strip().lower() == "content-length":
+                length = int(value)
+        if length is None:
+            raise CommandError("Response without Content-Length; cannot keep the connection alive")
+        return int(status_line.split()[1]), await reader.readexactly(length)
+
+    async def close(self, connection):
+        connection[1].close()
+
+
+# -------------------------
+# Command
+# -------------------------
+class Command(BaseCommand):
+    help = (
+        "Compare the sync DRF views with their async-native twins under "
+        "/api/async/ at high concurrency: requests/sec and latency "
+        "percentiles per endpoint, as JSON. In-process through the ASGI "
+        "application by default, or against a running daphne with --url."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--endpoints", nargs="+", choices=list(ENDPOINTS), help="Subset of endpoints to run.")
+        parser.add_argument("--concurrency", type=int, default=64, help="Requests in flight at once.")
+        parser.add_argument("--requests", type=int, default=2000, help="Requests per endpoint and path.")
+        parser.add_argument("--login-requests", type=int, default=200,
+                            help="Requests for `login` (each hashes a password).")
+        parser.add_argument("--warmup", type=int, default=20)
+        parser.add_argument("--url", help="http://host:port of a running server; default is in-process.")
+        parser.add_argument("--output", default="benchmarks/async.json")
+
+    def handle(self, *args, **options):
+        if not User.objects.filter(username=LOGIN["username"]).exists():
+            raise CommandError("No benchmark data; run `manage.py seed_benchmark_data` first.")
+        self.transport = SocketTransport(options["url"]) if options["url"] else ASGITransport()
+
+        results = asyncio.run(self.run(options))
+        config = {key: options[key] for key in ("concurrency", "requests", "login_requests", "warmup", "url")}
+        config["mode"] = "socket" if options["url"] else "in-process"
+        write_report(options["output"], "async", config, results)
+        self.stdout.write(f"Report written to {options['output']}")
+
+    async def run(self, options):
+        connection = await self.transport.open()
+        status, body = await self.transport.request(
+            connection, "POST", "/api/auth/login/", {"Content-Type": "application/json"}, json.dumps(LOGIN).encode()
+        )
+        await self.transport.close(connection)
+        if status != 200:
+            raise CommandError(f"Could not log in as {LOGIN['username']}: {status} {body[:200]!r}")
+        self.token = json.loads(body)["access"]
+
+        results = {}
+        for name in options["endpoints"] or list(ENDPOINTS):
+            method, sync_path, async_path, payload = ENDPOINTS[name]
+            total = options["login_requests"] if name == "login" else options["requests"]
+            results[name] = {}
+            for label, path in (("sync", sync_path), ("async", async_path)):
+                await self.load(method, path, payload, options["warmup"], options["concurrency"])
+                results[name][label] = await self.load(method, path, payload, total, options["concurrency"])
+            sync, async_ = results[name]["sync"], results[name]["async"]
+            results[name]["speedup"] = round(async_["requests_per_sec"] / sync["requests_per_sec"], 2)
+            self.stdout.write(
+                f"{name:14} sync {sync['requests_per_sec']:8,.0f} req/s (p99 {sync['latency_ms']['p99']} ms)  "
+                f"async {async_['requests_per_sec']:8,.0f} req/s (p99 {async_['latency_ms']['p99']} ms)  "
+                f"x{results[name]['speedup']}"
+            )
+            for label, result in (("sync", sync), ("async", async_)):
+                if result["failures"]:
+                    self.stdout.write(f"{'':14} {label} non-200: {result['failures']} ({result['ok_per_sec']:,.0f} ok/s)")
+        return results
+
+    async def load(self, method, path, payload, total, concurrency):
+        """`total` requests from `concurrency` workers; returns throughput, latency and failures."""
+        headers = {"Authorization": f"Bearer {self.token}"}
+        body = b""
+        if payload is not None:
+            headers["Content-Type"] = "application/json"
+            body = json.dumps(payload).encode()
+        remaining = total
+        latencies, failures = [], {}
+
+        async def worker():
+            nonlocal remaining
+            connection = await self.transport.open()
+            try:
+                while remaining > 0:
+                    remaining -= 1
+                    started = time.perf_counter()
+                    status, _ = await self.transport.request(connection, method, path, headers, body)
+                    latencies.append(time.perf_counter() - started)
+                    if status != 200:
+                        failures[status] = failures.get(status, 0) + 1
+            finally:
+                await self.transport.close(connection)
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(min(concurrency, total))))
+        elapsed = time.perf_counter() - started
+        return {
+            "requests": total,
+            "duration_s": round(elapsed, 3),
+            "requests_per_sec": round(total / elapsed, 1) if elapsed else None,
+            # Excludes fast rejections such as login's 429 under admission control
+            "ok_per_sec": round((total - sum(failures.values())) / elapsed, 1) if elapsed else None,
+            "latency_ms": latency_summary(latencies),
+            "failures": {str(status): count for status, count in sorted(failures.items())},
+        }
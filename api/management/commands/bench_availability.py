@@ -0,0 +1,127 @@
+import random
+import time
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from api import availability
+from api.benchmarking import latency_summary, write_report
+from api.models import User, Meeting
+from api.querysets import meeting_queryset
+
+
+class Command(BaseCommand):
+    help = (
+        "Free/busy and conflict checks over a year of meetings: the server-side "
+        "engine (api.availability) against what clients did before, pulling "
+        "every meeting in the window and intersecting intervals themselves. "
+        "Seeds data inside a transaction that is rolled back, so the database "
+        "is left untouched."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--users", type=int, default=1000)
+        parser.add_argument("--days", type=int, default=365)
+        parser.add_argument("--meetings-per-week", type=int, default=3, help="Organized by each user.")
+        parser.add_argument("--participants", type=int, default=3, help="Max participants per meeting.")
+        parser.add_argument("--sizes", type=int, nargs="+", default=[10, 100, 1000], help="Users per free/busy query.")
+        parser.add_argument("--checks", type=int, default=500, help="Conflict checks to time.")
+        parser.add_argument("--repeat", type=int, default=3, help="Best of N runs per measurement.")
+        parser.add_argument("--seed", type=int, default=42)
+        parser.add_argument("--output", default="benchmarks/availability.json")
+
+    def handle(self, *args, **options):
+        self.rng = random.Random(options["seed"])
+        with transaction.atomic():
+            user_ids, start = self.seed(options)
+            end = start + timedelta(days=options["days"])
+            results = {"meetings": Meeting.objects.filter(organizer_id__in=user_ids).count(), "free_busy": []}
+
+            for size in sorted(options["sizes"]):
+                users = user_ids[:size]
+                engine, queries = self.best_of(lambda: self.engine(users, start, end), options["repeat"])
+                results["free_busy"].append({"users": len(users), "engine_ms": round(engine * 1000, 2),
+                                             "queries": queries})
+                self.stdout.write(f"free/busy {len(users):>5} users x {options['days']} days  "
+                                  f"engine {engine * 1000:9.1f} ms ({queries} query)")
+            # Reading every meeting dominates it, whatever the number of users: timed once, for the most
+            client, queries = self.best_of(lambda: self.client_side(users, start, end), 1)
+            results["client_side"] = {"users": len(users), "ms": round(client * 1000, 2), "queries": queries,
+                                      "speedup": round(client / engine, 1)}
+            self.stdout.write(f"client-side {len(users):>5} users x {options['days']} days  "
+                              f"{client * 1000:9.1f} ms ({queries} queries)  engine is x{client / engine:.1f} faster")
+
+            latencies = []
+            for _ in range(options["checks"]):
+                people = self.rng.sample(user_ids, options["participants"] + 1)
+                slot = start + timedelta(minutes=30 * self.rng.randrange(options["days"] * 48))
+                began = time.perf_counter()
+                availability.conflicts(people, slot, slot + timedelta(hours=1))
+                latencies.append(time.perf_counter() - began)
+            results["conflict_check_ms"] = latency_summary(latencies)
+            self.stdout.write(f"conflict check ({options['participants'] + 1} people): {results['conflict_check_ms']}")
+            transaction.set_rollback(True)
+
+        config = {key: options[key] for key in ("users", "days", "meetings_per_week", "participants", "sizes", "checks")}
+        write_report(options["output"], "availability", config, results)
+        self.stdout.write(f"Report written to {options['output']}")
+
+    def engine(self, users, start, end):
+        busy = availability.busy(users, start, end)
+        return availability.free(busy, start, end)
+
+    def client_side(self, users, start, end):
+        """Every meeting in the window through the list queryset, intersected per user in Python."""
+        wanted, busy = set(users), {user_id: [] for user_id in users}
+        meetings = meeting_queryset().filter(start_time__lt=end, end_time__gt=start).exclude(status="canceled")
+        for meeting in meetings:
+            for user_id in {meeting.organizer_id, *(user.pk for user in meeting.participants.all())} & wanted:
+                busy[user_id].append((max(meeting.start_time, start), min(meeting.end_time, end)))
+        merged = {user_id: availability.merge(sorted(intervals)) for user_id, intervals in busy.items()}
+        return availability.free(merged, start, end)
+
+    def best_of(self, fn, repeat):
+        best, queries = None, None
+        for _ in range(repeat):
+            with CaptureQueriesContext(connection) as captured:
+                began = time.perf_counter()
+                fn()
+                elapsed = time.perf_counter() - began
+            if best is None or elapsed < best:
+                best, queries = elapsed, len(captured)
+        return best, queries
+
+    def seed(self, options):
+        """`users` accounts, each organizing `meetings_per_week` meetings in working hours."""
+        start = timezone.now().replace(hour=0, minute=0, second=0, microsecond=0)
+        prefix = f"avail_{self.rng.randrange(1 << 30)}_"
+        User.objects.bulk_create(
+            [User(username=f"{prefix}{i}", email=f"{prefix}{i}@example.com", role="investor")
+             for i in range(options["users"])],
+            batch_size=1000,
+        )
+        user_ids = list(User.objects.filter(username__startswith=prefix).order_by("id").values_list("id", flat=True))
+        total = options["users"] * options["meetings_per_week"] * options["days"] // 7
+        self.stdout.write(f"Seeding {options['users']} users and {total} meetings over {options['days']} days...")
+
+        meetings = []
+        for _ in range(total):
+            begins = start + timedelta(days=self.rng.randrange(options["days"]),
+                                       minutes=8 * 60 + 15 * self.rng.randrange(40))
+            meetings.append(Meeting(
+                title="Sync", organizer_id=self.rng.choice(user_ids), start_time=begins,
+                end_time=begins + timedelta(minutes=self.rng.choice([15, 30, 45, 60, 90])),
+                status=self.rng.choices(["scheduled", "canceled"], [9, 1])[0],
+            ))
+        Meeting.objects.bulk_create(meetings, batch_size=2000)
+        meeting_ids = Meeting.objects.filter(organizer_id__in=user_ids).values_list("id", flat=True)
+        Through = Meeting.participants.through
+        Through.objects.bulk_create([
+            Through(meeting_id=meeting_id, user_id=user_id)
+            for meeting_id in meeting_ids
+            for user_id in self.rng.sample(user_ids, self.rng.randint(1, options["participants"]))
+        ], batch_size=5000)
+        return user_ids, start
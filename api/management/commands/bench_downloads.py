@@ -0,0 +1,217 @@
+import asyncio
+import hashlib
+import json
+import os
+import tempfile
+import time
+
+from django.core.files import File
+from django.core.files.storage import default_storage
+from django.core.management.base import BaseCommand, CommandError
+
+from api.benchmarking import latency_summary, rss_bytes, write_report
+from api.management.commands.bench_async import LOGIN, ASGITransport, SocketTransport
+from api.models import Document, User
+from api.uploads import blob_name
+
+CHUNK = 1024 * 1024
+
+
+# -------------------------
+# Transports
+# -------------------------
+# Same as bench_async's, but bodies are counted and dropped as they arrive:
+# a client holding 64 copies of a 100 MB file would dwarf the server it measures.
+class CountingASGITransport(ASGITransport):
+    async def download(self, connection, path, headers):
+        path, _, query = path.partition("?")
+        scope = {
+            "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1",
+            "method": "GET", "scheme": "http", "path": path, "raw_path": path.encode(),
+            "query_string": query.encode(), "root_path": "",
+            "headers": [(b"host", b"testserver")] + [(k.lower().encode(), v.encode()) for k, v in headers.items()],
+            "server": ("testserver", 80), "client": ("127.0.0.1", 0),
+        }
+        sent = False
+
+        async def receive():
+            nonlocal sent
+            if not sent:
+                sent = True
+                return {"type": "http.request", "body": b"", "more_body": False}
+            await asyncio.Future()
+
+        status, received = None, 0
+
+        async def send(message):
+            nonlocal status, received
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            elif message["type"] == "http.response.body":
+                received += len(message.get("body", b""))
+
+        await self.application(scope, receive, send)
+        return status, received
+
+
+class CountingSocketTransport(SocketTransport):
+    async def download(self, connection, path, headers):
+        reader, writer = connection
+        head = [f"GET {path} HTTP/1.1", f"Host: {self.host}"] + [f"{k}: {v}" for k, v in headers.items()]
+        writer.write(("\r\n".join(head) + "\r\n\r\n").encode())
+        await writer.drain()
+
+        status_line = await reader.readline()
+        if not status_line:
+            raise ConnectionError("Server closed the connection")
+        length = None
+        while (line := await reader.readline()) not in (b"\r\n", b""):
+            name, _, value = line.decode().partition(":")
+            if name.strip().lower() == "content-length":
+                length = int(value)
+        if length is None:
+            raise CommandError("Response without Content-Length; cannot keep the connection alive")
+        remaining = length
+        while remaining:
+            chunk = await reader.read(min(CHUNK, remaining))
+            if not chunk:
+                raise ConnectionError("Server closed the connection mid-body")
+            remaining -= len(chunk)
+        return int(status_line.split()[1]), length
+
+
+# -------------------------
+# Command
+# -------------------------
+class Command(BaseCommand):
+    help = (
+        "Download one large document from many clients at once through "
+        "/api/documents/<id>/download/: MB/s, requests/sec, latency "
+        "percentiles and peak server RSS, whole-file and ranged, as JSON. "
+        "In-process through the ASGI application by default, or against a "
+        "running server with --url (gunicorn sends the file with sendfile)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--size-mb", type=int, default=64, help="Size of the benchmark document.")
+        parser.add_argument("--concurrency", type=int, default=16, help="Downloads in flight at once.")
+        parser.add_argument("--requests", type=int, default=64, help="Downloads per mode.")
+        parser.add_argument("--range-kb", type=int, default=256, help="Size of each ranged request.")
+        parser.add_argument("--url", help="http://host:port of a running server; default is in-process.")
+        parser.add_argument("--server-pid", type=int, help="With --url: the server process, for its RSS.")
+        parser.add_argument("--output", default="benchmarks/downloads.json")
+
+    def handle(self, *args, **options):
+        owner = User.objects.filter(username=LOGIN["username"]).first()
+        if owner is None:
+            raise CommandError("No benchmark data; run `manage.py seed_benchmark_data` first.")
+        if options["url"]:
+            self.transport = CountingSocketTransport(options["url"])
+        else:
+            self.transport = CountingASGITransport()
+
+        document = self.make_document(owner, options["size_mb"] * 1024 * 1024)
+        try:
+            results = asyncio.run(self.run(document, options))
+        finally:
+            # The blob stays if a seeded document happens to share its content
+            Document.objects.filter(pk=document.pk).delete()
+            if not Document.objects.filter(file=document.file.name).exists():
+                default_storage.delete(document.file.name)
+
+        config = {key: options[key] for key in ("size_mb", "concurrency", "requests", "range_kb", "url")}
+        config["mode"] = "socket" if options["url"] else "in-process"
+        write_report(options["output"], "downloads", config, results)
+        self.stdout.write(f"Report written to {options['output']}")
+
+    def make_document(self, owner, size):
+        """A document of `size` random bytes, stored the way completed uploads are."""
+        hasher = hashlib.sha256()
+        with tempfile.TemporaryFile() as scratch:
+            for offset in range(0, size, CHUNK):
+                chunk = os.urandom(min(CHUNK, size - offset))
+                hasher.update(chunk)
+                scratch.write(chunk)
+            scratch.seek(0)
+            sha256 = hasher.hexdigest()
+            name = default_storage.save(blob_name(sha256), File(scratch, name="bench-download.bin"))
+        return Document.objects.create(owner=owner, title="bench-download.bin", file=name, sha256=sha256)
+
+    async def run(self, document, options):
+        connection = await self.transport.open()
+        status, body = await self.transport.request(
+            connection, "POST", "/api/auth/login/", {"Content-Type": "application/json"}, json.dumps(LOGIN).encode()
+        )
+        await self.transport.close(connection)
+        if status != 200:
+            raise CommandError(f"Could not log in as {LOGIN['username']}: {status} {body[:200]!r}")
+        token = json.loads(body)["access"]
+
+        path = f"/api/documents/{document.pk}/download/"
+        size, span = options["size_mb"] * 1024 * 1024, options["range_kb"] * 1024
+        headers = {"Authorization": f"Bearer {token}"}
+
+        def ranged(i):
+            first = (i * span) % max(1, size - span)
+            return {**headers, "Range": f"bytes={first}-{first + span - 1}", "If-Range": f'"{document.sha256}"'}
+
+        results = {}
+        for mode, make_headers, expected in (("full", lambda i: headers, 200), ("range", ranged, 206)):
+            results[mode] = await self.load(path, make_headers, expected, options)
+            result = results[mode]
+            self.stdout.write(
+                f"{mode:6} {result['megabytes_per_sec']:9,.1f} MB/s  {result['requests_per_sec']:8,.1f} req/s  "
+                f"p99 {result['latency_ms']['p99']} ms  peak RSS {result['peak_rss_mb']} MB"
+            )
+            if result["failures"]:
+                self.stdout.write(f"{'':6} unexpected status: {result['failures']}")
+        return results
+
+    async def load(self, path, make_headers, expected, options):
+        """`requests` downloads from `concurrency` workers while sampling the server's RSS."""
+        pid = options["server_pid"] if options["url"] else os.getpid()
+        remaining, issued = options["requests"], 0
+        latencies, failures, received = [], {}, 0
+        peak = rss_bytes(pid) if pid else None
+
+        async def sample():
+            nonlocal peak
+            while True:
+                current = rss_bytes(pid)
+                if current is not None:
+                    peak = max(peak or 0, current)
+                await asyncio.sleep(0.05)
+
+        async def worker():
+            nonlocal remaining, issued, received
+            connection = await self.transport.open()
+            try:
+                while remaining > 0:
+                    remaining -= 1
+                    headers = make_headers(issued)
+                    issued += 1
+                    started = time.perf_counter()
+                    status, length = await self.transport.download(connection, path, headers)
+                    latencies.append(time.perf_counter() - started)
+                    received += length
+                    if status != expected:
+                        failures[status] = failures.get(status, 0) + 1
+            finally:
+                await self.transport.close(connection)
+
+        sampler = asyncio.create_task(sample()) if pid else None
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(min(options["concurrency"], options["requests"]))))
+        elapsed = time.perf_counter() - started
+        if sampler is not None:
+            sampler.cancel()
+        return {
+            "requests": options["requests"],
+            "bytes": received,
+            "duration_s": round(elapsed, 3),
+            "megabytes_per_sec": round(received / elapsed / 1024 / 1024, 1) if elapsed else None,
+            "requests_per_sec": round(options["requests"] / elapsed, 1) if elapsed else None,
+            "latency_ms": latency_summary(latencies),
+            "peak_rss_mb": round(peak / 1024 / 1024, 1) if peak else None,
+            "failures": {str(status): count for status, count in sorted(failures.items())},
+        }
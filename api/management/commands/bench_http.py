@@ -0,0 +1,194 @@
+import json
+import os
+import statistics
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.test.utils import override_settings
+from rest_framework.test import APIClient
+
+from api.benchmarking import SEED_PASSWORD, SEED_USER_PREFIX, latency_summary, query_stats, write_report
+from api.models import User, Meeting, Document, Transaction
+from api.response_cache import CACHE_ALIAS
+
+# name -> (method, path, body). `{meeting}` and `{next:<name>}` are resolved
+# against the seeded data before timing starts.
+ENDPOINTS = {
+    "meetings-list": ("GET", "/api/meetings/", None),
+    "meetings-next-page": ("GET", "{next:meetings-list}", None),
+    "meetings-detail": ("GET", "/api/meetings/{meeting}/", None),
+    "video-rooms-list": ("GET", "/api/video-rooms/", None),
+    "documents-list": ("GET", "/api/documents/", None),
+    "transactions-list": ("GET", "/api/transactions/", None),
+    "transactions-page-500": ("GET", "/api/transactions/?page_size=500", None),
+    "transactions-next-page": ("GET", "{next:transactions-list}", None),
+    "wallet": ("GET", "/api/wallet/", None),
+    "profile": ("GET", "/api/auth/profile/", None),
+    "login": ("POST", "/api/auth/login/", {"username": f"{SEED_USER_PREFIX}0", "password": SEED_PASSWORD}),
+    "login-email": ("POST", "/api/auth/login/", {"email": f"{SEED_USER_PREFIX}0@example.com", "password": SEED_PASSWORD}),
+}
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark the HTTP API against seeded data (see seed_benchmark_data). "
+        "Reports latency percentiles, query count, SQL time and response bytes "
+        "per endpoint, and compares them with a committed baseline. The "
+        "response cache (api.response_cache) is off while timing, so every "
+        "request takes the real read path; --warm-cache adds cache-hit runs."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--iterations", type=int, default=50)
+        parser.add_argument("--warmup", type=int, default=3)
+        parser.add_argument("--endpoints", nargs="+", choices=sorted(ENDPOINTS), help="Subset of endpoints to run.")
+        parser.add_argument("--output", default="benchmarks/http.json")
+        parser.add_argument("--baseline", default="benchmarks/baseline_http.json")
+        parser.add_argument("--tolerance", type=float, default=0.25,
+                            help="Allowed relative latency/bytes growth before flagging a regression.")
+        parser.add_argument("--update-baseline", action="store_true", help="Write this run as the new baseline.")
+        parser.add_argument("--fail-on-regression", action="store_true")
+        parser.add_argument("--warm-cache", action="store_true",
+                            help="Also time each endpoint served from the response cache, as `<name>:cached`.")
+
+    def handle(self, *args, **options):
+        user = User.objects.filter(username=f"{SEED_USER_PREFIX}0").first()
+        if user is None:
+            raise CommandError("No benchmark data; run `manage.py seed_benchmark_data` first.")
+
+        self.client = APIClient()
+        login = self.client.post("/api/auth/login/", ENDPOINTS["login"][2], format="json")
+        if login.status_code != 200:
+            raise CommandError(f"Could not log in as {user.username}: {login.status_code} {login.content[:200]!r}")
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {login.json()['access']}")
+
+        names = options["endpoints"] or list(ENDPOINTS)
+        results = {}
+        # Cache hits would hide the queries, latency and bytes the baseline gates on
+        responses = {**settings.CACHES, CACHE_ALIAS: {"BACKEND": "django.core.cache.backends.dummy.DummyCache"}}
+        with override_settings(CACHES=responses):
+            for name in names:
+                results[name] = self.measure(name, options["iterations"], options["warmup"])
+                self.report_line(name, results[name])
+        if options["warm_cache"]:
+            for name in names:
+                results[f"{name}:cached"] = self.measure(name, options["iterations"], options["warmup"])
+                self.report_line(f"{name}:cached", results[f"{name}:cached"])
+
+        config = {
+            "iterations": options["iterations"],
+            "warmup": options["warmup"],
+            "dataset": self.dataset(),
+        }
+        payload = write_report(options["output"], "http", config, results)
+        self.stdout.write(f"Report written to {options['output']}")
+
+        regressions = self.compare(payload, options["baseline"], options["tolerance"])
+        if options["update_baseline"]:
+            write_report(options["baseline"], "http", config, results)
+            self.stdout.write(f"Baseline updated: {options['baseline']}")
+        elif regressions and options["fail_on_regression"]:
+            raise CommandError(f"{len(regressions)} regression(s) against {options['baseline']}")
+
+    def dataset(self):
+        return {
+            "users": User.objects.count(),
+            "meetings": Meeting.objects.count(),
+            "documents": Document.objects.count(),
+            "transactions": Transaction.objects.count(),
+        }
+
+    def resolve(self, path):
+        if path.startswith("{next:"):
+            _, first, _ = ENDPOINTS[path[6:-1]]
+            return self.client.get(self.resolve(first)).json()["next"]
+        if "{meeting}" in path:
+            meeting = Meeting.objects.order_by("start_time", "id").values_list("id", flat=True).first()
+            return path.format(meeting=meeting)
+        return path
+
+    def request(self, method, path, body):
+        if method == "GET":
+            return self.client.get(path)
+        return self.client.generic(method, path, json.dumps(body), content_type="application/json")
+
+    def measure(self, name, iterations, warmup):
+        method, path, body = ENDPOINTS[name]
+        path = self.resolve(path)
+        if path is None:
+            return {"path": None, "skipped": "no next page in this dataset"}
+
+        for _ in range(warmup):
+            self.request(method, path, body)
+
+        latencies, sql_times, query_counts = [], [], []
+        status_codes = set()
+        response = None
+        for _ in range(iterations):
+            with query_stats() as queries:
+                start = time.perf_counter()
+                response = self.request(method, path, body)
+                latencies.append(time.perf_counter() - start)
+            status_codes.add(response.status_code)
+            query_counts.append(queries.count)
+            sql_times.append(queries.seconds)
+
+        return {
+            "path": path,
+            "method": method,
+            "status": sorted(status_codes),
+            "latency_ms": latency_summary(latencies),
+            "queries": max(query_counts),
+            "sql_ms": round(statistics.median(sql_times) * 1000, 3),
+            "bytes": len(response.content),
+        }
+
+    def report_line(self, name, result):
+        if "skipped" in result:
+            self.stdout.write(f"{name:<24} skipped: {result['skipped']}")
+            return
+        latency = result["latency_ms"]
+        self.stdout.write(
+            f"{name:<24} p50 {latency['p50']:>8.2f} ms  p95 {latency['p95']:>8.2f} ms  "
+            f"p99 {latency['p99']:>8.2f} ms  {result['queries']:>2} queries  "
+            f"sql {result['sql_ms']:>7.2f} ms  {result['bytes']:>8,} B  {result['status']}"
+        )
+
+    def compare(self, payload, baseline_path, tolerance):
+        """Print a diff against the baseline; return the list of regressions."""
+        if not os.path.exists(baseline_path):
+            self.stdout.write(f"No baseline at {baseline_path}; run with --update-baseline to create one.")
+            return []
+        with open(baseline_path) as fh:
+            baseline = json.load(fh)
+
+        if baseline["config"].get("dataset") != payload["config"]["dataset"]:
+            self.stdout.write(self.style.WARNING(
+                f"Dataset differs from the baseline ({baseline['config'].get('dataset')}); "
+                "latency and bytes are not directly comparable."
+            ))
+
+        regressions = []
+        self.stdout.write(f"\nAgainst {baseline_path} ({baseline['meta'].get('git')}):")
+        for name, current in payload["results"].items():
+            before = baseline["results"].get(name)
+            if before is None or "skipped" in before or "skipped" in current:
+                continue
+            # Gate on the median: tail percentiles of a short run are mostly scheduler noise
+            problems = []
+            if current["latency_ms"]["p50"] > before["latency_ms"]["p50"] * (1 + tolerance):
+                problems.append(f"p50 {before['latency_ms']['p50']} -> {current['latency_ms']['p50']} ms")
+            if current["queries"] > before["queries"]:
+                problems.append(f"queries {before['queries']} -> {current['queries']}")
+            if current["bytes"] > before["bytes"] * (1 + tolerance):
+                problems.append(f"bytes {before['bytes']} -> {current['bytes']}")
+
+            ratio = current["latency_ms"]["p50"] / before["latency_ms"]["p50"] if before["latency_ms"]["p50"] else 0
+            line = f"  {name:<24} p50 x{ratio:.2f}"
+            if problems:
+                regressions.append((name, problems))
+                self.stdout.write(self.style.ERROR(f"{line}  REGRESSION: {'; '.join(problems)}"))
+            else:
+                self.stdout.write(line)
+        return regressions
@@ -0,0 +1,114 @@
+import random
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from api import search
+from api.benchmarking import latency_summary, write_report
+from api.models import User
+
+SECTORS = ["fintech", "climate", "health", "edtech", "logistics", "saas", "retail", "agritech", "biotech", "mobility"]
+SYLLABLES = ["ka", "lo", "ri", "ten", "mar", "so", "vi", "nex", "tra", "dor", "pa", "len", "qu", "zen", "fi", "ro"]
+
+
+class Command(BaseCommand):
+    help = (
+        "Discovery search latency: the full-text index (api.search backend) "
+        "against the icontains scan it replaces, plus rebuild and per-save "
+        "index cost. Seeds users inside a transaction that is rolled back, "
+        "so the database is left untouched."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--users", type=int, default=50000)
+        parser.add_argument("--queries", type=int, default=300)
+        parser.add_argument("--limit", type=int, default=20)
+        parser.add_argument("--vocabulary", type=int, default=20000,
+                            help="Distinct words in profiles, used with Zipf frequencies as in real text.")
+        parser.add_argument("--selective", type=float, default=1.0,
+                            help="Queries matching at most this percentage of users count as selective.")
+        parser.add_argument("--seed", type=int, default=42)
+        parser.add_argument("--output", default="benchmarks/search.json")
+
+    def handle(self, *args, **options):
+        self.rng = random.Random(options["seed"])
+        self.vocabulary = self.words(options["vocabulary"])
+        self.weights = [1 / rank for rank in range(1, len(self.vocabulary) + 1)]
+        index, scan = search.backend(), search.ScanBackend()
+        with transaction.atomic():
+            user_ids = self.seed(options["users"])
+            began = time.perf_counter()
+            index.rebuild()
+            results = {"backend": type(index).__name__, "users": len(user_ids),
+                       "rebuild_s": round(time.perf_counter() - began, 3)}
+            self.stdout.write(f"rebuild {len(user_ids):,} users: {results['rebuild_s']} s")
+
+            # Ranking reads every hit, scanning stops at `limit`: split by how many users match
+            queries = [self.query() for _ in range(options["queries"])]
+            selective = len(user_ids) * options["selective"] / 100
+            kinds = ["selective" if len(scan.search(words, role, limit=None)) <= selective else "broad"
+                     for words, role in queries]
+            for label, backend in (("index", index), ("scan", scan)):
+                latencies = {"all": [], "selective": [], "broad": []}
+                for (words, role), kind in zip(queries, kinds):
+                    began = time.perf_counter()
+                    backend.search(words, role, options["limit"])
+                    elapsed = time.perf_counter() - began
+                    latencies["all"].append(elapsed)
+                    latencies[kind].append(elapsed)
+                results[label] = {kind: latency_summary(values) for kind, values in latencies.items()}
+                for kind, summary in results[label].items():
+                    self.stdout.write(f"{label:<5} {kind:<9} ({len(latencies[kind]):>4} queries) {summary}")
+            results["selective_queries"] = kinds.count("selective")
+            results["speedup_p50"] = {
+                kind: round(results["scan"][kind]["p50"] / results["index"][kind]["p50"], 1)
+                for kind in ("all", "selective", "broad") if results["index"][kind]["p50"]
+            }
+            self.stdout.write(f"speedup at p50: {results['speedup_p50']}")
+
+            # What a profile edit adds to its save
+            users = list(User.objects.filter(pk__in=self.rng.sample(user_ids, min(200, len(user_ids)))))
+            latencies = []
+            for user in users:
+                began = time.perf_counter()
+                index.index([user])
+                latencies.append(time.perf_counter() - began)
+            results["index_one_ms"] = latency_summary(latencies)
+            self.stdout.write(f"index one user: {results['index_one_ms']}")
+            transaction.set_rollback(True)
+
+        config = {key: options[key] for key in ("users", "queries", "limit", "vocabulary", "selective")}
+        write_report(options["output"], "search", config, results)
+        self.stdout.write(f"Report written to {options['output']}")
+
+    def query(self):
+        """One to two profile words, sometimes only a prefix, some filtered by role."""
+        words = self.draw(self.rng.choice([1, 1, 2]))
+        if self.rng.random() < 0.3:
+            words[-1] = words[-1][:3]
+        return words, self.rng.choice([None, "investor", "entrepreneur"])
+
+    def words(self, count):
+        words = dict.fromkeys(SECTORS)
+        while len(words) < count:
+            words["".join(self.rng.choice(SYLLABLES) for _ in range(self.rng.randint(2, 4)))] = None
+        return list(words)
+
+    def draw(self, count):
+        return self.rng.choices(self.vocabulary, self.weights, k=count)
+
+    def text(self, low, high):
+        return " ".join(self.draw(self.rng.randint(low, high)))
+
+    def seed(self, count):
+        prefix = f"search_{self.rng.randrange(1 << 30)}_"
+        self.stdout.write(f"Seeding {count:,} users...")
+        User.objects.bulk_create(
+            [User(username=f"{prefix}{i}", email=f"{prefix}{i}@example.com",
+                  role=self.rng.choice(["investor", "entrepreneur"]),
+                  bio=self.text(5, 30), portfolio=self.text(0, 15) or None)
+             for i in range(count)],
+            batch_size=2000,
+        )
+        return list(User.objects.filter(username__startswith=prefix).values_list("id", flat=True))
@@ -0,0 +1,122 @@
+import time
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+from api.benchmarking import write_report
+from api.fieldsets import Fieldset
+from api.models import User, Meeting, Document, Transaction
+from api.querysets import meeting_queryset, document_queryset, transaction_queryset
+from api.serializers import FastMeetingSerializer, FastDocumentSerializer, FastTransactionSerializer
+
+CASES = [
+    ("meetings", FastMeetingSerializer, meeting_queryset, ("start_time", "id")),
+    ("documents", FastDocumentSerializer, document_queryset, ("-uploaded_at", "-id")),
+    ("transactions", FastTransactionSerializer, transaction_queryset, ("-created_at", "-id")),
+]
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare rows/second of the ModelSerializer list path against the "
+        "FastReadSerializer path. Seeds data inside a transaction that is "
+        "rolled back, so the database is left untouched."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rows", type=int, nargs="+", default=[1000, 10000, 100000])
+        parser.add_argument("--repeat", type=int, default=3, help="Best of N runs per measurement.")
+        parser.add_argument("--participants", type=int, default=3)
+        parser.add_argument("--output", help="Write results as JSON to this path.")
+
+    def handle(self, *args, **options):
+        sizes = sorted(options["rows"])
+        results = []
+        with transaction.atomic():
+            self.seed(sizes[-1], options["participants"])
+            request = Request(APIRequestFactory().get("/api/"))
+            for size in sizes:
+                for name, fast_class, builder, ordering in CASES:
+                    # The full payload: every nested user expanded
+                    fieldset = Fieldset(expand=[*fast_class.nested_users, *fast_class.many_users])
+                    context = {"request": request, "fieldset": fieldset}
+                    queryset = builder(fieldset).order_by(*ordering)
+                    fast = fast_class(context=context)
+                    model_path = lambda: fast.serializer_class(list(queryset[:size]), many=True, context=context).data
+                    fast_path = lambda: fast.to_representation(fast.values(queryset)[:size])
+                    slow = self.best_of(model_path, options["repeat"])
+                    quick = self.best_of(fast_path, options["repeat"])
+                    results.append({
+                        "endpoint": name,
+                        "rows": size,
+                        "model_serializer_rows_per_sec": round(size / slow),
+                        "fast_serializer_rows_per_sec": round(size / quick),
+                        "speedup": round(slow / quick, 2),
+                    })
+                    self.stdout.write(
+                        f"{name:<13} {size:>7} rows  model {size / slow:>10,.0f} rows/s  "
+                        f"fast {size / quick:>10,.0f} rows/s  x{slow / quick:.2f}"
+                    )
+            transaction.set_rollback(True)
+
+        if options["output"]:
+            config = {key: options[key] for key in ("rows", "repeat", "participants")}
+            write_report(options["output"], "serializers", config, results)
+
+    def best_of(self, fn, repeat):
+        best = None
+        for _ in range(repeat):
+            start = time.perf_counter()
+            fn()
+            elapsed = time.perf_counter() - start
+            best = elapsed if best is None else min(best, elapsed)
+        return best
+
+    def seed(self, count, participants):
+        self.stdout.write(f"Seeding {count} meetings, documents and transactions...")
+        now = timezone.now()
+        users = User.objects.bulk_create([
+            User(
+                username=f"bench_{i}",
+                email=f"bench_{i}@example.com",
+                role="investor" if i % 2 else "entrepreneur",
+                bio="Early-stage investor focused on fintech and climate.",
+                preferences={"sectors": ["fintech", "climate"], "ticket": 25000},
+            )
+            for i in range(max(count // 10, participants + 1))
+        ], batch_size=2000)
+        ids = [user.id for user in users]
+
+        meetings = Meeting.objects.bulk_create([
+            Meeting(
+                title=f"Pitch {i}",
+                organizer_id=ids[i % len(ids)],
+                start_time=now + timedelta(minutes=i),
+                end_time=now + timedelta(minutes=i + 30),
+            )
+            for i in range(count)
+        ], batch_size=2000)
+        Through = Meeting.participants.through
+        Through.objects.bulk_create([
+            Through(meeting_id=meeting.id, user_id=ids[(n + k + 1) % len(ids)])
+            for n, meeting in enumerate(meetings)
+            for k in range(participants)
+        ], batch_size=5000)
+
+        Document.objects.bulk_create([
+            Document(owner_id=ids[i % len(ids)], file=f"documents/deck_{i}.pdf", title=f"Deck {i}")
+            for i in range(count)
+        ], batch_size=2000)
+        Transaction.objects.bulk_create([
+            Transaction(
+                sender_id=ids[i % len(ids)],
+                receiver_id=ids[(i + 1) % len(ids)],
+                transaction_type="transfer",
+                amount="125.50",
+            )
+            for i in range(count)
+        ], batch_size=2000)
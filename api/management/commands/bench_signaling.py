@@ -0,0 +1,268 @@
+import asyncio
+import json
+import time
+import tracemalloc
+
+import msgpack
+from channels.routing import URLRouter
+from channels.testing import WebsocketCommunicator
+from django.core.management.base import BaseCommand, CommandError
+
+from api.benchmarking import latency_summary, rss_bytes, write_report
+from api.routing import websocket_urlpatterns
+
+
+# -------------------------
+# Transports
+# -------------------------
+class CommunicatorTransport:
+    """In-process: drives MeetingConsumer through Channels' WebsocketCommunicator."""
+
+    def __init__(self, room, subprotocols):
+        self.comm = WebsocketCommunicator(
+            URLRouter(websocket_urlpatterns), f"/ws/meetings/{room}/", subprotocols=subprotocols
+        )
+
+    async def connect(self):
+        connected, subprotocol = await self.comm.connect(timeout=10)
+        if not connected:
+            raise CommandError("Consumer rejected the connection")
+        return subprotocol
+
+    async def send(self, text=None, data=None):
+        await self.comm.send_to(text_data=text, bytes_data=data)
+
+    async def recv(self):
+        frame = await self.comm.receive_output(timeout=3600)
+        if frame["type"] != "websocket.send":
+            raise ConnectionError(frame)
+        return frame.get("text") if frame.get("text") is not None else frame.get("bytes")
+
+    async def close(self):
+        await self.comm.disconnect()
+
+
+class SocketTransport:
+    """Real sockets against a running daphne (`--url ws://host:port`)."""
+
+    def __init__(self, base_url, room, subprotocols):
+        self.url = f"{base_url.rstrip('/')}/ws/meetings/{room}/"
+        self.subprotocols = subprotocols
+        self.ws = None
+
+    async def connect(self):
+        import websockets
+
+        self.ws = await websockets.connect(self.url, subprotocols=self.subprotocols or None, max_queue=None)
+        return self.ws.subprotocol
+
+    async def send(self, text=None, data=None):
+        await self.ws.send(text if text is not None else data)
+
+    async def recv(self):
+        return await self.ws.recv()
+
+    async def close(self):
+        await self.ws.close()
+
+
+# -------------------------
+# Simulated peer
+# -------------------------
+class Peer:
+    """
+    A scripted WebRTC client: offers to its assigned peers, answers offers,
+    and trickles `candidates` candidates after each offer/answer. Every
+    payload carries a send timestamp so the receiver can record latency.
+    """
+
+    def __init__(self, bench, transport):
+        self.bench = bench
+        self.transport = transport
+        self.peer_id = None
+        self.binary = False
+        self.known = set()
+        self.roster_ready = asyncio.Event()
+        self.reader = None
+        self.answering = set()   # answer tasks in flight; the loop only keeps weak references
+
+    async def connect(self, room_size):
+        self.binary = (await self.transport.connect()) == "signal.msgpack"
+        self.room_size = room_size
+        welcome = self.decode(await self.transport.recv())
+        self.peer_id = welcome["peer_id"]
+        if room_size == 1:
+            self.roster_ready.set()
+        self.reader = asyncio.create_task(self.read_loop())
+
+    def encode(self, message):
+        if self.binary:
+            return {"data": msgpack.packb(message, use_bin_type=True)}
+        return {"text": json.dumps(message)}
+
+    def decode(self, frame):
+        return msgpack.unpackb(frame, raw=False) if isinstance(frame, bytes) else json.loads(frame)
+
+    async def send(self, message):
+        self.bench.frames_sent += 1
+        await self.transport.send(**self.encode(message))
+
+    async def signal(self, kind, target):
+        await self.send({"type": kind, "to": target, "sdp": self.bench.sdp, "t": time.perf_counter()})
+        for n in range(self.bench.candidates):
+            await self.send({
+                "type": "candidate", "to": target, "sdpMid": "0", "sdpMLineIndex": 0,
+                "candidate": f"candidate:{n} 1 udp 2122260223 10.0.0.1 {50000 + n} typ host",
+                "t": time.perf_counter(),
+            })
+
+    async def read_loop(self):
+        while True:
+            message = self.decode(await self.transport.recv())
+            now = time.perf_counter()
+            kind = message["type"]
+            if kind == "peer-joined":
+                self.known.add(message["peer_id"])
+                if len(self.known) == self.room_size - 1:
+                    self.roster_ready.set()
+            elif kind in ("offer", "answer"):
+                self.bench.record(now - message["t"])
+                if kind == "offer":
+                    task = asyncio.create_task(self.signal("answer", message["from"]))
+                    self.answering.add(task)
+                    task.add_done_callback(self.answering.discard)
+            elif kind == "candidates":
+                for candidate in message["candidates"]:
+                    self.bench.record(now - candidate["t"])
+            elif kind == "error":
+                self.bench.errors += 1
+
+    async def close(self):
+        if self.reader is not None:
+            self.reader.cancel()
+        await self.transport.close()
+
+
+# -------------------------
+# Command
+# -------------------------
+class Command(BaseCommand):
+    help = (
+        "Load-test MeetingConsumer signaling: N rooms x M peers exchanging "
+        "offer/answer/candidate. Reports delivery latency percentiles, "
+        "messages/sec and memory per connection as JSON."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rooms", type=int, default=20)
+        parser.add_argument("--peers", type=int, default=4, help="Peers per room (full mesh).")
+        parser.add_argument("--rounds", type=int, default=3, help="Offer/answer rounds per peer pair.")
+        parser.add_argument("--candidates", type=int, default=8, help="ICE candidates trickled per offer/answer.")
+        parser.add_argument("--encoding", choices=["json", "msgpack"], default="json")
+        parser.add_argument("--url", help="ws://host:port of a running daphne; default is in-process.")
+        parser.add_argument("--server-pid", type=int, help="With --url: daphne pid, to measure its RSS per connection.")
+        parser.add_argument("--timeout", type=float, default=120.0)
+        parser.add_argument("--output", default="benchmarks/signaling.json")
+
+    def handle(self, *args, **options):
+        self.sdp = "v=0\r\no=- 0 0 IN IP4 127.0.0.1\r\ns=-\r\nt=0 0\r\n" * 8
+        self.candidates = options["candidates"]
+        self.latencies = []
+        self.frames_sent = 0
+        self.errors = 0
+        self.delivered = 0
+        self.done = None
+
+        results = asyncio.run(self.run(options))
+        config = {
+            key: options[key]
+            for key in ("rooms", "peers", "rounds", "candidates", "encoding", "url", "server_pid", "timeout")
+        }
+        config["mode"] = "socket" if options["url"] else "communicator"
+        write_report(options["output"], "signaling", config, results)
+
+        latency = results["latency_ms"]
+        self.stdout.write(
+            f"{results['connections']} connections, {results['messages']} messages in "
+            f"{results['duration_s']:.2f}s → {results['messages_per_sec']:,.0f} msg/s; "
+            f"latency p50 {latency['p50']} ms, p95 {latency['p95']} ms, p99 {latency['p99']} ms; "
+            f"{results['memory_per_connection_bytes']} B/connection"
+        )
+        self.stdout.write(f"Report written to {options['output']}")
+
+    def record(self, latency):
+        self.latencies.append(latency)
+        self.delivered += 1
+        if self.delivered >= self.expected:
+            self.done.set()
+
+    def transport(self, options, room):
+        subprotocols = ["signal.msgpack"] if options["encoding"] == "msgpack" else []
+        if options["url"]:
+            return SocketTransport(options["url"], room, subprotocols)
+        return CommunicatorTransport(room, subprotocols)
+
+    async def run(self, options):
+        rooms, size, rounds = options["rooms"], options["peers"], options["rounds"]
+        pairs = size * (size - 1) // 2
+        # per pair and round: offer + answer, each followed by `candidates` candidates
+        self.expected = rooms * pairs * rounds * 2 * (1 + self.candidates)
+        self.done = asyncio.Event()
+        if self.expected == 0:
+            self.done.set()
+
+        tracemalloc.start()
+        before = self.memory(options)
+        all_rooms = []
+        for r in range(rooms):
+            peers = []
+            for _ in range(size):   # join one by one so presence settles deterministically
+                peer = Peer(self, self.transport(options, f"bench{r}"))
+                await peer.connect(size)
+                peers.append(peer)
+            all_rooms.append(peers)
+        await asyncio.wait_for(
+            asyncio.gather(*(p.roster_ready.wait() for peers in all_rooms for p in peers)), options["timeout"]
+        )
+        after = self.memory(options)
+        tracemalloc.stop()
+        memory = None if None in (before, after) else (after - before) // max(1, rooms * size)
+
+        start = time.perf_counter()
+        await asyncio.gather(*(self.drive_room(peers, rounds) for peers in all_rooms))
+        try:
+            await asyncio.wait_for(self.done.wait(), options["timeout"])
+        except asyncio.TimeoutError:
+            raise CommandError(f"Timed out: {self.delivered}/{self.expected} messages delivered")
+        duration = time.perf_counter() - start
+        # Every answer arrived; let their tasks finish, raising anything that failed
+        await asyncio.gather(*(task for peers in all_rooms for peer in peers for task in list(peer.answering)))
+
+        for peers in all_rooms:
+            for peer in peers:
+                await peer.close()
+
+        return {
+            "connections": rooms * size,
+            "messages": self.delivered,
+            "frames_sent": self.frames_sent,
+            "errors": self.errors,
+            "duration_s": round(duration, 4),
+            "messages_per_sec": round(self.delivered / duration, 1) if duration else None,
+            "latency_ms": latency_summary(self.latencies),
+            "memory_per_connection_bytes": memory,
+        }
+
+    def memory(self, options):
+        """Server-side memory: traced Python heap in-process, daphne RSS over sockets."""
+        if options["url"]:
+            return rss_bytes(options["server_pid"]) if options["server_pid"] else None
+        return tracemalloc.get_traced_memory()[0]
+
+    async def drive_room(self, peers, rounds):
+        for _ in range(rounds):
+            await asyncio.gather(*(
+                peers[i].signal("offer", peers[j].peer_id)
+                for i in range(len(peers))
+                for j in range(i + 1, len(peers))
+            ))
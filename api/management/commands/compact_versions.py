@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand
+
+from api import versions
+
+
+class Command(BaseCommand):
+    help = (
+        "Re-store older document versions as deltas from the next one "
+        "(api.versions). Uploads only record versions, so run it periodically "
+        "(e.g. from cron) to reclaim their space."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--limit", type=int, default=None, help="Compact at most this many versions.")
+
+    def handle(self, *args, **options):
+        checked, compacted, failed = versions.compact_pending(options["limit"])
+        for version, error in failed:
+            self.stderr.write(f"Version {version.number} of document {version.document_id}: {error}")
+        self.stdout.write(f"Compacted {compacted} of {checked} document versions")
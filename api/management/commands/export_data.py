@@ -0,0 +1,52 @@
+import sys
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from api import exports
+
+
+def aware(raw):
+    value = parse_datetime(raw)
+    if value is None:
+        raise CommandError(f"Expected an ISO 8601 datetime, got {raw!r}.")
+    return timezone.make_aware(value) if timezone.is_naive(value) else value
+
+
+class Command(BaseCommand):
+    help = (
+        "Stream transactions, meetings or documents to a CSV or NDJSON file "
+        "(default stdout) a chunk at a time; same output as GET /api/exports/<dataset>/."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("dataset", choices=list(exports.EXPORTS))
+        parser.add_argument("--output", choices=list(exports.OUTPUTS), default="csv")
+        parser.add_argument("--since", type=aware, help="Only rows on or after this datetime.")
+        parser.add_argument("--until", type=aware, help="Only rows before this datetime.")
+        parser.add_argument("--file", help="Write here instead of stdout.")
+        parser.add_argument("--chunk-size", type=int, default=exports.CHUNK_SIZE)
+
+    def handle(self, *args, **options):
+        stream = exports.export_stream(
+            options["dataset"], options["output"],
+            since=options["since"], until=options["until"], chunk_size=options["chunk_size"],
+        )
+        target = open(options["file"], "wb") if options["file"] else sys.stdout.buffer
+        started = time.perf_counter()
+        written = 0
+        try:
+            for piece in stream:
+                target.write(piece)
+                written += len(piece)
+        finally:
+            if options["file"]:
+                target.close()
+            else:
+                target.flush()
+        if options["file"]:
+            self.stderr.write(
+                f"Wrote {written:,} bytes to {options['file']} in {time.perf_counter() - started:.1f}s"
+            )
@@ -0,0 +1,48 @@
+import json
+import sys
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from api import ingest
+
+
+class Command(BaseCommand):
+    help = (
+        "Import transactions from an NDJSON (one object per line) or JSON "
+        "array file through the ledger, in batches. Same rules and error "
+        "report as POST /api/transactions/bulk/. Use '-' to read stdin."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("path")
+        parser.add_argument("--batch-size", type=int, default=1000)
+        parser.add_argument("--max-errors", type=int, default=1000, help="Errors kept in the report.")
+        parser.add_argument("--report", help="Write the full summary (with per-row errors) as JSON here.")
+
+    def handle(self, *args, **options):
+        try:
+            source = sys.stdin.buffer if options["path"] == "-" else open(options["path"], "rb")
+        except OSError as exc:
+            raise CommandError(exc)
+
+        with source:
+            first = source.peek(64).lstrip()[:1]
+            if first == b"[":
+                # A JSON array has to be parsed whole; prefer NDJSON for large imports
+                rows = json.load(source)
+            else:
+                rows = ingest.ndjson_rows(source)
+            started = time.perf_counter()
+            summary = ingest.ingest(rows, batch_size=options["batch_size"], max_errors=options["max_errors"])
+        elapsed = time.perf_counter() - started
+
+        self.stdout.write(
+            f"{summary['received']:,} rows: {summary['created']:,} posted, {summary['failed']:,} failed "
+            f"in {elapsed:.1f}s ({summary['received'] / elapsed if elapsed else 0:,.0f} rows/s)"
+        )
+        for error in summary["errors"][:20]:
+            self.stderr.write(f"row {error['row']}: {json.dumps(error['errors'])}")
+        if options["report"]:
+            with open(options["report"], "w") as fh:
+                json.dump(summary, fh, indent=2)
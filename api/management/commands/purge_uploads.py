@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+
+from api.uploads import purge_expired
+
+
+class Command(BaseCommand):
+    help = (
+        "Discard chunked uploads started more than UPLOAD_EXPIRY seconds ago "
+        "and delete their partial files. Run it periodically (e.g. from cron)."
+    )
+
+    def handle(self, *args, **options):
+        self.stdout.write(f"Discarded {purge_expired()} expired uploads")
@@ -0,0 +1,116 @@
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from api.ledger import CENT, checkpoint_interval
+from api.models import Wallet, LedgerEntry, WalletCheckpoint
+
+
+class Command(BaseCommand):
+    help = (
+        "Recompute every wallet from its full ledger history and verify the "
+        "stored balance, entry count and each WalletCheckpoint against it. "
+        "With --rebuild, rewrite entry counts and checkpoints from the ledger "
+        "instead (e.g. after upgrading or a bulk import)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rebuild", action="store_true")
+        parser.add_argument("--batch-size", type=int, default=5000)
+
+    def handle(self, *args, **options):
+        self.batch_size = options["batch_size"]
+        if options["rebuild"]:
+            self.rebuild()
+        else:
+            self.verify()
+
+    def history(self):
+        """Yield (wallet_id, [(entry_id, amount, created_at), ...]) in wallet order, streaming."""
+        rows = (
+            LedgerEntry.objects.order_by("wallet_id", "id")
+            .values_list("wallet_id", "id", "amount", "created_at")
+            .iterator(chunk_size=self.batch_size)
+        )
+        wallet_id, entries = None, []
+        for row in rows:
+            if row[0] != wallet_id:
+                if wallet_id is not None:
+                    yield wallet_id, entries
+                wallet_id, entries = row[0], []
+            entries.append(row[1:])
+        if wallet_id is not None:
+            yield wallet_id, entries
+
+    def verify(self):
+        wallets = {w["id"]: w for w in Wallet.objects.values("id", "balance", "entry_count")}
+        checkpoints = {}
+        for checkpoint in WalletCheckpoint.objects.values("wallet_id", "entry_id", "balance", "entry_count"):
+            checkpoints.setdefault(checkpoint["wallet_id"], {})[checkpoint["entry_id"]] = checkpoint
+
+        problems = []
+        seen = set()
+        checked = 0
+        for wallet_id, entries in self.history():
+            seen.add(wallet_id)
+            expected = checkpoints.pop(wallet_id, {})
+            balance = Decimal(0)
+            for count, (entry_id, amount, _) in enumerate(entries, start=1):
+                balance += amount
+                checkpoint = expected.pop(entry_id, None)
+                if checkpoint is None:
+                    continue
+                checked += 1
+                if checkpoint["balance"] != balance or checkpoint["entry_count"] != count:
+                    problems.append(
+                        f"wallet {wallet_id}: checkpoint at entry {entry_id} says "
+                        f"{checkpoint['balance']} after {checkpoint['entry_count']} entries, "
+                        f"ledger says {balance} after {count}"
+                    )
+            for entry_id in expected:
+                problems.append(f"wallet {wallet_id}: checkpoint points at foreign entry {entry_id}")
+            wallet = wallets.get(wallet_id)
+            if wallet["balance"] != balance.quantize(CENT) or wallet["entry_count"] != len(entries):
+                problems.append(
+                    f"wallet {wallet_id}: stored {wallet['balance']} / {wallet['entry_count']} entries, "
+                    f"ledger {balance} / {len(entries)}"
+                )
+
+        for wallet_id, wallet in wallets.items():
+            if wallet_id not in seen and (wallet["balance"] or wallet["entry_count"]):
+                problems.append(f"wallet {wallet_id}: stored {wallet['balance']} with no ledger entries")
+
+        self.stdout.write(f"Checked {len(wallets)} wallets and {checked} checkpoints.")
+        if problems:
+            for problem in problems[:50]:
+                self.stderr.write(problem)
+            raise CommandError(f"{len(problems)} discrepancies found.")
+        self.stdout.write(self.style.SUCCESS("All wallets reconcile."))
+
+    def rebuild(self):
+        interval = checkpoint_interval()
+        created = 0
+        with transaction.atomic():
+            WalletCheckpoint.objects.all().delete()
+            Wallet.objects.update(entry_count=0)
+            counts, batch = [], []
+            for wallet_id, entries in self.history():
+                balance = Decimal(0)
+                for count, (entry_id, amount, created_at) in enumerate(entries, start=1):
+                    balance += amount
+                    if count % interval == 0:
+                        batch.append(WalletCheckpoint(
+                            wallet_id=wallet_id, entry_id=entry_id, balance=balance,
+                            entry_count=count, as_of=created_at,
+                        ))
+                counts.append(Wallet(pk=wallet_id, entry_count=len(entries)))
+                if len(batch) >= self.batch_size:
+                    created += len(WalletCheckpoint.objects.bulk_create(batch))
+                    batch = []
+                if len(counts) >= self.batch_size:
+                    Wallet.objects.bulk_update(counts, ["entry_count"], batch_size=500)
+                    counts = []
+            created += len(WalletCheckpoint.objects.bulk_create(batch))
+            Wallet.objects.bulk_update(counts, ["entry_count"], batch_size=500)
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt {created} checkpoints (every {interval} entries)."))
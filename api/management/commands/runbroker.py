@@ -0,0 +1,22 @@
+import asyncio
+
+from django.core.management.base import BaseCommand
+
+from api.broker import DEFAULT_PORT, BrokerServer
+
+
+class Command(BaseCommand):
+    help = "Run a channel-layer broker for api.broker.BrokerChannelLayer (see CHANNEL_BROKER_HOSTS)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--host", default="0.0.0.0")
+        parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+        parser.add_argument("--sweep-interval", type=float, default=1.0, help="Seconds between expiry sweeps.")
+
+    def handle(self, *args, **options):
+        server = BrokerServer(options["host"], options["port"], options["sweep_interval"])
+        self.stdout.write(f"Channel broker listening on {options['host']}:{options['port']}")
+        try:
+            asyncio.run(server.serve_forever())
+        except KeyboardInterrupt:
+            pass
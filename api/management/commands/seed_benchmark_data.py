@@ -0,0 +1,245 @@
+import random
+import time
+from datetime import timedelta
+from decimal import Decimal
+from itertools import islice
+
+from django.contrib.auth.hashers import make_password
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from api import response_cache
+from api.benchmarking import SEED_PASSWORD, SEED_USER_PREFIX
+from api.models import (
+    User, Wallet, Meeting, VideoRoom, Document, DocumentSignature, Transaction, LedgerEntry,
+)
+
+SECTORS = ["fintech", "climate", "health", "edtech", "logistics", "saas", "retail", "agritech"]
+TRANSACTION_WEIGHTS = [("transfer", 6), ("deposit", 3), ("withdraw", 1)]
+
+
+def chunked(iterable, size):
+    iterator = iter(iterable)
+    while batch := list(islice(iterator, size)):
+        yield batch
+
+
+class Command(BaseCommand):
+    help = (
+        "Fill the database with a realistic synthetic dataset for `bench_http`: "
+        "users with wallets, meetings with participants and video rooms, "
+        "documents with signatures, and transactions. Deterministic for a "
+        "given --seed. Use DATABASE_NAME to seed a scratch database."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--users", type=int, default=100_000)
+        parser.add_argument("--meetings", type=int, default=200_000)
+        parser.add_argument("--participants", type=int, default=4, help="Max participants per meeting.")
+        parser.add_argument("--documents", type=int, default=50_000)
+        parser.add_argument("--signatures", type=int, default=3, help="Max signatures per document.")
+        parser.add_argument("--transactions", type=int, default=1_000_000)
+        parser.add_argument("--scale", type=float, default=1.0, help="Multiply every count, e.g. 0.01 for a smoke run.")
+        parser.add_argument("--batch-size", type=int, default=5000)
+        parser.add_argument("--seed", type=int, default=42)
+        parser.add_argument("--flush", action="store_true", help="Delete previously seeded data first.")
+
+    def handle(self, *args, **options):
+        scale = options["scale"]
+        counts = {
+            key: max(1, int(options[key] * scale))
+            for key in ("users", "meetings", "documents", "transactions")
+        }
+        counts["users"] = max(counts["users"], options["participants"] + 1, options["signatures"] + 1, 2)
+        self.batch_size = options["batch_size"]
+        self.rng = random.Random(options["seed"])
+        self.now = timezone.now()
+
+        seeded = User.objects.filter(username__startswith=SEED_USER_PREFIX)
+        if seeded.exists():
+            if not options["flush"]:
+                raise CommandError("Benchmark data already present; pass --flush to replace it.")
+            self.flush(seeded)
+
+        started = time.perf_counter()
+        user_ids = self.seed_users(counts["users"])
+        meeting_ids = self.seed_meetings(counts["meetings"], user_ids, options["participants"])
+        self.seed_video_rooms(meeting_ids)
+        self.seed_documents(counts["documents"], user_ids, options["signatures"])
+        self.seed_transactions(counts["transactions"], user_ids)
+        call_command("reconcile_wallets", rebuild=True, stdout=self.stdout)
+        call_command("rebuild_search_index", stdout=self.stdout)
+        # Everything went in through bulk_create, which sends no signals
+        for model in (User, Meeting, VideoRoom, Document, Transaction):
+            response_cache.invalidate(model)
+        self.stdout.write(self.style.SUCCESS(f"Seeded in {time.perf_counter() - started:.1f}s"))
+
+    # ---------------- helpers ----------------
+
+    def insert(self, model, objects, label, total, save=None):
+        """bulk_create (or `save`) in batches inside one transaction, with progress."""
+        save = save or (lambda batch: model.objects.bulk_create(batch, batch_size=self.batch_size))
+        done = 0
+        with transaction.atomic():
+            for batch in chunked(objects, self.batch_size):
+                save(batch)
+                done += len(batch)
+                if total >= 10 * self.batch_size and done % (10 * self.batch_size) < len(batch):
+                    self.stdout.write(f"  {label}: {done:,}/{total:,}")
+        self.stdout.write(f"{label}: {done:,}")
+
+    def flush(self, seeded):
+        self.stdout.write("Removing previously seeded data...")
+        with transaction.atomic():
+            LedgerEntry.objects.filter(wallet__user__in=seeded).delete()
+            Transaction.objects.filter(Q(sender__in=seeded) | Q(receiver__in=seeded)).delete()
+            DocumentSignature.objects.filter(signed_by__in=seeded).delete()
+            Document.objects.filter(owner__in=seeded).delete()
+            VideoRoom.objects.filter(meeting__organizer__in=seeded).delete()
+            Meeting.participants.through.objects.filter(user__in=seeded).delete()
+            Meeting.objects.filter(organizer__in=seeded).delete()
+            Wallet.objects.filter(user__in=seeded).delete()
+            seeded.delete()
+
+    def when(self, days):
+        return self.now + timedelta(minutes=self.rng.randint(-days * 1440, days * 1440))
+
+    # ---------------- datasets ----------------
+
+    def seed_users(self, count):
+        # Hash once: PBKDF2 per row would dominate seeding time, and every
+        # account sharing a password does not change request-path cost.
+        password = make_password(SEED_PASSWORD)
+        rng = self.rng
+
+        def users():
+            for i in range(count):
+                yield User(
+                    username=f"{SEED_USER_PREFIX}{i}",
+                    email=f"{SEED_USER_PREFIX}{i}@example.com",
+                    password=password,
+                    first_name=f"User{i}",
+                    role="investor" if rng.random() < 0.4 else "entrepreneur",
+                    bio="Founder building in " + rng.choice(SECTORS) if rng.random() < 0.7 else None,
+                    preferences={"sectors": rng.sample(SECTORS, 2), "ticket": rng.choice([5000, 25000, 100000])},
+                    date_joined=self.when(365),
+                )
+
+        self.insert(User, users(), "users", count)
+        user_ids = list(
+            User.objects.filter(username__startswith=SEED_USER_PREFIX).order_by("id").values_list("id", flat=True)
+        )
+        # Balances start at zero; seed_transactions posts into them
+        self.insert(Wallet, (Wallet(user_id=user_id) for user_id in user_ids), "wallets", count)
+        return user_ids
+
+    def seed_meetings(self, count, user_ids, participants):
+        rng = self.rng
+
+        def meetings():
+            for i in range(count):
+                start = self.when(180)
+                yield Meeting(
+                    title=f"Pitch meeting {i}",
+                    description="Intro call and deck walkthrough." if rng.random() < 0.5 else None,
+                    organizer_id=rng.choice(user_ids),
+                    start_time=start,
+                    end_time=start + timedelta(minutes=rng.choice([15, 30, 45, 60, 90])),
+                    status=rng.choices(["scheduled", "completed", "canceled"], [6, 3, 1])[0],
+                )
+
+        self.insert(Meeting, meetings(), "meetings", count)
+        meeting_ids = list(
+            Meeting.objects.filter(organizer__username__startswith=SEED_USER_PREFIX)
+            .order_by("id").values_list("id", flat=True)
+        )
+
+        Through = Meeting.participants.through
+        self.insert(Through, (
+            Through(meeting_id=meeting_id, user_id=user_id)
+            for meeting_id in meeting_ids
+            for user_id in rng.sample(user_ids, rng.randint(1, participants))
+        ), "meeting participants", count * (participants + 1) // 2)
+        return meeting_ids
+
+    def seed_video_rooms(self, meeting_ids):
+        # Roughly one meeting in four has had its call room opened
+        opened = meeting_ids[::4]
+        self.insert(VideoRoom, (
+            VideoRoom(meeting_id=meeting_id, room_id=f"{SEED_USER_PREFIX}room-{meeting_id}", created_at=self.when(180))
+            for meeting_id in opened
+        ), "video rooms", len(opened))
+
+    def seed_documents(self, count, user_ids, signatures):
+        rng = self.rng
+        self.insert(Document, (
+            Document(
+                owner_id=rng.choice(user_ids),
+                file=f"documents/{SEED_USER_PREFIX}deck_{i}.pdf",
+                title=f"Pitch deck {i}",
+                version=rng.randint(1, 5),
+                status=rng.choices(["draft", "reviewed", "signed"], [3, 2, 5])[0],
+            )
+            for i in range(count)
+        ), "documents", count)
+
+        document_ids = list(
+            Document.objects.filter(owner__username__startswith=SEED_USER_PREFIX)
+            .order_by("id").values_list("id", flat=True)
+        )
+        self.insert(DocumentSignature, (
+            DocumentSignature(document_id=document_id, signed_by_id=user_id)
+            for document_id in document_ids
+            for user_id in rng.sample(user_ids, rng.randint(0, signatures))
+        ), "document signatures", count * signatures // 2)
+
+    def seed_transactions(self, count, user_ids):
+        """
+        Transactions with their ledger entries, applied in order the way
+        api.ledger would: a withdrawal or transfer the sender cannot cover
+        is recorded as failed and posts nothing. Balances are written last,
+        so `balance == sum(entries)` holds for every seeded wallet.
+        """
+        rng = self.rng
+        kinds, kind_weights = zip(*TRANSACTION_WEIGHTS)
+        wallet_ids = dict(Wallet.objects.filter(user_id__in=user_ids).values_list("user_id", "id"))
+        balances = dict.fromkeys(user_ids, Decimal(0))
+
+        def transactions():
+            for _ in range(count):
+                kind = rng.choices(kinds, kind_weights)[0]
+                sender, receiver = rng.sample(user_ids, 2)
+                if kind == "deposit":
+                    sender = None
+                elif kind == "withdraw":
+                    receiver = None
+                amount = Decimal(rng.randint(100, 2_500_000)) / 100
+                legs = []
+                if sender is None or balances[sender] >= amount:
+                    legs = [(user_id, delta) for user_id, delta in ((sender, -amount), (receiver, amount)) if user_id]
+                for user_id, delta in legs:
+                    balances[user_id] += delta
+                yield Transaction(
+                    sender_id=sender,
+                    receiver_id=receiver,
+                    transaction_type=kind,
+                    amount=amount,
+                    status="completed" if legs else "failed",
+                ), legs
+
+        def post(batch):
+            Transaction.objects.bulk_create([txn for txn, _ in batch], batch_size=self.batch_size)
+            LedgerEntry.objects.bulk_create([
+                LedgerEntry(wallet_id=wallet_ids[user_id], transaction_id=txn.pk, amount=delta)
+                for txn, legs in batch
+                for user_id, delta in legs
+            ], batch_size=self.batch_size)
+
+        self.insert(Transaction, transactions(), "transactions", count, save=post)
+        funded = [Wallet(pk=wallet_ids[user_id], balance=balance) for user_id, balance in balances.items() if balance]
+        self.insert(Wallet, funded, "wallet balances", len(funded), save=lambda batch: Wallet.objects.bulk_update(
+            batch, ["balance"], batch_size=500,
+        ))
@@ -0,0 +1,106 @@
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.db.models import Q, Sum
+
+from api import ledger
+from api.models import User, Wallet, Transaction, LedgerEntry
+
+PREFIX = "stress_"
+
+
+class Command(BaseCommand):
+    help = (
+        "Hammer api.ledger with concurrent random transfers between a small "
+        "set of users, then verify no update was lost: money is conserved, "
+        "every balance equals the sum of its ledger entries and none is negative."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--users", type=int, default=20)
+        parser.add_argument("--transfers", type=int, default=2000)
+        parser.add_argument("--threads", type=int, default=16)
+        parser.add_argument("--initial", type=Decimal, default=Decimal("1000.00"), help="Opening deposit per user.")
+        parser.add_argument("--seed", type=int, default=7)
+        parser.add_argument("--keep", action="store_true", help="Leave the stress users and postings in place.")
+
+    def handle(self, *args, **options):
+        if User.objects.filter(username__startswith=PREFIX).exists():
+            self.cleanup()
+        User.objects.bulk_create([
+            User(username=f"{PREFIX}{i}", email=f"{PREFIX}{i}@example.com", role="investor")
+            for i in range(options["users"])
+        ])
+        users = list(User.objects.filter(username__startswith=PREFIX).order_by("id"))
+        for user in users:
+            ledger.deposit(user, options["initial"])
+
+        rng = random.Random(options["seed"])
+        plan = []
+        for _ in range(options["transfers"]):
+            sender, receiver = rng.sample(users, 2)
+            plan.append((sender, receiver, Decimal(rng.randint(1, 5000)) / 100))
+
+        threads = options["threads"]
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=threads) as pool:
+            outcomes = list(pool.map(self.run_slice, [plan[n::threads] for n in range(threads)]))
+        duration = time.perf_counter() - start
+
+        posted = sum(ok for ok, _ in outcomes)
+        rejected = sum(declined for _, declined in outcomes)
+        self.stdout.write(
+            f"{posted} transfers posted, {rejected} declined (insufficient funds) in {duration:.2f}s "
+            f"with {threads} threads → {len(plan) / duration:,.0f} transfers/s"
+        )
+
+        try:
+            self.verify(users, options["initial"], posted)
+        finally:
+            if not options["keep"]:
+                self.cleanup()
+        self.stdout.write(self.style.SUCCESS("Ledger consistent: no lost updates"))
+
+    def run_slice(self, transfers):
+        posted = declined = 0
+        try:
+            for sender, receiver, amount in transfers:
+                try:
+                    ledger.transfer(sender, receiver, amount)
+                    posted += 1
+                except ledger.InsufficientFunds:
+                    declined += 1
+        finally:
+            connection.close()
+        return posted, declined
+
+    def verify(self, users, initial, posted):
+        wallets = Wallet.objects.filter(user__in=users).annotate(entry_total=Sum("entries__amount"))
+        problems = []
+        total = Decimal(0)
+        for wallet in wallets:
+            total += wallet.balance
+            # SQLite sums DecimalFields as floats
+            if wallet.balance != wallet.entry_total.quantize(ledger.CENT):
+                problems.append(f"wallet {wallet.pk}: balance {wallet.balance} != entries {wallet.entry_total}")
+            if wallet.balance < 0:
+                problems.append(f"wallet {wallet.pk}: negative balance {wallet.balance}")
+        if total != initial * len(users):
+            problems.append(f"money not conserved: {total} != {initial * len(users)}")
+        entries = LedgerEntry.objects.filter(wallet__user__in=users).count()
+        if entries != len(users) + 2 * posted:
+            problems.append(f"{entries} ledger entries, expected {len(users) + 2 * posted}")
+        if problems:
+            raise CommandError("Ledger inconsistent:\n  " + "\n  ".join(problems))
+
+    def cleanup(self):
+        stress = User.objects.filter(username__startswith=PREFIX)
+        with transaction.atomic():
+            LedgerEntry.objects.filter(wallet__user__in=stress).delete()
+            Transaction.objects.filter(Q(sender__in=stress) | Q(receiver__in=stress)).delete()
+            Wallet.objects.filter(user__in=stress).delete()
+            stress.delete()
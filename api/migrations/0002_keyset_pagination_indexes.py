@@ -0,0 +1,29 @@
+# Generated by Django 5.2.5 on 2026-10-18 14:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='document',
+            index=models.Index(fields=['uploaded_at', 'id'], name='api_doc_uploaded_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='meeting',
+            index=models.Index(fields=['start_time', 'id'], name='api_meeting_start_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='transaction',
+            index=models.Index(fields=['created_at', 'id'], name='api_txn_created_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='videoroom',
+            index=models.Index(fields=['created_at', 'id'], name='api_room_created_id_idx'),
+        ),
+    ]
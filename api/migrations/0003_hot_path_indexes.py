@@ -0,0 +1,55 @@
+# Generated by Django 5.2.5 on 2026-10-18 14:13
+
+from django.db import migrations, models
+from django.db.models import Min
+
+
+def drop_duplicate_signatures(apps, schema_editor):
+    """Keep the earliest signature per (document, signed_by) so the unique constraint can be added."""
+    DocumentSignature = apps.get_model("api", "DocumentSignature")
+    keep = (
+        DocumentSignature.objects.values("document", "signed_by")
+        .annotate(first=Min("id"))
+        .values_list("first", flat=True)
+    )
+    DocumentSignature.objects.exclude(id__in=list(keep)).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0002_keyset_pagination_indexes'),
+        ('auth', '0012_alter_user_first_name_max_length'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='document',
+            index=models.Index(fields=['owner', 'uploaded_at'], name='api_doc_owner_uploaded_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='meeting',
+            index=models.Index(fields=['organizer', 'start_time'], name='api_meeting_org_start_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='meeting',
+            index=models.Index(fields=['status', 'start_time'], name='api_meeting_status_start_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='transaction',
+            index=models.Index(fields=['sender', 'created_at'], name='api_txn_sender_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='transaction',
+            index=models.Index(fields=['receiver', 'created_at'], name='api_txn_receiver_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='user',
+            index=models.Index(fields=['email'], name='api_user_email_idx'),
+        ),
+        migrations.RunPython(drop_duplicate_signatures, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='documentsignature',
+            constraint=models.UniqueConstraint(fields=('document', 'signed_by'), name='api_unique_document_signer'),
+        ),
+    ]
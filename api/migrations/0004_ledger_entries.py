@@ -0,0 +1,56 @@
+# Generated by Django 5.2.5 on 2026-10-18 14:26
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def open_balances(apps, schema_editor):
+    """
+    Balances set before the ledger existed have no entries. Post each one as
+    a completed deposit so `balance == sum(entries)` holds from the start.
+    """
+    Wallet = apps.get_model("api", "Wallet")
+    Transaction = apps.get_model("api", "Transaction")
+    LedgerEntry = apps.get_model("api", "LedgerEntry")
+    for wallet in Wallet.objects.filter(balance__gt=0).iterator():
+        opening = Transaction.objects.create(
+            receiver_id=wallet.user_id, transaction_type="deposit", amount=wallet.balance, status="completed",
+        )
+        LedgerEntry.objects.create(wallet=wallet, transaction=opening, amount=wallet.balance)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0003_hot_path_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LedgerEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('amount', models.DecimalField(decimal_places=2, max_digits=12)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+        migrations.AddField(
+            model_name='ledgerentry',
+            name='transaction',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='entries', to='api.transaction'),
+        ),
+        migrations.AddField(
+            model_name='ledgerentry',
+            name='wallet',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='entries', to='api.wallet'),
+        ),
+        migrations.AddIndex(
+            model_name='ledgerentry',
+            index=models.Index(fields=['wallet', 'id'], name='api_ledger_wallet_id_idx'),
+        ),
+        migrations.RunPython(open_balances, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='wallet',
+            constraint=models.CheckConstraint(condition=models.Q(('balance__gte', 0)), name='api_wallet_balance_non_negative'),
+        ),
+    ]
@@ -0,0 +1,63 @@
+# Generated by Django 5.2.5 on 2026-10-18 14:30
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+
+
+def count_entries(apps, schema_editor):
+    """Backfill entry_count; `manage.py reconcile_wallets --rebuild` then writes checkpoints."""
+    Wallet = apps.get_model("api", "Wallet")
+    LedgerEntry = apps.get_model("api", "LedgerEntry")
+    counts = (
+        LedgerEntry.objects.filter(wallet=OuterRef("pk"))
+        .values("wallet").annotate(n=Count("id")).values("n")
+    )
+    Wallet.objects.filter(entries__isnull=False).update(entry_count=Subquery(counts))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0004_ledger_entries'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='WalletCheckpoint',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('balance', models.DecimalField(decimal_places=2, max_digits=12)),
+                ('entry_count', models.PositiveIntegerField()),
+                ('as_of', models.DateTimeField()),
+            ],
+        ),
+        migrations.AddField(
+            model_name='wallet',
+            name='entry_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddIndex(
+            model_name='ledgerentry',
+            index=models.Index(fields=['wallet', 'created_at'], name='api_ledger_wallet_time_idx'),
+        ),
+        migrations.AddField(
+            model_name='walletcheckpoint',
+            name='entry',
+            field=models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='checkpoint', to='api.ledgerentry'),
+        ),
+        migrations.AddField(
+            model_name='walletcheckpoint',
+            name='wallet',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='checkpoints', to='api.wallet'),
+        ),
+        migrations.AddIndex(
+            model_name='walletcheckpoint',
+            index=models.Index(fields=['wallet', 'entry'], name='api_ckpt_wallet_entry_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='walletcheckpoint',
+            index=models.Index(fields=['wallet', 'as_of'], name='api_ckpt_wallet_asof_idx'),
+        ),
+        migrations.RunPython(count_entries, migrations.RunPython.noop),
+    ]
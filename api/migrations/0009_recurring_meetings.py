@@ -0,0 +1,54 @@
+# Generated by Django 5.2.5 on 2026-10-18 15:55
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0008_document_versions'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='meeting',
+            name='recurrence',
+            field=models.CharField(blank=True, choices=[('', 'Does not repeat'), ('daily', 'Daily'), ('weekly', 'Weekly'), ('monthly', 'Monthly')], default='', max_length=10),
+        ),
+        migrations.AddField(
+            model_name='meeting',
+            name='recurrence_count',
+            field=models.PositiveIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='meeting',
+            name='recurrence_interval',
+            field=models.PositiveSmallIntegerField(default=1),
+        ),
+        migrations.AddField(
+            model_name='meeting',
+            name='recurrence_until',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='meeting',
+            name='series_end',
+            field=models.DateTimeField(blank=True, editable=False, null=True),
+        ),
+        migrations.CreateModel(
+            name='MeetingException',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('original_start', models.DateTimeField()),
+                ('canceled', models.BooleanField(default=False)),
+                ('start_time', models.DateTimeField(blank=True, null=True)),
+                ('end_time', models.DateTimeField(blank=True, null=True)),
+                ('meeting', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='exceptions', to='api.meeting')),
+            ],
+            options={
+                'ordering': ['original_start'],
+                'constraints': [models.UniqueConstraint(fields=('meeting', 'original_start'), name='api_unique_meeting_occurrence')],
+            },
+        ),
+    ]
@@ -0,0 +1,36 @@
+from django.db import migrations
+
+# api.search.SQLiteBackend; other databases need no table
+CREATE = """
+CREATE VIRTUAL TABLE api_user_search USING fts5(
+    username, bio, portfolio, role,
+    tokenize = 'unicode61 remove_diacritics 2',
+    prefix = '2 3'
+)
+"""
+FILL = """
+INSERT INTO api_user_search (rowid, username, bio, portfolio, role)
+SELECT id, username, COALESCE(bio, ''), COALESCE(portfolio, ''), role FROM api_user
+"""
+
+
+def create_index(apps, schema_editor):
+    if schema_editor.connection.vendor == "sqlite":
+        schema_editor.execute(CREATE)
+        schema_editor.execute(FILL)
+
+
+def drop_index(apps, schema_editor):
+    if schema_editor.connection.vendor == "sqlite":
+        schema_editor.execute("DROP TABLE api_user_search")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0009_recurring_meetings'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_index, drop_index),
+    ]
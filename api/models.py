@@ -1,7 +1,11 @@
+import uuid
+
 from django.db import models
 from django.contrib.auth.models import AbstractUser
 from django.utils import timezone
 
+from . import recurrence
+
 
 # -------------------------
 # 1. Custom User Model
@@ -16,6 +20,12 @@ class User(AbstractUser):
     portfolio = models.TextField(blank=True, null=True)
     preferences = models.JSONField(blank=True, null=True)
 
+    class Meta(AbstractUser.Meta):
+        indexes = [
+            # LoginSerializer resolves users by email
+            models.Index(fields=["email"], name="api_user_email_idx"),
+        ]
+
     def __str__(self):
         return f"{self.username} ({self.role})"
 
@@ -29,6 +39,12 @@ class Meeting(models.Model):
         ("completed", "Completed"),
         ("canceled", "Canceled"),
     )
+    RECURRENCE_CHOICES = (
+        ("", "Does not repeat"),
+        ("daily", "Daily"),
+        ("weekly", "Weekly"),
+        ("monthly", "Monthly"),
+    )
     title = models.CharField(max_length=255)
     description = models.TextField(blank=True, null=True)
     organizer = models.ForeignKey(User, related_name="organized_meetings", on_delete=models.CASCADE)
@@ -36,10 +52,54 @@ class Meeting(models.Model):
     start_time = models.DateTimeField()
     end_time = models.DateTimeField()
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default="scheduled")
+    # Repeats every `recurrence_interval` days/weeks/months from start_time/end_time (api.recurrence)
+    recurrence = models.CharField(max_length=10, choices=RECURRENCE_CHOICES, default="", blank=True)
+    recurrence_interval = models.PositiveSmallIntegerField(default=1)
+    recurrence_count = models.PositiveIntegerField(null=True, blank=True)
+    recurrence_until = models.DateTimeField(null=True, blank=True)
+    # End of the series' last occurrence, null if it never ends; kept by save()
+    series_end = models.DateTimeField(null=True, blank=True, editable=False)
+
+    class Meta:
+        indexes = [
+            # Keyset pagination order (MeetingPagination)
+            models.Index(fields=["start_time", "id"], name="api_meeting_start_id_idx"),
+            # Per-organizer calendars and status-filtered schedules
+            models.Index(fields=["organizer", "start_time"], name="api_meeting_org_start_idx"),
+            models.Index(fields=["status", "start_time"], name="api_meeting_status_start_idx"),
+        ]
 
     def __str__(self):
         return f"{self.title} ({self.status})"
 
+    def save(self, *args, **kwargs):
+        self.series_end = recurrence.series_end(recurrence.rule_of(self)) if self.recurrence else None
+        if kwargs.get("update_fields") is not None:
+            kwargs["update_fields"] = {*kwargs["update_fields"], "series_end"}
+        super().save(*args, **kwargs)
+
+
+class MeetingException(models.Model):
+    """
+    One occurrence of a recurring meeting, canceled or moved to
+    start_time/end_time. Keyed by the start the rule gives it.
+    """
+    meeting = models.ForeignKey(Meeting, related_name="exceptions", on_delete=models.CASCADE)
+    original_start = models.DateTimeField()
+    canceled = models.BooleanField(default=False)
+    start_time = models.DateTimeField(null=True, blank=True)
+    end_time = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ["original_start"]
+        constraints = [
+            models.UniqueConstraint(fields=["meeting", "original_start"], name="api_unique_meeting_occurrence"),
+        ]
+
+    def __str__(self):
+        action = "canceled" if self.canceled else f"moved to {self.start_time:%Y-%m-%d %H:%M}"
+        return f"{self.meeting_id} @ {self.original_start:%Y-%m-%d %H:%M} {action}"
+
 
 # -------------------------
 # 3. Video Call Rooms
@@ -49,6 +109,12 @@ class VideoRoom(models.Model):
     room_id = models.CharField(max_length=255, unique=True)
     created_at = models.DateTimeField(default=timezone.now)
 
+    class Meta:
+        indexes = [
+            # Keyset pagination order (VideoRoomPagination)
+            models.Index(fields=["created_at", "id"], name="api_room_created_id_idx"),
+        ]
+
     def __str__(self):
         return f"Room {self.room_id} for {self.meeting.title}"
 
@@ -64,20 +130,85 @@ class Document(models.Model):
     )
     owner = models.ForeignKey(User, related_name="documents", on_delete=models.CASCADE)
     file = models.FileField(upload_to="documents/")
+    # SHA-256 of the content; chunked uploads store the file once per hash (api.uploads)
+    sha256 = models.CharField(max_length=64, blank=True, db_index=True)
     title = models.CharField(max_length=255)
     version = models.IntegerField(default=1)
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default="draft")
     uploaded_at = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        indexes = [
+            # Keyset pagination order (DocumentPagination)
+            models.Index(fields=["uploaded_at", "id"], name="api_doc_uploaded_id_idx"),
+            # "My documents", newest first
+            models.Index(fields=["owner", "uploaded_at"], name="api_doc_owner_uploaded_idx"),
+        ]
+
     def __str__(self):
         return f"{self.title} v{self.version} ({self.status})"
 
 
+class Upload(models.Model):
+    """A resumable chunked upload in progress (api.uploads); `received` bytes are on disk."""
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    owner = models.ForeignKey(User, related_name="uploads", on_delete=models.CASCADE)
+    title = models.CharField(max_length=255)
+    # Set when the upload is a new version of an existing document
+    document = models.ForeignKey(Document, related_name="uploads", on_delete=models.CASCADE, null=True, blank=True)
+    size = models.BigIntegerField()
+    received = models.BigIntegerField(default=0)
+    created_at = models.DateTimeField(default=timezone.now, db_index=True)
+
+    def __str__(self):
+        return f"{self.title}: {self.received}/{self.size} bytes"
+
+
+class DocumentVersion(models.Model):
+    """
+    One revision of a document (api.versions). The newest is always a
+    snapshot: `blob` is the full file. Older ones are reverse deltas: `blob`
+    rebuilds them from `base`, the next newer version.
+    """
+    KIND_CHOICES = (
+        ("snapshot", "Snapshot"),
+        ("delta", "Delta"),
+    )
+    document = models.ForeignKey(Document, related_name="versions", on_delete=models.CASCADE)
+    number = models.PositiveIntegerField()
+    kind = models.CharField(max_length=10, choices=KIND_CHOICES, default="snapshot")
+    base = models.ForeignKey("self", related_name="+", on_delete=models.CASCADE, null=True, blank=True)
+    blob = models.CharField(max_length=255)
+    sha256 = models.CharField(max_length=64, blank=True)
+    size = models.BigIntegerField()          # bytes of the version itself
+    stored_size = models.BigIntegerField()   # bytes of `blob`
+    # compact() tried and a delta would not pay off; compact_versions skips it
+    compaction_declined = models.BooleanField(default=False)
+    title = models.CharField(max_length=255)
+    created_by = models.ForeignKey(User, related_name="+", on_delete=models.SET_NULL, null=True, blank=True)
+    created_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        ordering = ["-number"]
+        constraints = [
+            models.UniqueConstraint(fields=["document", "number"], name="api_unique_document_version"),
+        ]
+
+    def __str__(self):
+        return f"{self.document_id} v{self.number} ({self.kind})"
+
+
 class DocumentSignature(models.Model):
     document = models.ForeignKey(Document, related_name="signatures", on_delete=models.CASCADE)
     signed_by = models.ForeignKey(User, on_delete=models.CASCADE)
     signed_at = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        constraints = [
+            # One signature per user per document; signing is a single INSERT
+            models.UniqueConstraint(fields=["document", "signed_by"], name="api_unique_document_signer"),
+        ]
+
     def __str__(self):
         return f"{self.signed_by.username} signed {self.document.title}"
 
@@ -88,6 +219,14 @@ class DocumentSignature(models.Model):
 class Wallet(models.Model):
     user = models.OneToOneField(User, related_name="wallet", on_delete=models.CASCADE)
     balance = models.DecimalField(max_digits=10, decimal_places=2, default=0.00)
+    # Ledger entries posted so far; drives WalletCheckpoint spacing
+    entry_count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            # Last line of defence for api.ledger's conditional debits
+            models.CheckConstraint(condition=models.Q(balance__gte=0), name="api_wallet_balance_non_negative"),
+        ]
 
     def __str__(self):
         return f"{self.user.username} Wallet - Balance: {self.balance}"
@@ -111,5 +250,78 @@ class Transaction(models.Model):
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default="pending")
     created_at = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        indexes = [
+            # Keyset pagination order (TransactionPagination)
+            models.Index(fields=["created_at", "id"], name="api_txn_created_id_idx"),
+            # Wallet history per sender / receiver by time
+            models.Index(fields=["sender", "created_at"], name="api_txn_sender_created_idx"),
+            models.Index(fields=["receiver", "created_at"], name="api_txn_receiver_created_idx"),
+        ]
+
     def __str__(self):
         return f"{self.transaction_type} - {self.amount} ({self.status})"
+
+
+class LedgerEntry(models.Model):
+    """
+    One leg of a posted Transaction: a signed change to one wallet.
+    A transfer posts two entries (debit sender, credit receiver), deposits
+    and withdrawals post one. Written only by api.ledger, so for every
+    wallet `balance == sum(entries.amount)`.
+    """
+    wallet = models.ForeignKey(Wallet, related_name="entries", on_delete=models.PROTECT)
+    transaction = models.ForeignKey(Transaction, related_name="entries", on_delete=models.PROTECT)
+    amount = models.DecimalField(max_digits=12, decimal_places=2)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            # Per-wallet history in posting order
+            models.Index(fields=["wallet", "id"], name="api_ledger_wallet_id_idx"),
+            # Balance-at-date tails: entries between a checkpoint and a date
+            models.Index(fields=["wallet", "created_at"], name="api_ledger_wallet_time_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.wallet.user.username} {self.amount:+} (txn {self.transaction_id})"
+
+
+class WalletCheckpoint(models.Model):
+    """
+    Balance of a wallet as of one ledger entry, inclusive. api.ledger writes
+    one every LEDGER_CHECKPOINT_INTERVAL entries per wallet, so balance and
+    statement questions read at most that many entries past the nearest
+    checkpoint instead of the wallet's whole history.
+    """
+    wallet = models.ForeignKey(Wallet, related_name="checkpoints", on_delete=models.CASCADE)
+    entry = models.OneToOneField(LedgerEntry, related_name="checkpoint", on_delete=models.CASCADE)
+    balance = models.DecimalField(max_digits=12, decimal_places=2)
+    entry_count = models.PositiveIntegerField()
+    as_of = models.DateTimeField()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["wallet", "entry"], name="api_ckpt_wallet_entry_idx"),
+            models.Index(fields=["wallet", "as_of"], name="api_ckpt_wallet_asof_idx"),
+        ]
+
+    def __str__(self):
+        return f"Wallet {self.wallet_id}: {self.balance} as of entry {self.entry_id}"
+
+
+# -------------------------
+# 6. Auth tokens
+# -------------------------
+class RevokedToken(models.Model):
+    """
+    A refresh token that may no longer be used (rotated or logged out), by
+    JTI. Rows are only needed until the token would have expired anyway;
+    api.revocation prunes them and keeps an in-memory filter in front.
+    """
+    jti = models.CharField(max_length=64, primary_key=True)
+    expires_at = models.DateTimeField(db_index=True)
+    revoked_at = models.DateTimeField(default=timezone.now, db_index=True)
+
+    def __str__(self):
+        return f"{self.jti} (until {self.expires_at:%Y-%m-%d %H:%M})"
@@ -0,0 +1,231 @@
+import base64
+import json
+from collections import OrderedDict
+from datetime import date, datetime
+from decimal import Decimal
+
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import replace_query_param
+
+
+# -------------------------
+# Keyset (cursor) pagination
+# -------------------------
+class KeysetPagination(BasePagination):
+    """
+    Cursor pagination over a composite, unique ordering such as
+    ("-created_at", "-id").
+
+    The cursor stores the full key of the last (or first) row of the page and
+    the next page is fetched with a row-value comparison on that key, so it is
+    a single index range scan: page N costs the same as page 1. Unlike DRF's
+    CursorPagination there is no offset for ties on the first column.
+
+    Works on querysets of model instances and on `.values()` querysets.
+    """
+
+    ordering = ("-id",)
+    page_size = api_settings.PAGE_SIZE or 50
+    page_size_query_param = "page_size"
+    max_page_size = 500
+    cursor_query_param = "cursor"
+    invalid_cursor_message = "Invalid cursor"
+
+    # -- public API ------------------------------------------------------
+    def paginate_queryset(self, queryset, request, view=None):
+        queryset, position, reverse = self.page_queryset(queryset, request)
+        rows = list(queryset[:self.page_size + 1])
+        return self.finish_page(rows, position, reverse)
+
+    async def apaginate_queryset(self, queryset, request, view=None):
+        """paginate_queryset for async views (plain Django requests)."""
+        queryset, position, reverse = self.page_queryset(queryset, request)
+        rows = [row async for row in queryset[:self.page_size + 1]]
+        return self.finish_page(rows, position, reverse)
+
+    def get_paginated_response(self, data):
+        return Response(self.get_paginated_data(data))
+
+    def get_paginated_data(self, data):
+        return OrderedDict([
+            ("next", self.get_next_link()),
+            ("previous", self.get_previous_link()),
+            ("results", data),
+        ])
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            "type": "object",
+            "required": ["results"],
+            "properties": {
+                "next": {"type": "string", "nullable": True, "format": "uri"},
+                "previous": {"type": "string", "nullable": True, "format": "uri"},
+                "results": schema,
+            },
+        }
+
+    def get_schema_operation_parameters(self, view):
+        return [
+            {
+                "name": self.cursor_query_param,
+                "required": False,
+                "in": "query",
+                "description": "The pagination cursor value.",
+                "schema": {"type": "string"},
+            },
+            {
+                "name": self.page_size_query_param,
+                "required": False,
+                "in": "query",
+                "description": "Number of results to return per page.",
+                "schema": {"type": "integer"},
+            },
+        ]
+
+    def get_page_size(self, request):
+        params = getattr(request, "query_params", request.GET)
+        try:
+            size = int(params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        return max(1, min(size, self.max_page_size))
+
+    # -- links -----------------------------------------------------------
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        return self.encode_cursor(self.key_of(self.page[-1]), reverse=False)
+
+    def get_previous_link(self):
+        if not self.has_previous:
+            return None
+        return self.encode_cursor(self.key_of(self.page[0]), reverse=True)
+
+    # -- internals -------------------------------------------------------
+    def page_queryset(self, queryset, request):
+        """Order and filter `queryset` for the requested page; returns (queryset, position, reverse)."""
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        self.base_url = request.build_absolute_uri()
+        self.fields = [(name.lstrip("-"), name.startswith("-")) for name in self.ordering]
+
+        position, reverse = self.decode_cursor(request, queryset.model)
+        queryset = queryset.order_by(*self.order_by(reverse))
+        if position is not None:
+            queryset = queryset.filter(self.after(position, reverse))
+        return queryset, position, reverse
+
+    def finish_page(self, rows, position, reverse):
+        has_more = len(rows) > self.page_size
+        rows = rows[:self.page_size]
+        if reverse:
+            rows.reverse()
+            self.has_previous, self.has_next = has_more, position is not None
+        else:
+            self.has_next, self.has_previous = has_more, position is not None
+        if not rows:
+            self.has_next = self.has_previous = False
+        self.page = rows
+        return rows
+
+    def order_by(self, reverse):
+        return [("-" if desc != reverse else "") + name for name, desc in self.fields]
+
+    def after(self, position, reverse):
+        """
+        Row-value comparison `(f1, f2, ...) > (v1, v2, ...)` expanded into
+        `f1 > v1 OR (f1 = v1 AND f2 > v2) OR ...` (direction per column).
+        """
+        condition = Q()
+        equal = {}
+        for (name, desc), value in zip(self.fields, position):
+            op = "lt" if desc != reverse else "gt"
+            condition |= Q(**equal, **{f"{name}__{op}": value})
+            equal[name] = value
+        return condition
+
+    def key_of(self, row):
+        if isinstance(row, dict):
+            return [row[name] for name, _ in self.fields]
+        return [getattr(row, name) for name, _ in self.fields]
+
+    def encode_cursor(self, key, reverse):
+        payload = {"k": [self.encode_value(value) for value in key]}
+        if reverse:
+            payload["r"] = 1
+        token = base64.urlsafe_b64encode(json.dumps(payload, separators=(",", ":")).encode()).decode()
+        return replace_query_param(self.base_url, self.cursor_query_param, token)
+
+    def encode_value(self, value):
+        if isinstance(value, (datetime, date)):
+            return value.isoformat()
+        if isinstance(value, Decimal):
+            return str(value)
+        return value
+
+    def decode_cursor(self, request, model):
+        params = getattr(request, "query_params", request.GET)
+        token = params.get(self.cursor_query_param)
+        if not token:
+            return None, False
+        try:
+            payload = json.loads(base64.urlsafe_b64decode(token.encode()))
+            raw = payload["k"]
+            if len(raw) != len(self.fields):
+                raise ValueError
+            position = [
+                model._meta.get_field(name).to_python(value)
+                for (name, _), value in zip(self.fields, raw)
+            ]
+        except (TypeError, ValueError, KeyError, ValidationError):
+            raise NotFound(self.invalid_cursor_message)
+        return position, bool(payload.get("r"))
+
+
+# -------------------------
+# Per-model orderings (each backed by a composite index)
+# -------------------------
+class MeetingPagination(KeysetPagination):
+    ordering = ("start_time", "id")
+
+
+class OccurrencePagination(MeetingPagination):
+    """
+    Keyset pages over a calendar window (MeetingViewSet ?start=&end=), keyed
+    by (occurrence start, meeting id); a series' occurrences are not rows,
+    so FastMeetingSerializer.occurrences() applies the key. Forward only.
+    """
+
+    def paginate_occurrences(self, serializer, queryset, start, end, request):
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        self.base_url = request.build_absolute_uri()
+        self.fields = [(name.lstrip("-"), name.startswith("-")) for name in self.ordering]
+        position, reverse = self.decode_cursor(request, queryset.model)
+        if reverse:
+            raise NotFound(self.invalid_cursor_message)
+        entries = serializer.occurrences(queryset, start, end, after=position, limit=self.page_size + 1)
+        return self.finish_page(entries, position, False)
+
+    def get_previous_link(self):
+        return None
+
+    def key_of(self, entry):
+        return entry[:2]
+
+
+class VideoRoomPagination(KeysetPagination):
+    ordering = ("-created_at", "-id")
+
+
+class DocumentPagination(KeysetPagination):
+    ordering = ("-uploaded_at", "-id")
+
+
+class TransactionPagination(KeysetPagination):
+    ordering = ("-created_at", "-id")
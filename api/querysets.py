@@ -0,0 +1,76 @@
+from django.contrib.auth import get_user_model
+from django.db.models import Prefetch
+
+from .models import Meeting, VideoRoom, Document, Transaction
+
+User = get_user_model()
+
+# -------------------------
+# Shared queryset builders
+# -------------------------
+# Every builder joins/prefetches exactly what the matching read serializer
+# touches, so list and detail endpoints run in a fixed number of queries
+# no matter how many rows are returned. Given the request's Fieldset, only
+# the relations it selects and expands are joined.
+
+
+def participants_prefetch(prefix="", ids_only=False):
+    """
+    Prefetch for Meeting.participants (one query for the whole page).
+    Participants are ordered by id so responses are stable.
+    """
+    users = User.objects.order_by("id")
+    return Prefetch(f"{prefix}participants", queryset=users.only("id") if ids_only else users)
+
+
+def expands(fieldset, name):
+    """Without a Fieldset (api.fieldsets) every relation is joined, as for the full shape."""
+    return fieldset is None or fieldset.expands(name)
+
+
+def selects(fieldset, name):
+    return fieldset is None or fieldset.selects(name)
+
+
+def joined(queryset, names):
+    # select_related() without arguments would follow every FK
+    return queryset.select_related(*names) if names else queryset
+
+
+def meeting_relations(fieldset=None, prefix=""):
+    """(select_related, prefetch_related) arguments for a meeting's users."""
+    select, prefetch = [], []
+    if selects(fieldset, "organizer") and expands(fieldset, "organizer"):
+        select.append(f"{prefix}organizer")
+    if selects(fieldset, "participants"):
+        prefetch.append(participants_prefetch(prefix, ids_only=not expands(fieldset, "participants")))
+    return select, prefetch
+
+
+def meeting_queryset(fieldset=None):
+    """Meetings + organizer (JOIN) + participants (1 prefetch) → 2 queries."""
+    select, prefetch = meeting_relations(fieldset)
+    return joined(Meeting.objects.all(), select).prefetch_related(*prefetch)
+
+
+def video_room_queryset(fieldset=None):
+    """Rooms + meeting + organizer (JOIN) + participants (1 prefetch) → 2 queries."""
+    rooms = VideoRoom.objects.all()
+    if selects(fieldset, "meeting") and expands(fieldset, "meeting"):
+        select, prefetch = meeting_relations(None if fieldset is None else fieldset.nested("meeting"), prefix="meeting__")
+        rooms = rooms.select_related("meeting", *select).prefetch_related(*prefetch)
+    return rooms
+
+
+def document_queryset(fieldset=None):
+    """Documents + owner (JOIN) → 1 query."""
+    return joined(Document.objects.all(), [
+        name for name in ("owner",) if selects(fieldset, name) and expands(fieldset, name)
+    ])
+
+
+def transaction_queryset(fieldset=None):
+    """Transactions + sender + receiver (JOINs) → 1 query."""
+    return joined(Transaction.objects.all(), [
+        name for name in ("sender", "receiver") if selects(fieldset, name) and expands(fieldset, name)
+    ])
@@ -0,0 +1,178 @@
+"""
+Recurring meetings, expanded on demand.
+
+A series is one Meeting row whose `recurrence` is "daily", "weekly" or
+"monthly". The rule is every `recurrence_interval` days, weeks or months
+from its first occurrence (`start_time`/`end_time`), for
+`recurrence_count` occurrences or until `recurrence_until`, or forever if
+neither is set. Occurrences are never stored. Cancelled or moved
+occurrences are MeetingException rows keyed by the original start, so a
+weekly sync costs one meeting row, its participants and a few exceptions.
+
+`occurrences()` is a generator over one window. It jumps straight to the
+first occurrence that can overlap the window (arithmetic, not iteration)
+and stops at the window's end. Moved occurrences are merged in by start
+time. `expand()` caches the result per rule, exceptions and window in an
+LRU. The key is the rule's values, so an edited series or a new exception
+simply misses.
+
+`series_end` (the end of the last occurrence, None if there is none) is
+stored on the row so windows can be filtered in SQL; see `overlapping()`.
+Steps are exact durations in UTC: a weekly 09:00 meeting stays at the
+same UTC time across daylight-saving changes.
+"""
+import calendar
+import heapq
+from collections import namedtuple
+from datetime import timedelta
+from functools import lru_cache
+
+from django.conf import settings
+from django.db.models import Q
+from django.utils import timezone
+
+FREQUENCIES = ("daily", "weekly", "monthly")
+STEPS = {"daily": timedelta(days=1), "weekly": timedelta(weeks=1)}
+# Rule columns read alongside a meeting's own when expanding
+RULE_FIELDS = ("recurrence", "recurrence_interval", "recurrence_count", "recurrence_until")
+# Expanded (rule, exceptions, window) results kept per process
+EXPANSION_CACHE_SIZE = 4096
+
+Rule = namedtuple("Rule", "start end frequency interval count until")
+# A MeetingException as expand() takes it: `start`/`end` are None unless moved
+Change = namedtuple("Change", "original canceled start end")
+
+
+def rule_of(meeting):
+    """The Rule of a Meeting or a `.values()` row carrying RULE_FIELDS."""
+    get = meeting.get if isinstance(meeting, dict) else lambda name: getattr(meeting, name)
+    return Rule(get("start_time"), get("end_time"), get("recurrence"), get("recurrence_interval"),
+                get("recurrence_count"), get("recurrence_until"))
+
+
+def add_months(when, months):
+    month = when.month - 1 + months
+    year, month = when.year + month // 12, month % 12 + 1
+    return when.replace(year=year, month=month, day=min(when.day, calendar.monthrange(year, month)[1]))
+
+
+def nth_start(rule, n):
+    """Start of occurrence `n` (0 is the first), ignoring count/until."""
+    if rule.frequency == "monthly":
+        return add_months(rule.start, n * rule.interval)
+    return rule.start + n * rule.interval * STEPS[rule.frequency]
+
+
+def last_index(rule):
+    """Index of the final occurrence, or None for a series without end."""
+    if not rule.frequency:
+        return 0
+    last = None if rule.count is None else rule.count - 1
+    if rule.until is not None:
+        if rule.until < rule.start:
+            return -1
+        if rule.frequency == "monthly":
+            n = ((rule.until.year - rule.start.year) * 12 + rule.until.month - rule.start.month) // rule.interval
+            while n > 0 and nth_start(rule, n) > rule.until:
+                n -= 1
+        else:
+            n = (rule.until - rule.start) // (rule.interval * STEPS[rule.frequency])
+        last = n if last is None else min(last, n)
+    return last
+
+
+def series_end(rule):
+    last = last_index(rule)
+    if last is None:
+        return None
+    return nth_start(rule, max(last, 0)) + (rule.end - rule.start)
+
+
+def step(rule):
+    """The shortest gap between two starts; monthly ones can be as short as February."""
+    if rule.frequency == "monthly":
+        return timedelta(days=28 * rule.interval)
+    return rule.interval * STEPS[rule.frequency]
+
+
+def span(rule, now=None):
+    """
+    (start, end) covering every occurrence of `rule`; a series without end
+    is cut RECURRENCE_HORIZON_DAYS past now, or past its start if later.
+    """
+    end = series_end(rule)
+    if end is None:
+        horizon = timedelta(days=getattr(settings, "RECURRENCE_HORIZON_DAYS", 366))
+        end = max(rule.start, now or timezone.now()) + horizon
+    return rule.start, end
+
+
+def first_index(rule, start):
+    """Index of the first occurrence that can end after `start`."""
+    duration = rule.end - rule.start
+    if start <= rule.end:
+        return 0
+    if rule.frequency == "monthly":
+        months = (start.year - rule.start.year) * 12 + start.month - rule.start.month
+        n = max(0, months // rule.interval - 1)
+        while nth_start(rule, n) + duration <= start:
+            n += 1
+        return n
+    return (start - rule.end) // (rule.interval * STEPS[rule.frequency]) + 1
+
+
+def is_occurrence(rule, when):
+    """Whether a (regular) occurrence of `rule` starts exactly at `when`."""
+    if when < rule.start:
+        return False
+    n = first_index(rule, when - (rule.end - rule.start))
+    last = last_index(rule)
+    return (last is None or n <= last) and nth_start(rule, n) == when
+
+
+def regular(rule, start, end, skip):
+    n, last = first_index(rule, start), last_index(rule)
+    while last is None or n <= last:
+        begins = nth_start(rule, n)
+        if begins >= end:
+            return
+        if begins not in skip:
+            yield begins, begins, begins + (rule.end - rule.start)
+        n += 1
+
+
+def occurrences(rule, start, end, exceptions=()):
+    """
+    (original start, start, end) of each occurrence overlapping [start, end),
+    ordered by start. A meeting without recurrence is its only occurrence.
+    """
+    if not rule.frequency:
+        if rule.start < end and rule.end > start:
+            yield rule.start, rule.start, rule.end
+        return
+    skip = {exception.original for exception in exceptions}
+    moved = sorted(
+        (exception.start, exception.original, exception.end) for exception in exceptions
+        if not exception.canceled and exception.start < end and exception.end > start
+    )
+    yield from heapq.merge(
+        regular(rule, start, end, skip), ((original, begins, ends) for begins, original, ends in moved),
+        key=lambda occurrence: occurrence[1],
+    )
+
+
+@lru_cache(maxsize=EXPANSION_CACHE_SIZE)
+def expand(rule, start, end, exceptions=()):
+    """occurrences() as a tuple, cached; `exceptions` must be a tuple of Change."""
+    return tuple(occurrences(rule, start, end, exceptions))
+
+
+def overlapping(start, end, prefix=""):
+    """Q for meetings with an occurrence that may overlap [start, end); `prefix` e.g. "meeting__"."""
+    single = Q(**{f"{prefix}recurrence": "", f"{prefix}start_time__lt": end, f"{prefix}end_time__gt": start})
+    series = (
+        ~Q(**{f"{prefix}recurrence": ""})
+        & Q(**{f"{prefix}start_time__lt": end})
+        & (Q(**{f"{prefix}series_end__isnull": True}) | Q(**{f"{prefix}series_end__gt": start}))
+    )
+    return single | series
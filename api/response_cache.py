@@ -0,0 +1,150 @@
+"""
+Shared response cache for the public reads of the router viewsets.
+
+`CachedResponseMixin` stores the rendered JSON of `list` and `retrieve` in
+the "responses" cache (CACHES in settings: local memory by default, a
+directory shared by every worker when RESPONSE_CACHE_DIR is set). The key
+is the path, the sorted query string, the auth scope (anonymous or the
+user's id) and the current generation of everything the response shows:
+
+  * "<model>"       bumped by any change to that model (lists and details);
+  * "<model>:<pk>"  bumped by a change to that row (detail views).
+
+Generations live in the "response_generations" cache, which every worker
+must share (a directory by default): a write in one worker retires the
+entries of all of them, wherever those are stored.
+
+Nothing is ever deleted: api.signals bumps generations on post_save,
+post_delete and m2m_changed, so later reads compute new keys and the old
+entries age out. A write racing a read is safe, since the read stores its
+response under the generations it started from. Writes that bypass
+signals (`bulk_create`, `QuerySet.update()`) must call `invalidate()`
+themselves, as ledger.post_batch does.
+
+Every response carries an ETag; a matching If-None-Match is answered with
+304 and no body. A hit costs two cache reads and no SQL.
+"""
+import hashlib
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.exceptions import ValidationError
+from django.db import connection, transaction
+from django.http import HttpResponse, HttpResponseNotModified
+from django.utils.cache import patch_vary_headers
+from django.utils.http import parse_etags, urlencode
+
+CACHE_ALIAS = "responses"
+GENERATIONS_ALIAS = "response_generations"
+
+
+def response_cache():
+    return caches[CACHE_ALIAS]
+
+
+def generation_store():
+    return caches[GENERATIONS_ALIAS]
+
+
+def generation_key(model, pk=None):
+    name = model._meta.label_lower
+    return f"generation:{name}" if pk is None else f"generation:{name}:{pk}"
+
+
+def generations(keys):
+    """Current value of each generation key, starting unknown ones at the clock."""
+    store = generation_store()
+    values = store.get_many(keys)
+    for key in keys:
+        if key not in values:
+            # Not 0: an evicted counter must not come back as a value already used
+            store.add(key, time.time_ns(), timeout=None)
+            values[key] = store.get(key)
+    return [values[key] for key in keys]
+
+
+def bump(keys):
+    store = generation_store()
+    for key in keys:
+        try:
+            store.incr(key)
+        except ValueError:
+            store.set(key, time.time_ns(), timeout=None)
+
+
+def invalidate(model, pks=()):
+    """Retire cached responses showing `model` (any row, and the rows in `pks`)."""
+    keys = [generation_key(model)] + [generation_key(model, pk) for pk in pks]
+    bump(keys)
+    if connection.in_atomic_block:
+        # Again once committed, so a read in between cannot cache the old rows under the new generation
+        transaction.on_commit(lambda: bump(keys))
+
+
+def etag_for(content):
+    return f'"{hashlib.blake2b(content, digest_size=16).hexdigest()}"'
+
+
+class CachedResponseMixin:
+    """
+    Cache `list` and `retrieve` responses rendered as JSON. `cache_models`
+    names the other models whose fields appear in the response (nested
+    serializers); the view's own model is always included.
+    """
+    cache_models = ()
+
+    def list(self, request, *args, **kwargs):
+        return self.cached(super().list, request, None, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.cached(super().retrieve, request, self.cache_row(kwargs), *args, **kwargs)
+
+    def cache_row(self, kwargs):
+        """The looked-up pk as signals see it: "05" and 5 are one row, and one generation."""
+        value = kwargs.get(self.lookup_url_kwarg or self.lookup_field)
+        pk = self.get_queryset().model._meta.pk
+        if self.lookup_field not in ("pk", pk.name):
+            return value
+        try:
+            return pk.to_python(value)
+        except ValidationError:
+            return value   # retrieve answers 404; nothing is cached
+
+    def cache_key(self, request, row):
+        model = self.get_queryset().model
+        keys = [generation_key(model)] + [generation_key(other) for other in self.cache_models]
+        if row is not None:
+            keys.append(generation_key(model, row))
+        scope = f"user:{request.user.pk}" if request.user.is_authenticated else "anon"
+        query = urlencode(sorted(request.query_params.lists()), doseq=True)
+        parts = [scope, request.path, query, request.accepted_media_type, *map(str, generations(keys))]
+        return "response:" + hashlib.blake2b("\n".join(parts).encode(), digest_size=20).hexdigest()
+
+    def cached(self, handler, request, row, *args, **kwargs):
+        # The browsable API embeds the user and forms; only JSON is shared
+        if request.accepted_renderer.format != "json":
+            return handler(request, *args, **kwargs)
+        store = response_cache()
+        key = self.cache_key(request, row)
+        entry = store.get(key)
+        if entry is not None:
+            etag, content, content_type = entry
+            response = HttpResponse(content, content_type=content_type)
+        else:
+            response = handler(request, *args, **kwargs)
+            if response.status_code != 200:
+                return response
+            response.accepted_renderer = request.accepted_renderer
+            response.accepted_media_type = request.accepted_media_type
+            response.renderer_context = self.get_renderer_context()
+            response.render()
+            etag = etag_for(response.content)
+            store.set(key, (etag, response.content, response["Content-Type"]),
+                      getattr(settings, "RESPONSE_CACHE_TTL", 300))
+
+        if etag in parse_etags(request.headers.get("If-None-Match", "")):
+            response = HttpResponseNotModified()
+        response["ETag"] = etag
+        patch_vary_headers(response, ["Authorization"])
+        return response
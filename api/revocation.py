@@ -0,0 +1,143 @@
+"""
+Refresh-token revocation: RevokedToken rows behind an in-memory Bloom filter.
+
+Each process keeps a Bloom filter of the revoked JTIs it knows about. A JTI
+missing from the filter (the common case, a token that was never revoked)
+is accepted with no query. Only a filter hit, meaning a revoked token or a
+false positive (about REVOCATION_FALSE_POSITIVE_RATE of the rest), is
+confirmed against the table.
+
+The filter is built from the table on first use. After that it is kept
+current by reading the rows revoked since the last sync, at most every
+REVOCATION_SYNC_INTERVAL seconds. Revocations made in this process are
+added immediately. Every REVOCATION_PRUNE_INTERVAL seconds, rows whose
+token has expired anyway are deleted and the filter is rebuilt, since a
+Bloom filter cannot forget.
+
+Rotation does not depend on the filter being fresh. `revoke()` INSERTs
+the JTI as a primary key, so a token replayed on another worker, or
+rotated twice at once, fails at that INSERT. Logout-only revocation can
+be missed by another worker for up to one sync interval.
+"""
+import functools
+import hashlib
+import math
+import threading
+import time
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+from rest_framework_simplejwt.settings import api_settings as jwt_settings
+
+from .models import RevokedToken
+
+# Re-read this much before the last sync, for rows committed out of order
+SYNC_OVERLAP = timedelta(seconds=5)
+
+
+class BloomFilter:
+    """Fixed-size Bloom filter over strings (double hashing on one blake2b digest)."""
+
+    def __init__(self, capacity, error_rate):
+        self.capacity = max(capacity, 1)
+        self.size = max(64, math.ceil(-self.capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hashes = max(1, round(self.size / self.capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+        self.count = 0
+
+    def positions(self, key):
+        digest = hashlib.blake2b(key.encode(), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        return [(h1 + i * h2) % self.size for i in range(self.hashes)]
+
+    def add(self, key):
+        for position in self.positions(key):
+            self.bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+    def __contains__(self, key):
+        return all(self.bits[position >> 3] & (1 << (position & 7)) for position in self.positions(key))
+
+
+class RevocationStore:
+    def __init__(self, capacity, error_rate, sync_interval, prune_interval):
+        self.capacity, self.error_rate = capacity, error_rate
+        self.sync_interval, self.prune_interval = sync_interval, prune_interval
+        self.lock = threading.Lock()
+        self.filter = None
+        self.synced_at = self.pruned_at = 0.0   # time.monotonic()
+        self.high_water = None                  # newest revoked_at seen
+
+    def sync(self):
+        """Bring the filter up to date if it is due; at most one small query per interval."""
+        now = time.monotonic()
+        if self.filter is not None and now - self.synced_at < self.sync_interval:
+            return
+        with self.lock:
+            if self.filter is None or now - self.pruned_at >= self.prune_interval:
+                RevokedToken.objects.filter(expires_at__lt=timezone.now()).delete()
+                self.rebuild()
+                self.pruned_at = now
+            elif now - self.synced_at >= self.sync_interval:
+                rows = RevokedToken.objects.values_list("jti", "revoked_at")
+                if self.high_water is not None:
+                    rows = rows.filter(revoked_at__gte=self.high_water - SYNC_OVERLAP)
+                self.load(rows)
+            self.synced_at = now
+
+    def rebuild(self):
+        count = RevokedToken.objects.count()
+        # Grow before the false-positive rate degrades
+        self.filter = BloomFilter(max(self.capacity, count * 2), self.error_rate)
+        self.high_water = None
+        self.load(RevokedToken.objects.values_list("jti", "revoked_at").iterator(chunk_size=10000))
+
+    def load(self, rows):
+        for jti, revoked_at in rows:
+            if jti not in self.filter:
+                self.filter.add(jti)
+            if self.high_water is None or revoked_at > self.high_water:
+                self.high_water = revoked_at
+        if self.filter.count > self.filter.capacity:
+            self.rebuild()
+
+    def add(self, jti):
+        with self.lock:
+            if self.filter is not None:
+                self.filter.add(jti)
+
+    def is_revoked(self, jti):
+        self.sync()
+        if jti not in self.filter:
+            return False
+        return RevokedToken.objects.filter(jti=jti).exists()
+
+
+@functools.lru_cache(maxsize=None)
+def store():
+    return RevocationStore(
+        capacity=getattr(settings, "REVOCATION_FILTER_CAPACITY", 100000),
+        error_rate=getattr(settings, "REVOCATION_FALSE_POSITIVE_RATE", 0.001),
+        sync_interval=getattr(settings, "REVOCATION_SYNC_INTERVAL", 1.0),
+        prune_interval=getattr(settings, "REVOCATION_PRUNE_INTERVAL", 3600),
+    )
+
+
+def is_revoked(jti):
+    return store().is_revoked(jti)
+
+
+def revoke(token):
+    """Revoke a refresh token until its expiry. False if it already was revoked."""
+    jti = token[jwt_settings.JTI_CLAIM]
+    expires_at = datetime.fromtimestamp(token["exp"], tz=dt_timezone.utc)
+    try:
+        with transaction.atomic():
+            RevokedToken.objects.create(jti=jti, expires_at=expires_at)
+    except IntegrityError:
+        return False
+    store().add(jti)
+    return True
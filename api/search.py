@@ -0,0 +1,145 @@
+"""
+Discovery search over users: username, bio and portfolio, ranked.
+
+`backend()` picks the implementation for the database in use, or the one
+named by SEARCH_BACKEND:
+
+- SQLite: an FTS5 table, `api_user_search` (migration 0010), with the
+  user id as rowid. Results are ordered by BM25, and a username hit
+  weighs more than a bio or portfolio one. Role is an indexed column too,
+  so filtering by it is part of the MATCH rather than a scan of every
+  hit. Prefix indexes make "fin" find "fintech" without a full term
+  scan.
+- PostgreSQL: a weighted tsvector over the same columns, ranked by
+  ts_rank. Nothing extra is stored; add a GIN index on the same
+  expression once there are many users.
+- Anything else: the old icontains scan, ordered by username.
+
+The index is written in the same transaction as the user (api.signals):
+every save that touches an indexed field, and every delete. bulk_create
+sends no signals, so run `manage.py rebuild_search_index` after bulk
+loads. Queries are reduced to words; each must match, as a prefix, in
+some column, so user input never reaches the FTS query syntax.
+"""
+import abc
+import functools
+import re
+
+from django.conf import settings
+from django.db import connection
+from django.db.models import Q
+from django.utils.module_loading import import_string
+
+from .models import User
+
+# Saves touching none of these (a login's last_login) leave the index alone
+INDEXED_FIELDS = frozenset({"username", "bio", "portfolio", "role"})
+WORD = re.compile(r"\w+")
+MAX_WORDS = 16
+
+
+def words(query):
+    """The searchable words of `query`, lowercased, at most MAX_WORDS."""
+    return WORD.findall(query.lower())[:MAX_WORDS]
+
+
+class SearchBackend(abc.ABC):
+    """Keeps the user index current and answers queries with user ids, best first."""
+
+    def index(self, users):
+        """Add or refresh `users`."""
+
+    def remove(self, pks):
+        """Drop the users with these primary keys."""
+
+    def rebuild(self):
+        """Index every user from scratch; returns how many."""
+        return User.objects.count()
+
+    @abc.abstractmethod
+    def search(self, words, role=None, limit=20, offset=0):
+        """Ids of the users matching every one of `words`, best first; `limit` None means all."""
+
+
+class SQLiteBackend(SearchBackend):
+    table = "api_user_search"
+    # bm25() weights, in column order: username, bio, portfolio, role
+    weights = (10.0, 2.0, 2.0, 0.0)
+
+    def index(self, users):
+        rows = [(user.pk, user.username, user.bio or "", user.portfolio or "", user.role) for user in users]
+        with connection.cursor() as cursor:
+            cursor.executemany(f"DELETE FROM {self.table} WHERE rowid = %s", [(row[0],) for row in rows])
+            cursor.executemany(
+                f"INSERT INTO {self.table} (rowid, username, bio, portfolio, role) VALUES (%s, %s, %s, %s, %s)", rows,
+            )
+
+    def remove(self, pks):
+        with connection.cursor() as cursor:
+            cursor.executemany(f"DELETE FROM {self.table} WHERE rowid = %s", [(pk,) for pk in pks])
+
+    def rebuild(self):
+        with connection.cursor() as cursor:
+            cursor.execute(f"DELETE FROM {self.table}")
+            cursor.execute(
+                f"INSERT INTO {self.table} (rowid, username, bio, portfolio, role) "
+                f"SELECT id, username, COALESCE(bio, ''), COALESCE(portfolio, ''), role FROM {User._meta.db_table}"
+            )
+            count = cursor.rowcount
+            # Merge the b-trees the bulk insert left behind
+            cursor.execute(f"INSERT INTO {self.table} ({self.table}) VALUES ('optimize')")
+        return count
+
+    def search(self, words, role=None, limit=20, offset=0):
+        # `words` are \w+ runs: quoting them is all the escaping FTS5 needs
+        match = "{username bio portfolio} : (" + " ".join(f'"{word}"*' for word in words) + ")"
+        if role:
+            match += f' AND role : "{role}"'
+        weights = ", ".join(map(str, self.weights))
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"SELECT rowid FROM {self.table} WHERE {self.table} MATCH %s "
+                f"ORDER BY bm25({self.table}, {weights}) LIMIT %s OFFSET %s",
+                [match, -1 if limit is None else limit, offset],
+            )
+            return [row[0] for row in cursor.fetchall()]
+
+
+class PostgreSQLBackend(SearchBackend):
+    def search(self, words, role=None, limit=20, offset=0):
+        from django.contrib.postgres.search import SearchQuery, SearchRank, SearchVector
+
+        vector = (
+            SearchVector("username", weight="A", config="simple")
+            + SearchVector("bio", weight="B", config="simple")
+            + SearchVector("portfolio", weight="B", config="simple")
+        )
+        query = SearchQuery(" & ".join(f"{word}:*" for word in words), search_type="raw", config="simple")
+        users = User.objects.annotate(document=vector).filter(document=query)
+        if role:
+            users = users.filter(role=role)
+        ranked = users.annotate(rank=SearchRank(vector, query)).order_by("-rank", "id").values_list("id", flat=True)
+        return list(ranked[offset:None if limit is None else offset + limit])
+
+
+class ScanBackend(SearchBackend):
+    """No index: every word must appear in some column, unranked."""
+
+    def search(self, words, role=None, limit=20, offset=0):
+        users = User.objects.all()
+        for word in words:
+            users = users.filter(Q(username__icontains=word) | Q(bio__icontains=word) | Q(portfolio__icontains=word))
+        if role:
+            users = users.filter(role=role)
+        ids = users.order_by("username").values_list("id", flat=True)
+        return list(ids[offset:None if limit is None else offset + limit])
+
+
+BACKENDS = {"sqlite": SQLiteBackend, "postgresql": PostgreSQLBackend}
+
+
+@functools.cache
+def backend():
+    path = getattr(settings, "SEARCH_BACKEND", None)
+    backend_class = import_string(path) if path else BACKENDS.get(connection.vendor, ScanBackend)
+    return backend_class()
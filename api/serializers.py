@@ -1,19 +1,75 @@
+import datetime
+import decimal
+from itertools import islice
+
 from rest_framework import serializers
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.exceptions import InvalidToken, TokenError
+from rest_framework_simplejwt.serializers import TokenRefreshSerializer
+from rest_framework_simplejwt.settings import api_settings as jwt_settings
+from rest_framework_simplejwt.tokens import RefreshToken
+from rest_framework.settings import ISO_8601, api_settings
+from django.conf import settings
 from django.contrib.auth import get_user_model
-from .models import Meeting, VideoRoom, Document, DocumentSignature, Wallet, Transaction
-from django.contrib.auth import authenticate
+from django.db import models, transaction
+from django.utils import timezone
+from . import availability, credentials, recurrence, revocation
+from .authentication import CachedJWTAuthentication
+from .fieldsets import Fieldset
+from .models import (
+    Meeting, MeetingException, VideoRoom, Document, DocumentSignature, DocumentVersion, Upload, Wallet, Transaction,
+)
 
 User = get_user_model()
 
 # -------------------------
 # 1. User & Profile
 # -------------------------
-class UserSerializer(serializers.ModelSerializer):
+class ExpandableFieldsMixin:
+    """
+    Renders the fields chosen by the request's Fieldset (context["fieldset"],
+    see api.fieldsets). The relations in `expandable` render as primary keys
+    unless expanded, then through the serializer given for them.
+    """
+    expandable = {}   # relation -> serializer class of the expanded form
+
+    def __init__(self, *args, fieldset=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._fieldset = fieldset
+
+    @property
+    def fieldset(self):
+        if self._fieldset is None:
+            self._fieldset = self.context.get("fieldset") or Fieldset()
+        return self._fieldset
+
+    def get_fields(self):
+        fields = super().get_fields()
+        fieldset = self.fieldset
+        fieldset.check(fields, self.expandable)
+        for name, serializer_class in self.expandable.items():
+            many = self.Meta.model._meta.get_field(name).many_to_many
+            if fieldset.expands(name):
+                fields[name] = serializer_class(many=many, read_only=True, fieldset=fieldset.nested(name))
+            else:
+                fields[name] = serializers.PrimaryKeyRelatedField(many=many, read_only=True)
+        return {name: field for name, field in fields.items() if fieldset.selects(name)}
+
+
+class UserSerializer(ExpandableFieldsMixin, serializers.ModelSerializer):
     class Meta:
         model = User
         fields = ["id", "username", "email", "role", "bio", "portfolio", "preferences"]
 
 
+class PublicUserSerializer(serializers.ModelSerializer):
+    """What any signed-in user may see of another: no email or preferences."""
+
+    class Meta:
+        model = User
+        fields = ["id", "username", "role", "bio", "portfolio"]
+
+
 class RegisterSerializer(serializers.ModelSerializer):
     password = serializers.CharField(write_only=True)
 
@@ -35,23 +91,130 @@ class RegisterSerializer(serializers.ModelSerializer):
 # -------------------------
 # 2. Meetings & Video Rooms
 # -------------------------
-class MeetingSerializer(serializers.ModelSerializer):
-    organizer = UserSerializer(read_only=True)
-    participants = UserSerializer(many=True, read_only=True)
+class MeetingSerializer(ExpandableFieldsMixin, serializers.ModelSerializer):
+    expandable = {"organizer": UserSerializer, "participants": UserSerializer}
 
     class Meta:
         model = Meeting
-        fields = ["id", "title", "description", "organizer", "participants", "start_time", "end_time", "status"]
+        fields = ["id", "title", "description", "organizer", "participants", "start_time", "end_time", "status",
+                  "recurrence", "recurrence_interval", "recurrence_count", "recurrence_until"]
 
 
 class MeetingCreateSerializer(serializers.ModelSerializer):
+    """
+    Writes for MeetingViewSet: the organizer is the requesting user, and
+    nobody involved may already be booked (api.availability), at any
+    occurrence of a recurring meeting (open-ended series: within
+    RECURRENCE_HORIZON_DAYS).
+    """
+
     class Meta:
         model = Meeting
-        fields = ["id", "title", "description", "start_time", "end_time", "participants"]
+        fields = ["id", "title", "description", "organizer", "participants", "start_time", "end_time", "status",
+                  "recurrence", "recurrence_interval", "recurrence_count", "recurrence_until"]
+        read_only_fields = ["organizer"]
+
+    def validate(self, attrs):
+        start = attrs.get("start_time", getattr(self.instance, "start_time", None))
+        end = attrs.get("end_time", getattr(self.instance, "end_time", None))
+        if start and end and end <= start:
+            raise serializers.ValidationError({"end_time": "Must be after start_time."})
+        rule = self.rule(attrs)
+        if rule.frequency:
+            errors = {}
+            if rule.interval < 1:
+                errors["recurrence_interval"] = "Must be at least 1."
+            if rule.count is not None and rule.count < 1:
+                errors["recurrence_count"] = "Must be at least 1."
+            if rule.until is not None and rule.until < rule.start:
+                errors["recurrence_until"] = "Must not be before start_time."
+            if rule.interval >= 1 and end - start > recurrence.step(rule):
+                errors["end_time"] = "Occurrences of a recurring meeting must not overlap each other."
+            if errors:
+                raise serializers.ValidationError(errors)
+        return attrs
+
+    def rule(self, attrs):
+        """The recurrence.Rule the meeting will have once `attrs` are saved."""
+        meeting = {
+            name: attrs[name] if name in attrs else
+            getattr(self.instance, name) if self.instance else Meeting._meta.get_field(name).get_default()
+            for name in ("start_time", "end_time", *recurrence.RULE_FIELDS)
+        }
+        return recurrence.rule_of(meeting)
+
+    def check_availability(self, organizer_id, validated_data):
+        meeting = self.instance
+        if validated_data.get("status", getattr(meeting, "status", "scheduled")) == "canceled":
+            return
+        if "participants" in validated_data:
+            participants = [user.pk for user in validated_data["participants"]]
+        else:
+            participants = list(meeting.participants.values_list("pk", flat=True))
+        rule, during = self.rule(validated_data), None
+        start, end = rule.start, rule.end
+        if rule.frequency:
+            start, end = recurrence.span(rule)
+            changes = availability.exceptions([meeting.pk]).get(meeting.pk, ()) if meeting else ()
+            during = [occurrence[1:] for occurrence in recurrence.occurrences(rule, start, end, changes)]
+        availability.ensure_free(
+            sorted({organizer_id, *participants}), start, end, exclude=getattr(meeting, "pk", None), during=during,
+        )
 
+    def create(self, validated_data):
+        with transaction.atomic():
+            self.check_availability(validated_data["organizer"].pk, validated_data)
+            return super().create(validated_data)
+
+    def update(self, instance, validated_data):
+        with transaction.atomic():
+            self.check_availability(instance.organizer_id, validated_data)
+            previous = recurrence.rule_of(instance)
+            meeting = super().update(instance, validated_data)
+            rule = recurrence.rule_of(meeting)
+            if rule != previous:
+                # Exceptions are keyed by the starts the old rule gave; keep those the new one still has
+                stale = [exception.pk for exception in meeting.exceptions.all()
+                         if not rule.frequency or not recurrence.is_occurrence(rule, exception.original_start)]
+                MeetingException.objects.filter(pk__in=stale).delete()
+            return meeting
+
+
+class MeetingExceptionSerializer(serializers.ModelSerializer):
+    """
+    One occurrence of a series canceled, or moved to start_time/end_time.
+    Posting again for the same `original_start` replaces it.
+    """
 
-class VideoRoomSerializer(serializers.ModelSerializer):
-    meeting = MeetingSerializer(read_only=True)
+    class Meta:
+        model = MeetingException
+        fields = ["id", "original_start", "canceled", "start_time", "end_time"]
+        validators = []   # the unique (meeting, original_start) pair is an upsert, see MeetingViewSet.exceptions
+
+    def validate(self, attrs):
+        meeting = self.context["meeting"]
+        rule = recurrence.rule_of(meeting)
+        if not rule.frequency:
+            raise serializers.ValidationError("Only recurring meetings have occurrences.")
+        if not recurrence.is_occurrence(rule, attrs["original_start"]):
+            raise serializers.ValidationError({"original_start": "Not the start of an occurrence of this meeting."})
+        if attrs.get("canceled"):
+            attrs["start_time"] = attrs["end_time"] = None
+            return attrs
+        start, end = attrs.get("start_time"), attrs.get("end_time")
+        if start is None or end is None:
+            raise serializers.ValidationError("A moved occurrence needs start_time and end_time; or set canceled.")
+        if end <= start:
+            raise serializers.ValidationError({"end_time": "Must be after start_time."})
+        first, last = rule.start, recurrence.series_end(rule)
+        if start < first or (last is not None and end > last):
+            # Windows find a series by its span (api.recurrence.overlapping)
+            raise serializers.ValidationError({"start_time": "Occurrences cannot move outside the series."})
+        return attrs
+
+
+class VideoRoomSerializer(ExpandableFieldsMixin, serializers.ModelSerializer):
+    expandable = {"meeting": MeetingSerializer}
 
     class Meta:
         model = VideoRoom
@@ -61,12 +224,12 @@ class VideoRoomSerializer(serializers.ModelSerializer):
 # -------------------------
 # 3. Documents & Signatures
 # -------------------------
-class DocumentSerializer(serializers.ModelSerializer):
-    owner = UserSerializer(read_only=True)
+class DocumentSerializer(ExpandableFieldsMixin, serializers.ModelSerializer):
+    expandable = {"owner": UserSerializer}
 
     class Meta:
         model = Document
-        fields = ["id", "owner", "file", "title", "version", "status", "uploaded_at"]
+        fields = ["id", "owner", "file", "sha256", "title", "version", "status", "uploaded_at"]
 
 
 class DocumentUploadSerializer(serializers.ModelSerializer):
@@ -75,6 +238,39 @@ class DocumentUploadSerializer(serializers.ModelSerializer):
         fields = ["id", "file", "title"]
 
 
+class UploadSerializer(serializers.ModelSerializer):
+    """A chunked upload session (api.uploads); `document` makes it a new version of that document."""
+
+    class Meta:
+        model = Upload
+        fields = ["id", "title", "document", "size", "received", "created_at"]
+        read_only_fields = ["received", "created_at"]
+
+    def validate_size(self, value):
+        limit = getattr(settings, "UPLOAD_MAX_SIZE", None)
+        if value < 0 or (limit and value > limit):
+            raise serializers.ValidationError(f"Size must be between 0 and {limit} bytes.")
+        return value
+
+    def validate_document(self, document):
+        if document is not None and document.owner_id != self.context["request"].user.pk:
+            raise serializers.ValidationError("You can only upload new versions of your own documents.")
+        return document
+
+
+class UploadCompleteSerializer(serializers.Serializer):
+    sha256 = serializers.RegexField(r"^[0-9a-fA-F]{64}$", required=False,
+                                    help_text="Expected SHA-256; a mismatch discards the upload.")
+
+
+class DocumentVersionSerializer(serializers.ModelSerializer):
+    """A row of a document's history (api.versions); `stored_size` is what it costs on disk."""
+
+    class Meta:
+        model = DocumentVersion
+        fields = ["number", "title", "sha256", "size", "stored_size", "kind", "created_by", "created_at"]
+
+
 class DocumentSignatureSerializer(serializers.ModelSerializer):
     signed_by = UserSerializer(read_only=True)
 
@@ -94,19 +290,45 @@ class WalletSerializer(serializers.ModelSerializer):
         fields = ["id", "user", "balance"]
 
 
-class TransactionSerializer(serializers.ModelSerializer):
-    sender = UserSerializer(read_only=True)
-    receiver = UserSerializer(read_only=True)
+class TransactionSerializer(ExpandableFieldsMixin, serializers.ModelSerializer):
+    expandable = {"sender": UserSerializer, "receiver": UserSerializer}
 
     class Meta:
         model = Transaction
         fields = ["id", "sender", "receiver", "transaction_type", "amount", "status", "created_at"]
 
 
+class StatementEntrySerializer(serializers.Serializer):
+    """One ledger entry on a wallet statement, with the balance after it."""
+    id = serializers.IntegerField()
+    transaction = serializers.IntegerField(source="transaction_id")
+    transaction_type = serializers.CharField(source="transaction__transaction_type")
+    amount = serializers.DecimalField(max_digits=12, decimal_places=2)
+    balance = serializers.DecimalField(max_digits=12, decimal_places=2)
+    created_at = serializers.DateTimeField()
+
+
 class TransactionCreateSerializer(serializers.ModelSerializer):
+    """Input for a ledger posting; the sender is always the requesting user."""
+    transaction_type = serializers.ChoiceField(choices=Transaction.TRANSACTION_TYPES, default="transfer")
+    receiver = serializers.PrimaryKeyRelatedField(queryset=User.objects.all(), required=False, allow_null=True)
+    amount = serializers.DecimalField(max_digits=10, decimal_places=2, min_value=decimal.Decimal("0.01"))
+
     class Meta:
         model = Transaction
-        fields = ["id", "receiver", "amount"]
+        fields = ["transaction_type", "receiver", "amount"]
+
+    def validate(self, data):
+        if data["transaction_type"] == "transfer" and not data.get("receiver"):
+            raise serializers.ValidationError({"receiver": "A transfer needs a receiver."})
+        return data
+
+
+class WalletAdjustmentSerializer(serializers.Serializer):
+    """A staff deposit into, or withdrawal from, `user`'s wallet."""
+    transaction_type = serializers.ChoiceField(choices=[("deposit", "Deposit"), ("withdraw", "Withdraw")])
+    user = serializers.PrimaryKeyRelatedField(queryset=User.objects.all())
+    amount = serializers.DecimalField(max_digits=10, decimal_places=2, min_value=decimal.Decimal("0.01"))
 
 
 # -------------------------
@@ -124,19 +346,326 @@ class LoginSerializer(serializers.Serializer):
         if not identifier or not password:
             raise serializers.ValidationError("Username/email and password are required.")
 
-        # Find user by email if email is supplied
-        user = None
-        if data.get("email"):
-            try:
-                user_obj = User.objects.get(email=data["email"])
-                user = authenticate(username=user_obj.username, password=password)
-            except User.DoesNotExist:
-                user = None
-        else:
-            user = authenticate(username=data["username"], password=password)
+        # One query by email or username; the hash check runs on api.credentials' pool
+        user = credentials.authenticate(password, username=data.get("username"), email=data.get("email"))
 
         if not user:
             raise serializers.ValidationError("Invalid credentials.")
 
         data["user"] = user
         return data
+
+
+class RotatingTokenRefreshSerializer(TokenRefreshSerializer):
+    """
+    TokenRefreshSerializer on api.revocation instead of simplejwt's
+    token_blacklist app (SIMPLE_JWT["TOKEN_REFRESH_SERIALIZER"]). A rotated
+    or logged-out refresh token is rejected; a valid one costs no
+    revocation query, one INSERT to rotate it, and a user check served by
+    CachedJWTAuthentication's cache.
+    """
+
+    def validate(self, attrs):
+        refresh = self.token_class(attrs["refresh"])
+        if revocation.is_revoked(refresh[jwt_settings.JTI_CLAIM]):
+            raise TokenError("Token is blacklisted")
+        if jwt_settings.USER_ID_CLAIM in refresh:
+            try:
+                CachedJWTAuthentication().get_user(refresh)
+            except AuthenticationFailed:
+                raise AuthenticationFailed(self.error_messages["no_active_account"], "no_active_account")
+
+        data = {"access": str(refresh.access_token)}
+        if jwt_settings.ROTATE_REFRESH_TOKENS:
+            # The INSERT fails if another request rotated this token first
+            if jwt_settings.BLACKLIST_AFTER_ROTATION and not revocation.revoke(refresh):
+                raise TokenError("Token is blacklisted")
+            refresh.set_jti()
+            refresh.set_exp()
+            refresh.set_iat()
+            data["refresh"] = str(refresh)
+        return data
+
+
+class LogoutSerializer(serializers.Serializer):
+    refresh = serializers.CharField()
+
+    def validate(self, data):
+        try:
+            data["token"] = RefreshToken(data["refresh"])
+        except TokenError as exc:
+            raise InvalidToken(exc.args[0])
+        return data
+
+
+
+# -------------------------
+# 6. Fast read path (high-volume lists)
+# -------------------------
+def _datetime_converter():
+    """Same output as serializers.DateTimeField().to_representation."""
+    if api_settings.DATETIME_FORMAT != ISO_8601:
+        return serializers.DateTimeField().to_representation
+
+    tz = timezone.get_current_timezone() if settings.USE_TZ else None
+
+    def convert(value):
+        if tz is not None:
+            value = value.astimezone(tz) if timezone.is_aware(value) else timezone.make_aware(value, tz)
+        elif timezone.is_aware(value):
+            value = timezone.make_naive(value, datetime.timezone.utc)
+        value = value.isoformat()
+        if value.endswith("+00:00"):
+            value = value[:-6] + "Z"
+        return value
+
+    return convert
+
+
+def _decimal_converter(model_field):
+    """Same output as serializers.DecimalField(max_digits, decimal_places).to_representation."""
+    context = decimal.getcontext().copy()
+    context.prec = model_field.max_digits
+    exponent = decimal.Decimal(".1") ** model_field.decimal_places
+    as_string = api_settings.COERCE_DECIMAL_TO_STRING
+
+    def convert(value):
+        quantized = value.quantize(exponent, context=context)
+        return f"{quantized:f}" if as_string else quantized
+
+    return convert
+
+
+def _file_converter(model_field, context):
+    """Same output as serializers.FileField().to_representation for a stored name."""
+    storage = model_field.storage
+    request = context.get("request")
+    use_url = api_settings.UPLOADED_FILES_USE_URL
+
+    def convert(value):
+        if not value:
+            return None
+        if not use_url:
+            return value
+        url = storage.url(value)
+        return request.build_absolute_uri(url) if request is not None else url
+
+    return convert
+
+
+class FastReadSerializer:
+    """
+    Opt-in, read-only list serializer that renders `.values()` rows directly.
+
+    Expanded FK users are JOINed into the same `.values()` query (columns
+    `<field>__<user field>`) and M2M users are read with one query on the
+    through table, so the query count matches the select_related/prefetch
+    builders in api.querysets. Only the columns of the request's Fieldset
+    are selected; unexpanded users are the FK column or the through table's
+    user id, with no JOIN. Every output field has a converter compiled
+    once per call: no per-row serializer instances and no per-field
+    `to_representation` dispatch.
+
+    Subclasses mirror `serializer_class` and must render identical JSON;
+    api.tests.FastReadSerializerTests checks that byte for byte.
+    """
+
+    model = None
+    serializer_class = None
+    nested_users = ()   # FK  -> UserSerializer
+    many_users = ()     # M2M -> UserSerializer(many=True), ordered by user id
+
+    def __init__(self, context=None):
+        self.context = context or {}
+        fieldset = self.context.get("fieldset") or Fieldset()
+        fieldset.check(self.serializer_class.Meta.fields, (*self.nested_users, *self.many_users))
+        self.fields = [name for name in self.serializer_class.Meta.fields if fieldset.selects(name)]
+        # relation -> user fields to render, or None for the primary key
+        self.user_fields = {}
+        for name in (*self.nested_users, *self.many_users):
+            if name in self.fields and fieldset.expands(name):
+                nested = fieldset.nested(name)
+                nested.check(UserSerializer.Meta.fields, ())
+                self.user_fields[name] = [field for field in UserSerializer.Meta.fields if nested.selects(field)]
+            else:
+                self.user_fields[name] = None
+
+    # -- queries ---------------------------------------------------------
+    def values(self, queryset, extra=()):
+        """
+        `queryset` as `.values()` rows carrying every column needed to
+        render, plus the `extra` ones (e.g. the pagination key).
+        """
+        columns = []
+        for name in self.fields:
+            if name in self.many_users:
+                continue
+            columns.append(name)
+            if self.user_fields.get(name):
+                columns += [f"{name}__{field}" for field in self.user_fields[name]]
+        # M2M users are grouped by id
+        columns += [name for name in ("id", *extra) if name not in columns]
+        return queryset.prefetch_related(None).values(*columns)
+
+    def selected_many_users(self):
+        return [name for name in self.many_users if name in self.fields]
+
+    def related_querysets(self, rows):
+        """{m2m field: through-table `.values()` queryset} for the given page."""
+        pks = [row["id"] for row in rows]
+        querysets = {}
+        for name in self.selected_many_users():
+            field = self.model._meta.get_field(name)
+            source, target = field.m2m_field_name(), field.m2m_reverse_field_name()
+            user_fields = self.user_fields[name]
+            columns = [f"{target}__{f}" for f in user_fields] if user_fields else [f"{target}_id"]
+            querysets[name] = (
+                field.remote_field.through.objects
+                .filter(**{f"{source}_id__in": pks})
+                .order_by(f"{target}_id")
+                .values_list(f"{source}_id", *columns)
+            )
+        return querysets
+
+    def group_related(self, rows, fetched):
+        """{m2m field: {pk: [user dict or id, ...]}} from fetched through-table tuples."""
+        related = {}
+        for name, links in fetched.items():
+            user_fields = self.user_fields[name]
+            grouped = {row["id"]: [] for row in rows}
+            for owner, *user in links:
+                grouped[owner].append(dict(zip(user_fields, user)) if user_fields else user[0])
+            related[name] = grouped
+        return related
+
+    def load_related(self, rows):
+        if not rows:
+            return {name: {} for name in self.selected_many_users()}
+        fetched = {name: list(qs) for name, qs in self.related_querysets(rows).items()}
+        return self.group_related(rows, fetched)
+
+    async def aload_related(self, rows):
+        if not rows:
+            return {name: {} for name in self.selected_many_users()}
+        fetched = {name: [link async for link in qs] for name, qs in self.related_querysets(rows).items()}
+        return self.group_related(rows, fetched)
+
+    # -- rendering -------------------------------------------------------
+    def converters(self):
+        plan = []
+        for name in self.fields:
+            if name in self.nested_users:
+                user_fields = self.user_fields[name]
+                if user_fields:
+                    plan.append((name, "user", (user_fields, [f"{name}__{f}" for f in user_fields])))
+                else:
+                    plan.append((name, "value", None))
+                continue
+            if name in self.many_users:
+                plan.append((name, "users", None))
+                continue
+            field = self.model._meta.get_field(name)
+            if isinstance(field, models.FileField):
+                plan.append((name, "file", _file_converter(field, self.context)))
+            elif isinstance(field, models.DateTimeField):
+                plan.append((name, "value", _datetime_converter()))
+            elif isinstance(field, models.DecimalField):
+                plan.append((name, "value", _decimal_converter(field)))
+            else:
+                plan.append((name, "value", None))
+        return plan
+
+    def render(self, rows, related):
+        plan = self.converters()
+        out = []
+        for row in rows:
+            item = {}
+            for name, kind, extra in plan:
+                if kind == "value":
+                    value = row[name]
+                    item[name] = value if value is None or extra is None else extra(value)
+                elif kind == "user":
+                    user_fields, columns = extra
+                    item[name] = None if row[name] is None else dict(zip(user_fields, map(row.__getitem__, columns)))
+                elif kind == "users":
+                    item[name] = related[name][row["id"]]
+                else:  # file
+                    item[name] = extra(row[name])
+            out.append(item)
+        return out
+
+    def to_representation(self, rows):
+        rows = list(rows)
+        return self.render(rows, self.load_related(rows))
+
+    async def ato_representation(self, rows):
+        """to_representation for async views: `rows` must already be fetched."""
+        rows = list(rows)
+        return self.render(rows, await self.aload_related(rows))
+
+
+class FastMeetingSerializer(FastReadSerializer):
+    model = Meeting
+    serializer_class = MeetingSerializer
+    nested_users = ("organizer",)
+    many_users = ("participants",)
+
+    def occurrences(self, queryset, start, end, after=None, limit=50):
+        """
+        The first `limit` meetings in `queryset` overlapping [start, end),
+        recurring ones once per occurrence, as (start, meeting id, item)
+        ordered by that key and, given `after`, past that key. Single
+        meetings are read a page at a time in SQL by (start_time, id). Each
+        series still in play is expanded only up to `limit` occurrences past
+        the key, and only the rows that make the page are rendered. Each
+        item carries `occurrence`: the start its rule gives it (null for
+        single meetings), which is what MeetingViewSet.exceptions takes as
+        `original_start`.
+        """
+        if after is not None:
+            # Whatever starts at or after the key ends after it too, so
+            # overlapping() below keeps only series with series_end past it
+            start = max(start, after[0])
+        queryset = queryset.filter(recurrence.overlapping(start, end))
+        singles = queryset.filter(recurrence="").order_by("start_time", "id")
+        if after is not None:
+            singles = singles.filter(models.Q(start_time__gt=after[0]) | models.Q(start_time=after[0], id__gt=after[1]))
+        extra = ("start_time", "end_time", *recurrence.RULE_FIELDS)
+        rows = [*self.values(singles, extra=extra)[:limit], *self.values(queryset.exclude(recurrence=""), extra=extra)]
+        series = [row["id"] for row in rows if row["recurrence"]]
+        changes = availability.exceptions(series) if series else {}
+
+        found = []
+        for row in rows:
+            expanded = recurrence.occurrences(recurrence.rule_of(row), start, end, changes.get(row["id"], ()))
+            if after is not None:
+                expanded = (entry for entry in expanded if (entry[1], row["id"]) > tuple(after))
+            found += [(begins, row["id"], original, ends, row) for original, begins, ends in islice(expanded, limit)]
+        found.sort(key=lambda entry: entry[:2])
+        found = found[:limit]
+
+        page_rows = list({entry[1]: entry[4] for entry in found}.values())
+        items = dict(zip((row["id"] for row in page_rows), self.render(page_rows, self.load_related(page_rows))))
+        convert = _datetime_converter()
+        page = []
+        for begins, meeting_id, original, ends, row in found:
+            occurrence = dict(items[meeting_id])
+            if "start_time" in occurrence:
+                occurrence["start_time"] = convert(begins)
+            if "end_time" in occurrence:
+                occurrence["end_time"] = convert(ends)
+            occurrence["occurrence"] = convert(original) if row["recurrence"] else None
+            page.append((begins, meeting_id, occurrence))
+        return page
+
+
+class FastDocumentSerializer(FastReadSerializer):
+    model = Document
+    serializer_class = DocumentSerializer
+    nested_users = ("owner",)
+
+
+class FastTransactionSerializer(FastReadSerializer):
+    model = Transaction
+    serializer_class = TransactionSerializer
+    nested_users = ("sender", "receiver")
@@ -0,0 +1,77 @@
+"""
+Signal receivers of the api app, connected in ApiConfig.ready().
+"""
+from django.contrib.auth import get_user_model
+from django.core.signals import setting_changed
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+
+from . import authentication, credentials, response_cache, revocation, search
+from .models import Meeting, MeetingException, VideoRoom, Document, Transaction
+
+User = get_user_model()
+
+
+@receiver(post_save, sender=User, dispatch_uid="api.drop_cached_user.save")
+@receiver(post_delete, sender=User, dispatch_uid="api.drop_cached_user.delete")
+def drop_cached_user(sender, instance, **kwargs):
+    """Profile edits, deactivation and deletion apply on the next request."""
+    authentication.user_cache().invalidate(instance.pk)
+
+
+@receiver(post_save, sender=User, dispatch_uid="api.index_user.save")
+def index_user(sender, instance, update_fields=None, **kwargs):
+    """Profile edits are searchable at once, in the same transaction (api.search)."""
+    if update_fields is None or not search.INDEXED_FIELDS.isdisjoint(update_fields):
+        search.backend().index([instance])
+
+
+@receiver(post_delete, sender=User, dispatch_uid="api.index_user.delete")
+def unindex_user(sender, instance, **kwargs):
+    search.backend().remove([instance.pk])
+
+
+def retire_cached_responses(sender, instance, created=False, **kwargs):
+    """Cached reads showing the changed row stop matching (api.response_cache)."""
+    # A new user is in no cached response until a meeting, document or transaction links it
+    if not (sender is User and created):
+        response_cache.invalidate(sender, [instance.pk])
+
+
+# Per model: a receiver for every sender would cost other models Django's fast delete
+for model in (User, Meeting, VideoRoom, Document, Transaction):
+    post_save.connect(retire_cached_responses, sender=model, dispatch_uid=f"api.retire_cached_responses.save.{model.__name__}")
+    post_delete.connect(retire_cached_responses, sender=model, dispatch_uid=f"api.retire_cached_responses.delete.{model.__name__}")
+
+
+@receiver(post_save, sender=MeetingException, dispatch_uid="api.retire_cached_occurrences.save")
+@receiver(post_delete, sender=MeetingException, dispatch_uid="api.retire_cached_occurrences.delete")
+def retire_cached_occurrences(sender, instance, **kwargs):
+    """A canceled or moved occurrence changes what its series lists (api.recurrence)."""
+    response_cache.invalidate(Meeting, [instance.meeting_id])
+
+
+@receiver(m2m_changed, sender=Meeting.participants.through, dispatch_uid="api.retire_cached_responses.m2m")
+def retire_cached_participants(sender, instance, action, reverse, pk_set, **kwargs):
+    if not reverse and action in ("post_add", "post_remove", "post_clear"):
+        meetings = [instance.pk]
+    elif reverse and action in ("post_add", "post_remove"):
+        meetings = pk_set
+    elif reverse and action == "pre_clear":
+        # pk_set is None on clear: read the user's meetings while still linked
+        meetings = list(instance.meetings.values_list("pk", flat=True))
+    else:
+        return
+    response_cache.invalidate(Meeting, meetings)
+
+
+@receiver(setting_changed, dispatch_uid="api.reset_caches")
+def reset_caches(setting, **kwargs):
+    if setting in ("LOGIN_HASH_WORKERS", "LOGIN_HASH_QUEUE"):
+        credentials.hash_pool.cache_clear()
+    elif setting in ("JWT_USER_CACHE_SIZE", "JWT_USER_CACHE_TTL"):
+        authentication.user_cache.cache_clear()
+    elif setting.startswith("REVOCATION_"):
+        revocation.store.cache_clear()
+    elif setting == "SEARCH_BACKEND":
+        search.backend.cache_clear()
@@ -1,4 +1,45 @@
 import asyncio, websockets, json
+import contextlib
+import hashlib
+import io
+import os
+import random
+import tempfile
+import types
+from datetime import datetime, timedelta
+from decimal import Decimal
+from unittest import mock
+from urllib.parse import urlencode
+
+import msgpack
+
+from channels.exceptions import ChannelFull
+from channels.layers import InMemoryChannelLayer
+from channels.routing import URLRouter
+from channels.testing import WebsocketCommunicator
+from django.conf import settings
+from django.core.cache.backends.filebased import FileBasedCache
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import connection
+from django.test import SimpleTestCase, TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+from rest_framework.test import APIClient, APIRequestFactory
+
+from . import exports, ledger, recurrence, response_cache, revocation, versions
+from .authentication import ClaimsJWTAuthentication, tokens_for, user_cache
+from .broker import BrokerChannelLayer, BrokerServer
+from .consumers import MeetingConsumer
+from .routing import websocket_urlpatterns
+from .models import User, Meeting, VideoRoom, Document, DocumentSignature, Transaction, Wallet, LedgerEntry, WalletCheckpoint, RevokedToken, Upload
+from .fieldsets import Fieldset
+from .querysets import meeting_queryset, document_queryset, transaction_queryset
+from .serializers import FastMeetingSerializer, FastDocumentSerializer, FastTransactionSerializer
+from .urls import router
+
 
 async def test_ws():
     uri = "ws://127.0.0.1:8000/ws/meetings/testroom/"
@@ -7,4 +48,1617 @@ async def test_ws():
         response = await websocket.recv()
         print("Response:", response)
 
-asyncio.run(test_ws())
+
+# -------------------------
+# Fixtures
+# -------------------------
+def make_user(n, role="investor"):
+    return User.objects.create(username=f"user{n}", email=f"user{n}@example.com", role=role)
+
+
+def seed_rows(count, start=0):
+    """Create `count` meetings (3 participants each), rooms, documents and transactions."""
+    now = timezone.now()
+    for i in range(start, start + count):
+        organizer = make_user(f"o{i}", "entrepreneur")
+        guests = [make_user(f"p{i}_{k}") for k in range(3)]
+        meeting = Meeting.objects.create(
+            title=f"Pitch {i}",
+            organizer=organizer,
+            start_time=now + timedelta(hours=i),
+            end_time=now + timedelta(hours=i, minutes=30),
+        )
+        meeting.participants.set(guests)
+        VideoRoom.objects.create(meeting=meeting, room_id=f"room{i}")
+        Document.objects.create(owner=organizer, file=f"documents/doc{i}.pdf", title=f"Deck {i}")
+        Transaction.objects.create(
+            sender=guests[0], receiver=organizer, transaction_type="transfer", amount="10.00"
+        )
+
+
+# -------------------------
+# Query budgets
+# -------------------------
+class QueryBudgetTests(TestCase):
+    """
+    Every router viewset declares `query_budget`; its list/detail actions
+    must stay within budget and not grow with the number of rows.
+    """
+
+    def setUp(self):
+        self.client = APIClient()
+
+    def count_queries(self, url):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200, url)
+        return len(ctx.captured_queries)
+
+    def assertWithinQueryBudget(self, url, budget):
+        used = self.count_queries(url)
+        self.assertLessEqual(used, budget, f"{url} ran {used} queries (budget {budget})")
+        return used
+
+    def test_every_viewset_declares_a_budget(self):
+        for prefix, viewset, basename in router.registry:
+            budget = getattr(viewset, "query_budget", None)
+            self.assertIsNotNone(budget, f"{viewset.__name__} has no query_budget")
+            self.assertTrue({"list", "retrieve"} <= set(budget), viewset.__name__)
+
+    def test_list_and_detail_stay_within_budget(self):
+        seed_rows(2)
+        small = {}
+        for prefix, viewset, basename in router.registry:
+            small[prefix] = self.assertWithinQueryBudget(f"/api/{prefix}/", viewset.query_budget["list"])
+
+        seed_rows(25, start=2)
+        for prefix, viewset, basename in router.registry:
+            used = self.assertWithinQueryBudget(f"/api/{prefix}/", viewset.query_budget["list"])
+            self.assertEqual(used, small[prefix], f"/api/{prefix}/ query count grows with rows")
+
+            pk = viewset.queryset.model.objects.values_list("pk", flat=True).first()
+            self.assertWithinQueryBudget(f"/api/{prefix}/{pk}/", viewset.query_budget["retrieve"])
+
+
+# -------------------------
+# Keyset pagination
+# -------------------------
+class KeysetPaginationTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        sender, receiver = make_user("s"), make_user("r")
+        Transaction.objects.bulk_create([
+            Transaction(sender=sender, receiver=receiver, transaction_type="transfer", amount="1.00")
+            for _ in range(23)
+        ])
+        # Several rows share a timestamp: the cursor must still split ties on id.
+        stamp = timezone.now()
+        Transaction.objects.filter(pk__in=list(Transaction.objects.values_list("pk", flat=True)[:10])).update(
+            created_at=stamp
+        )
+        response_cache.invalidate(Transaction)   # bulk_create/update() send no signals
+
+    def walk(self, url):
+        ids, pages = [], 0
+        while url:
+            body = self.client.get(url).json()
+            ids += [row["id"] for row in body["results"]]
+            url, pages = body["next"], pages + 1
+        return ids, pages, body
+
+    def test_forward_walk_visits_every_row_once_in_order(self):
+        ids, pages, _ = self.walk("/api/transactions/?page_size=5")
+        expected = list(Transaction.objects.order_by("-created_at", "-id").values_list("id", flat=True))
+        self.assertEqual(ids, expected)
+        self.assertEqual(pages, 5)
+
+    def test_previous_link_returns_the_preceding_page(self):
+        first = self.client.get("/api/transactions/?page_size=5").json()
+        self.assertIsNone(first["previous"])
+        second = self.client.get(first["next"]).json()
+        back = self.client.get(second["previous"]).json()
+        self.assertEqual(back["results"], first["results"])
+
+    def test_invalid_cursor_is_404(self):
+        self.assertEqual(self.client.get("/api/transactions/?cursor=bogus").status_code, 404)
+
+    def test_page_query_uses_composite_index(self):
+        if connection.vendor != "sqlite":
+            self.skipTest("EXPLAIN output is backend specific")
+        second = self.client.get("/api/transactions/?page_size=5").json()["next"]
+        with CaptureQueriesContext(connection) as ctx:
+            self.client.get(second)
+        with connection.cursor() as cursor:
+            cursor.execute("EXPLAIN QUERY PLAN " + ctx.captured_queries[-1]["sql"])
+            plan = " ".join(str(row) for row in cursor.fetchall())
+        self.assertIn("api_txn_created_id_idx", plan)
+
+
+# -------------------------
+# Document signing
+# -------------------------
+class DocumentSignatureTests(TestCase):
+    def setUp(self):
+        self.owner = make_user("owner", "entrepreneur")
+        self.signer = make_user("signer")
+        self.document = Document.objects.create(owner=self.owner, file="documents/a.pdf", title="Term sheet")
+        self.client = APIClient()
+        self.client.force_authenticate(self.signer)
+        self.url = f"/api/documents/{self.document.id}/sign/"
+
+    def test_sign_once_then_reject_duplicate(self):
+        self.assertEqual(self.client.post(self.url).status_code, 200)
+        response = self.client.post(self.url)
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json(), {"error": "You already signed this document."})
+        self.assertEqual(DocumentSignature.objects.filter(document=self.document).count(), 1)
+        self.document.refresh_from_db()
+        self.assertEqual(self.document.status, "signed")
+
+    def test_unknown_document_is_404(self):
+        self.assertEqual(self.client.post("/api/documents/999999/sign/").status_code, 404)
+
+
+# -------------------------
+# Fast read serializers
+# -------------------------
+class FastReadSerializerTests(TestCase):
+    def setUp(self):
+        seed_rows(4)
+        user = User.objects.get(username="userp0_0")
+        user.bio, user.preferences = "Angel · fintech “seed”", {"sectors": ["ai", "health"], "ticket": 2.5}
+        user.save()
+        Meeting.objects.filter(title="Pitch 1").update(description="Q&A")
+        Meeting.objects.get(title="Pitch 2").participants.clear()
+        Transaction.objects.create(receiver=user, transaction_type="deposit", amount="1234.5")
+        Document.objects.create(owner=user, file="", title="Empty")
+        self.request = Request(APIRequestFactory().get("/api/"))
+
+    def assertSameJSON(self, fast_class, queryset, ordering, fieldset=None):
+        queryset = queryset.order_by(*ordering)
+        context = {"request": self.request, "fieldset": fieldset}
+        fast = fast_class(context=context)
+        expected = fast.serializer_class(list(queryset), many=True, context=context).data
+        actual = fast.to_representation(fast.values(queryset))
+        self.assertEqual(JSONRenderer().render(actual), JSONRenderer().render(expected))
+
+    def test_meetings_render_identically(self):
+        self.assertSameJSON(FastMeetingSerializer, meeting_queryset(), ["start_time", "id"])
+
+    def test_documents_render_identically(self):
+        self.assertSameJSON(FastDocumentSerializer, document_queryset(), ["-uploaded_at", "-id"])
+
+    def test_transactions_render_identically(self):
+        self.assertSameJSON(FastTransactionSerializer, transaction_queryset(), ["-created_at", "-id"])
+
+    def test_sparse_and_expanded_shapes_render_identically(self):
+        for fieldset in (
+            Fieldset(expand=["organizer", "participants"]),
+            Fieldset(["id", "title", "participants.username", "organizer"]),
+            Fieldset(["start_time", "participants"]),
+        ):
+            self.assertSameJSON(FastMeetingSerializer, meeting_queryset(fieldset), ["start_time", "id"], fieldset)
+        fieldset = Fieldset(["amount", "receiver.email"], ["sender"])
+        self.assertSameJSON(FastTransactionSerializer, transaction_queryset(fieldset), ["-created_at", "-id"], fieldset)
+
+    def test_list_endpoint_matches_model_serializer(self):
+        response = APIClient().get("/api/meetings/")
+        expected = FastMeetingSerializer.serializer_class(
+            list(meeting_queryset().order_by("start_time", "id")), many=True, context={"request": response.wsgi_request}
+        ).data
+        self.assertEqual(JSONRenderer().render(response.json()["results"]), JSONRenderer().render(expected))
+
+
+class FieldsetTests(TestCase):
+    def setUp(self):
+        seed_rows(3)
+        self.client = APIClient()
+        self.meeting = Meeting.objects.order_by("start_time", "id").first()
+
+    def get(self, url, status=200):
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, status, response.content)
+        return response.json()
+
+    def test_relations_default_to_ids_without_joins(self):
+        with CaptureQueriesContext(connection) as ctx:
+            first = self.get("/api/meetings/")["results"][0]
+        self.assertEqual(first["organizer"], self.meeting.organizer_id)
+        self.assertEqual(first["participants"], sorted(self.meeting.participants.values_list("id", flat=True)))
+        self.assertFalse([q for q in ctx.captured_queries if '"api_user"' in q["sql"]])
+        room = self.get(f"/api/video-rooms/{self.meeting.video_room.pk}/")
+        self.assertEqual(room["meeting"], self.meeting.pk)
+
+    def test_expand_and_fields(self):
+        first = self.get("/api/meetings/?expand=organizer&fields=id,title,organizer,participants.username")["results"][0]
+        self.assertEqual(list(first), ["id", "title", "organizer", "participants"])
+        self.assertEqual(first["organizer"]["username"], self.meeting.organizer.username)
+        self.assertEqual(list(first["participants"][0]), ["username"])
+
+        room = self.get(f"/api/video-rooms/{self.meeting.video_room.pk}/?expand=meeting.organizer&fields=meeting")
+        self.assertEqual(room["meeting"]["organizer"]["id"], self.meeting.organizer_id)
+        self.assertEqual(room["meeting"]["participants"], sorted(self.meeting.participants.values_list("id", flat=True)))
+
+    def test_narrow_fields_shrink_the_query_plan(self):
+        with self.assertNumQueries(1):   # no participants prefetch
+            body = self.get("/api/meetings/?fields=title&page_size=2")
+        self.assertEqual(body["results"], [{"title": "Pitch 0"}, {"title": "Pitch 1"}])
+        self.assertEqual(self.client.get(body["next"]).json()["results"], [{"title": "Pitch 2"}])
+        with self.assertNumQueries(1):
+            self.get("/api/transactions/?fields=id,amount")
+
+    def test_async_twin_honours_fieldsets(self):
+        url = "meetings/?expand=participants&fields=id,participants.email"
+        self.assertEqual(self.client.get(f"/api/{url}").content, self.client.get(f"/api/async/{url}").content)
+
+    def test_unknown_names_are_rejected(self):
+        self.assertIn("fields", self.get("/api/meetings/?fields=nope", status=400))
+        self.assertIn("expand", self.get("/api/documents/?expand=title", status=400))
+        self.assertIn("fields", self.get("/api/meetings/?fields=organizer.salary", status=400))
+        self.assertIn("fields", self.get("/api/video-rooms/?expand=meeting&fields=meeting.nope", status=400))
+
+
+# -------------------------
+# Broker channel layer
+# -------------------------
+class BrokerChannelLayerTests(SimpleTestCase):
+    """Two layer instances stand in for two daphne processes sharing one broker."""
+
+    @contextlib.asynccontextmanager
+    async def brokers(self, count=1):
+        servers = [await BrokerServer(port=0, sweep_interval=0.05).start() for _ in range(count)]
+        try:
+            yield [f"127.0.0.1:{server.port}" for server in servers]
+        finally:
+            for server in servers:
+                await server.stop()
+
+    def layer(self, hosts, **config):
+        return BrokerChannelLayer(hosts=hosts, **config)
+
+    async def test_message_crosses_processes(self):
+        async with self.brokers() as hosts:
+            worker_a, worker_b = self.layer(hosts), self.layer(hosts)
+            channel = await worker_b.new_channel()
+            await worker_a.send(channel, {"type": "signal", "sdp": "v=0", "blob": b"\x00\x01"})
+            self.assertEqual(await worker_b.receive(channel), {"type": "signal", "sdp": "v=0", "blob": b"\x00\x01"})
+
+    async def test_group_send_reaches_members_on_every_process(self):
+        for count in (1, 3):   # one broker, then three sharded brokers
+            async with self.brokers(count) as hosts:
+                await self.check_group_fan_out(hosts)
+
+    async def check_group_fan_out(self, hosts):
+        workers = [self.layer(hosts) for _ in range(3)]
+        channels = [await worker.new_channel() for worker in workers]
+        for worker, channel in zip(workers, channels):
+            await worker.group_add("meeting_abc", channel)
+        await workers[2].group_discard("meeting_abc", channels[2])
+        await workers[0].group_send("meeting_abc", {"type": "peer.joined"})
+        for worker, channel in zip(workers[:2], channels[:2]):
+            self.assertEqual(await worker.receive(channel), {"type": "peer.joined"})
+        with self.assertRaises(asyncio.TimeoutError):
+            await asyncio.wait_for(workers[2].receive(channels[2]), 0.1)
+
+    async def test_capacity_applies_backpressure(self):
+        async with self.brokers() as hosts:
+            layer = self.layer(hosts, capacity=2)
+            channel = await layer.new_channel()
+            await layer.send(channel, {"type": "a"})
+            await layer.send(channel, {"type": "b"})
+            with self.assertRaises(ChannelFull):
+                await layer.send(channel, {"type": "c"})
+            await layer.group_add("full", channel)
+            await layer.group_send("full", {"type": "dropped"})   # full members are skipped
+            self.assertEqual(await layer.receive(channel), {"type": "a"})
+
+    async def test_messages_expire_and_dead_channels_leave_groups(self):
+        async with self.brokers() as hosts:
+            layer = self.layer(hosts, expiry=0.05)
+            channel = await layer.new_channel()
+            await layer.group_add("room", channel)
+            await layer.send(channel, {"type": "stale"})
+            await asyncio.sleep(0.2)
+            await layer.group_send("room", {"type": "after"})
+            await layer.send(channel, {"type": "fresh"})
+            self.assertEqual(await layer.receive(channel), {"type": "fresh"})
+
+    async def test_cancelled_receive_does_not_lose_messages(self):
+        async with self.brokers() as hosts:
+            sender, receiver = self.layer(hosts), self.layer(hosts)
+            channel = await receiver.new_channel()
+            with self.assertRaises(asyncio.TimeoutError):
+                await asyncio.wait_for(receiver.receive(channel), 0.05)
+            await sender.send(channel, {"type": "later"})
+            self.assertEqual(await receiver.receive(channel), {"type": "later"})
+
+    async def test_receive_cancelled_as_its_message_arrives_does_not_lose_it(self):
+        # The consumer is cancelled just before, then just after, read_loop hands it the reply
+        for after_delivery in (False, True):
+            async with self.brokers() as hosts:
+                sender, receiver = self.layer(hosts), self.layer(hosts)
+                channel = await receiver.new_channel()
+                conn = await receiver.connection(receiver.shard(channel))
+                task = asyncio.create_task(receiver.receive(channel))
+                await asyncio.sleep(0.05)   # parked on the broker
+                conn.pending = RacingReplies(conn.pending, task, after_delivery)
+                await sender.send(channel, {"type": "raced"})
+                with self.assertRaises(asyncio.CancelledError):
+                    await task
+                self.assertEqual(await asyncio.wait_for(receiver.receive(channel), 1), {"type": "raced"})
+
+
+class RacingReplies(dict):
+    """A pending-replies map that cancels `task` around the first reply it gives out."""
+
+    def __init__(self, pending, task, after_delivery):
+        super().__init__(pending)
+        self.task, self.after_delivery = task, after_delivery
+
+    def pop(self, key, default=None):
+        future = super().pop(key, default)
+        if future is None or self.task is None:
+            return future
+        task, self.task = self.task, None
+        if not self.after_delivery:
+            task.cancel()
+            return future
+        delivered = types.SimpleNamespace(done=future.done, cancelled=future.cancelled)
+        delivered.set_result = lambda result: (future.set_result(result), task.cancel())
+        return delivered
+
+
+# -------------------------
+# Meeting signaling (WebSocket)
+# -------------------------
+class MeetingConsumerTests(SimpleTestCase):
+    async def join(self, room="pitch", subprotocols=None):
+        peer = WebsocketCommunicator(URLRouter(websocket_urlpatterns), f"/ws/meetings/{room}/", subprotocols=subprotocols)
+        connected, subprotocol = await peer.connect()
+        self.assertTrue(connected)
+        peer.subprotocol = subprotocol
+        if subprotocol == "signal.msgpack":
+            welcome = msgpack.unpackb(await peer.receive_from())
+        else:
+            welcome = await peer.receive_json_from()
+        self.assertEqual(welcome["type"], "welcome")
+        peer.peer_id = welcome["peer_id"]
+        return peer
+
+    async def join_room(self, count, room="pitch"):
+        peers = []
+        for _ in range(count):
+            peer = await self.join(room)
+            for other in peers:   # existing members and the newcomer learn about each other
+                self.assertEqual((await other.receive_json_from())["peer_id"], peer.peer_id)
+                self.assertEqual((await peer.receive_json_from())["type"], "peer-joined")
+            peers.append(peer)
+        return peers
+
+    async def test_signals_go_only_to_the_addressed_peer(self):
+        alice, bob, carol = await self.join_room(3)
+        await alice.send_json_to({"type": "offer", "to": bob.peer_id, "sdp": "v=0"})
+        self.assertEqual(
+            await bob.receive_json_from(), {"type": "offer", "sdp": "v=0", "from": alice.peer_id}
+        )
+        self.assertTrue(await carol.receive_nothing())
+        self.assertTrue(await alice.receive_nothing())
+        for peer in (alice, bob, carol):
+            await peer.disconnect()
+
+    async def test_unknown_target_is_reported_to_sender(self):
+        (alice,) = await self.join_room(1, room="solo")
+        await alice.send_json_to({"type": "answer", "to": "nobody", "sdp": "v=0"})
+        self.assertEqual(
+            await alice.receive_json_from(), {"type": "error", "error": "Unknown peer", "to": "nobody"}
+        )
+        await alice.send_json_to({"type": "offer", "to": ["not", "a", "peer id"], "sdp": "v=0"})
+        self.assertEqual((await alice.receive_json_from())["error"], "Unknown peer")
+        await alice.send_json_to({"type": "candidate", "to": {"peer": 1}, "candidate": "c0"})
+        self.assertEqual((await alice.receive_json_from())["error"], "Unknown peer")
+        await alice.disconnect()
+
+    async def test_malformed_frames_get_an_error_not_a_closed_socket(self):
+        text_peer = await self.join(room="garbled")
+        binary_peer = await self.join(room="garbled", subprotocols=["signal.msgpack"])
+        await text_peer.receive_json_from()   # peer-joined
+        await binary_peer.receive_from()
+        await text_peer.send_to(text_data="{not json")
+        self.assertEqual(await text_peer.receive_json_from(), {"type": "error", "error": "Malformed message"})
+        await binary_peer.send_to(bytes_data=b"\xc1")
+        self.assertEqual(msgpack.unpackb(await binary_peer.receive_from()), {"type": "error", "error": "Malformed message"})
+        # Still connected
+        await text_peer.send_json_to({"type": "offer", "to": binary_peer.peer_id, "sdp": "v=0"})
+        self.assertEqual(msgpack.unpackb(await binary_peer.receive_from())["type"], "offer")
+        await text_peer.disconnect()
+        await binary_peer.disconnect()
+
+    async def test_candidate_burst_is_coalesced_into_one_frame(self):
+        alice, bob, carol = await self.join_room(3, room="trickle")
+        for n in range(5):
+            await alice.send_json_to({"type": "candidate", "to": bob.peer_id, "candidate": f"c{n}", "sdpMid": "0"})
+        await alice.send_json_to({"type": "candidate", "to": carol.peer_id, "candidate": "x"})
+        frame = await bob.receive_json_from()
+        self.assertEqual(frame["type"], "candidates")
+        self.assertEqual(frame["from"], alice.peer_id)
+        self.assertEqual([c["candidate"] for c in frame["candidates"]], ["c0", "c1", "c2", "c3", "c4"])
+        self.assertTrue(await bob.receive_nothing())
+        self.assertEqual((await carol.receive_json_from())["candidates"], [{"candidate": "x"}])
+        for peer in (alice, bob, carol):
+            await peer.disconnect()
+
+    async def test_offer_flushes_pending_candidates_first(self):
+        alice, bob = await self.join_room(2, room="order")
+        await alice.send_json_to({"type": "candidate", "to": bob.peer_id, "candidate": "c0"})
+        await alice.send_json_to({"type": "offer", "to": bob.peer_id, "sdp": "v=1"})
+        self.assertEqual((await bob.receive_json_from())["type"], "candidates")
+        self.assertEqual((await bob.receive_json_from())["type"], "offer")
+        for peer in (alice, bob):
+            await peer.disconnect()
+
+    async def test_msgpack_subprotocol_uses_binary_frames(self):
+        json_peer = await self.join(room="mixed")
+        binary_peer = await self.join(room="mixed", subprotocols=["signal.msgpack", "signal.json"])
+        self.assertEqual(binary_peer.subprotocol, "signal.msgpack")
+        await json_peer.receive_json_from()                      # peer-joined (binary_peer)
+        joined = msgpack.unpackb(await binary_peer.receive_from())
+        self.assertEqual(joined, {"type": "peer-joined", "peer_id": json_peer.peer_id, "user": None})
+
+        await binary_peer.send_to(bytes_data=msgpack.packb({"type": "offer", "to": json_peer.peer_id, "sdp": "v=0"}))
+        self.assertEqual(
+            await json_peer.receive_json_from(), {"type": "offer", "sdp": "v=0", "from": binary_peer.peer_id}
+        )
+        await json_peer.send_json_to({"type": "answer", "to": binary_peer.peer_id, "sdp": "v=0"})
+        self.assertEqual(
+            msgpack.unpackb(await binary_peer.receive_from()),
+            {"type": "answer", "sdp": "v=0", "from": json_peer.peer_id},
+        )
+        for peer in (json_peer, binary_peer):
+            await peer.disconnect()
+
+    async def test_leave_is_broadcast_to_members(self):
+        alice, bob = await self.join_room(2, room="leave")
+        await bob.disconnect()
+        self.assertEqual(await alice.receive_json_from(), {"type": "peer-left", "peer_id": bob.peer_id})
+        await alice.send_json_to({"type": "offer", "to": bob.peer_id, "sdp": "v=0"})
+        self.assertEqual((await alice.receive_json_from())["type"], "error")
+        await alice.disconnect()
+
+    async def test_presence_to_a_full_channel_is_reported_not_raised(self):
+        consumer, sent = MeetingConsumer(), []
+        consumer.channel_layer = InMemoryChannelLayer(capacity=1)
+        consumer.peer_id, consumer.channel_name, consumer.username, consumer.roster = "me", "specific.me", None, {}
+
+        async def send_json(content):
+            sent.append(content)
+
+        consumer.send_json = send_json
+        newcomer = await consumer.channel_layer.new_channel()
+        await consumer.channel_layer.send(newcomer, {"type": "backlog"})
+        await consumer.peer_join({"peer_id": "newcomer", "channel": newcomer, "user": "bob"})
+        self.assertEqual([message["type"] for message in sent], ["peer-joined", "error"])
+        self.assertEqual(sent[1]["to"], "newcomer")
+
+
+class LedgerTests(TestCase):
+    def setUp(self):
+        self.alice, self.bob = make_user("alice"), make_user("bob")
+        self.client = APIClient()
+        self.client.force_authenticate(self.alice)
+
+    def post(self, **data):
+        return self.client.post("/api/transactions/", data, format="json")
+
+    def test_transfer_posts_paired_entries_and_returns_balance(self):
+        ledger.deposit(self.alice, "100.00")
+        response = self.post(transaction_type="transfer", receiver=self.bob.pk, amount="30.25")
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.json()["balance"], "69.75")
+        self.assertEqual(response.json()["status"], "completed")
+
+        txn = Transaction.objects.get(pk=response.json()["id"])
+        self.assertEqual(
+            sorted((e.wallet.user_id, str(e.amount)) for e in txn.entries.all()),
+            sorted([(self.alice.pk, "-30.25"), (self.bob.pk, "30.25")]),
+        )
+        self.assertEqual(Wallet.objects.get(user=self.bob).balance, Decimal("30.25"))
+
+    def test_only_staff_deposit_or_withdraw(self):
+        self.assertEqual(self.post(transaction_type="deposit", amount="99999999.99").status_code, 403)
+        self.assertEqual(self.post(transaction_type="withdraw", amount="1.00").status_code, 403)
+        body = {"transaction_type": "deposit", "user": self.alice.pk, "amount": "5.00"}
+        self.assertEqual(self.client.post("/api/transactions/adjust/", body, format="json").status_code, 403)
+        self.assertFalse(Transaction.objects.exists())
+
+        self.client.force_authenticate(User.objects.create(username="ops", email="ops@example.com", is_staff=True))
+        response = self.client.post("/api/transactions/adjust/", body, format="json")
+        self.assertEqual((response.status_code, response.json()["balance"]), (201, "5.00"))
+        self.assertEqual(Wallet.objects.get(user=self.alice).balance, Decimal("5.00"))
+
+    def test_overdraft_is_rejected_without_writing(self):
+        ledger.deposit(self.alice, "10.00")
+        self.client.force_authenticate(User.objects.create(username="ops", email="ops@example.com", is_staff=True))
+        response = self.client.post("/api/transactions/adjust/",
+                                    {"transaction_type": "withdraw", "user": self.alice.pk, "amount": "10.01"},
+                                    format="json")
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json(), {"error": "Insufficient funds."})
+        self.assertEqual(Wallet.objects.get(user=self.alice).balance, Decimal("10.00"))
+        self.assertEqual(LedgerEntry.objects.count(), 1)
+        self.assertEqual(Transaction.objects.count(), 1)
+
+    def test_transactions_are_immutable(self):
+        txn, _ = ledger.deposit(self.alice, "5.00")
+        self.assertEqual(self.client.delete(f"/api/transactions/{txn.pk}/").status_code, 405)
+        self.assertEqual(self.client.patch(f"/api/transactions/{txn.pk}/", {}).status_code, 405)
+
+    def test_wallet_read_does_not_write(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get("/api/wallet/")
+        self.assertEqual(response.json()["balance"], "0.00")
+        self.assertFalse(Wallet.objects.exists())
+        self.assertTrue(all(q["sql"].startswith("SELECT") for q in queries.captured_queries))
+
+
+@override_settings(LEDGER_CHECKPOINT_INTERVAL=3)
+class WalletCheckpointTests(TestCase):
+    def setUp(self):
+        self.alice = make_user("alice")
+        self.client = APIClient()
+        self.client.force_authenticate(self.alice)
+        for n in range(1, 8):                     # balances 1, 3, 6, 10, 15, 21, 28
+            ledger.deposit(self.alice, n)
+        self.wallet = Wallet.objects.get(user=self.alice)
+        self.entries = list(self.wallet.entries.order_by("id"))
+
+    def test_checkpoint_every_interval_entries(self):
+        checkpoints = list(self.wallet.checkpoints.order_by("entry_id").values_list("entry_count", "balance"))
+        self.assertEqual(checkpoints, [(3, Decimal("6.00")), (6, Decimal("21.00"))])
+        self.assertEqual(self.wallet.entry_count, 7)
+
+    def test_balance_at_reads_only_the_tail(self):
+        at = self.entries[4].created_at            # after the 5th deposit
+        self.wallet.entries.filter(pk__gt=self.entries[4].pk).update(created_at=at + timedelta(seconds=1))
+        balance, checkpoint = ledger.balance_as_of(self.wallet, when=at)
+        self.assertEqual(balance, Decimal("15.00"))
+        self.assertEqual(checkpoint.entry_count, 3)
+        response = self.client.get("/api/wallet/balance/", {"at": at.isoformat()})
+        self.assertEqual(response.json()["balance"], "15.00")
+
+    def test_statement_pages_carry_running_balance(self):
+        first = self.client.get("/api/wallet/statement/", {"page_size": 4}).json()
+        self.assertEqual([e["balance"] for e in first["entries"]], ["1.00", "3.00", "6.00", "10.00"])
+        with self.assertNumQueries(4):            # wallet, checkpoint, tail sum, page
+            second = self.client.get(first["next"]).json()
+        self.assertEqual(second["opening_balance"], "10.00")
+        self.assertEqual([e["balance"] for e in second["entries"]], ["15.00", "21.00", "28.00"])
+        self.assertEqual(second["entries"][0]["transaction_type"], "deposit")
+        self.assertIsNone(second["next"])
+
+    def test_reconcile_detects_a_bad_checkpoint_and_rebuild_fixes_it(self):
+        out = io.StringIO()
+        call_command("reconcile_wallets", stdout=out)
+        WalletCheckpoint.objects.filter(entry_count=6).update(balance="20.00")
+        with self.assertRaises(CommandError):
+            call_command("reconcile_wallets", stdout=out, stderr=out)
+        call_command("reconcile_wallets", rebuild=True, stdout=out)
+        call_command("reconcile_wallets", stdout=out)
+        self.assertIn("All wallets reconcile", out.getvalue())
+
+
+class BulkIngestTests(TestCase):
+    def setUp(self):
+        self.alice, self.bob = make_user("alice"), make_user("bob")
+        self.admin = User.objects.create(username="ops", email="ops@example.com", role="investor", is_staff=True)
+        self.client = APIClient()
+        self.client.force_authenticate(self.admin)
+
+    def test_json_array_reports_row_errors_without_aborting(self):
+        rows = [
+            {"transaction_type": "deposit", "receiver": self.alice.pk, "amount": "50.00"},
+            {"transaction_type": "transfer", "sender": self.alice.pk, "receiver": self.bob.pk, "amount": "20.00"},
+            {"transaction_type": "transfer", "sender": self.alice.pk, "receiver": 999999, "amount": "1.00"},
+            {"transaction_type": "withdraw", "sender": self.bob.pk, "amount": "25.00"},   # bob only has 20
+            {"transaction_type": "refund", "amount": "-1"},
+            {"transaction_type": "withdraw", "sender": self.bob.pk, "amount": "5.00"},
+        ]
+        with self.assertNumQueries(9):   # a fixed handful per batch, none per row
+            response = self.client.post("/api/transactions/bulk/?batch_size=10", rows, format="json")
+        summary = response.json()
+        self.assertEqual((summary["received"], summary["created"], summary["failed"]), (6, 3, 3))
+        self.assertEqual(
+            {error["row"]: sorted(error["errors"]) for error in summary["errors"]},
+            {2: ["receiver"], 3: ["non_field_errors"], 4: ["amount", "transaction_type"]},
+        )
+        self.assertEqual(Wallet.objects.get(user=self.alice).balance, Decimal("30.00"))
+        self.assertEqual(Wallet.objects.get(user=self.bob).balance, Decimal("15.00"))
+        call_command("reconcile_wallets", stdout=io.StringIO())
+
+    def test_amounts_and_parties_are_checked_strictly(self):
+        rows = [
+            {"transaction_type": "deposit", "receiver": self.alice.pk, "amount": 1e20},   # past max_digits
+            {"transaction_type": "deposit", "receiver": True, "amount": "1.00"},
+            {"transaction_type": "deposit", "receiver": self.alice.pk + 0.9, "amount": "1.00"},
+            {"transaction_type": "deposit", "receiver": str(self.bob.pk), "amount": "99999999.99"},
+        ]
+        summary = self.client.post("/api/transactions/bulk/", rows, format="json").json()
+        self.assertEqual(summary["created"], 1)
+        self.assertEqual({error["row"]: sorted(error["errors"]) for error in summary["errors"]},
+                         {0: ["amount"], 1: ["receiver"], 2: ["receiver"]})
+        self.assertEqual(Wallet.objects.get(user=self.bob).balance, Decimal("99999999.99"))
+        self.assertFalse(Wallet.objects.filter(user=self.alice).exists())
+
+    def test_ndjson_stream_in_small_batches(self):
+        lines = [json.dumps({"transaction_type": "deposit", "receiver": self.bob.pk, "amount": "1.50"})] * 5
+        lines.insert(2, "{not json")
+        response = self.client.post(
+            "/api/transactions/bulk/?batch_size=2", "\n".join(lines) + "\n", content_type="application/x-ndjson"
+        )
+        summary = response.json()
+        self.assertEqual((summary["received"], summary["created"]), (6, 5))
+        self.assertEqual(summary["errors"][0]["row"], 2)
+        self.assertEqual(Wallet.objects.get(user=self.bob).balance, Decimal("7.50"))
+
+    def test_staff_only(self):
+        self.client.force_authenticate(self.alice)
+        self.assertEqual(self.client.post("/api/transactions/bulk/", [], format="json").status_code, 403)
+
+
+class ExportTests(TestCase):
+    def setUp(self):
+        self.alice, self.bob = make_user("alice"), make_user("bob")
+        self.admin = User.objects.create(username="ops", email="ops@example.com", role="investor", is_staff=True)
+        self.client = APIClient()
+        self.client.force_authenticate(self.admin)
+        start = timezone.now()
+        for n in range(5):
+            meeting = Meeting.objects.create(
+                title=f"m{n}", organizer=self.alice, start_time=start + timedelta(days=n),
+                end_time=start + timedelta(days=n, hours=1),
+            )
+            meeting.participants.add(self.alice, self.bob)
+        self.start = start
+
+    def read(self, url):
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return b"".join(response.streaming_content).decode()
+
+    def test_csv_and_ndjson(self):
+        ledger.deposit(self.alice, "10.00")
+        ledger.transfer(self.alice, self.bob, "2.50")
+        lines = self.read("/api/exports/transactions/?output=csv").splitlines()
+        self.assertEqual(lines[0].split(",")[:5], ["id", "created_at", "transaction_type", "status", "amount"])
+        self.assertEqual(len(lines), 3)
+        self.assertIn("2.50", lines[2])
+        self.assertIn(f"{self.alice.username},", lines[2])
+
+        rows = [json.loads(line) for line in self.read("/api/exports/meetings/?output=ndjson").splitlines()]
+        self.assertEqual([row["title"] for row in rows], ["m0", "m1", "m2", "m3", "m4"])
+        self.assertEqual(rows[0]["participant_ids"], sorted([self.alice.pk, self.bob.pk]))
+        self.assertEqual(rows[0]["organizer"], self.alice.username)
+
+    def test_date_range_and_queries_per_chunk(self):
+        since = (self.start + timedelta(days=1)).isoformat()
+        until = (self.start + timedelta(days=4)).isoformat()
+        out = io.StringIO()
+        with CaptureQueriesContext(connection) as ctx:
+            stream = exports.export_stream(
+                "meetings", "csv", since=self.start + timedelta(days=1), until=self.start + timedelta(days=4),
+                chunk_size=2,
+            )
+            out.write(b"".join(stream).decode())
+        # One cursor over the meetings, one participant query per chunk of 2
+        self.assertEqual(len(ctx.captured_queries), 1 + 2)
+        lines = out.getvalue().splitlines()
+        self.assertEqual([line.split(",")[1] for line in lines[1:]], ["m1", "m2", "m3"])
+        self.assertEqual(lines[1].split(",")[-1], f"{self.alice.pk};{self.bob.pk}")
+
+        response = self.client.get("/api/exports/meetings/", {"output": "ndjson", "since": since, "until": until})
+        self.assertEqual(len(b"".join(response.streaming_content).splitlines()), 3)
+        self.assertEqual(self.client.get("/api/exports/meetings/?output=xml").status_code, 400)
+        self.assertEqual(self.client.get("/api/exports/wallets/").status_code, 404)
+
+    def test_staff_only(self):
+        self.client.force_authenticate(self.alice)
+        self.assertEqual(self.client.get("/api/exports/transactions/").status_code, 403)
+
+    def test_command(self):
+        with tempfile.NamedTemporaryFile(suffix=".ndjson") as fh:
+            call_command("export_data", "meetings", output="ndjson", file=fh.name, stderr=io.StringIO())
+            self.assertEqual(len(open(fh.name).read().splitlines()), 5)
+
+
+@override_settings(PASSWORD_HASHERS=["django.contrib.auth.hashers.MD5PasswordHasher"])
+class AsyncViewTests(TestCase):
+    def setUp(self):
+        seed_rows(4)
+        self.user = make_user("async")
+        self.user.set_password("secret-pass")
+        self.user.save()
+        self.document = Document.objects.create(owner=self.user, file="documents/a.pdf", title="Term sheet")
+        self.client.defaults["HTTP_AUTHORIZATION"] = f"Bearer {tokens_for(self.user)['access']}"
+
+    def assertSameResponse(self, sync_path, async_path, method="get", **kwargs):
+        sync = getattr(self.client, method)(sync_path, **kwargs)
+        asynchronous = getattr(self.client, method)(async_path, **kwargs)
+        # Page links point back at the path that was requested
+        content = asynchronous.content.replace(async_path.split("?")[0].encode(), sync_path.split("?")[0].encode())
+        self.assertEqual((asynchronous.status_code, content), (sync.status_code, sync.content))
+        return asynchronous
+
+    def test_reads_match_sync_views(self):
+        self.assertSameResponse("/api/auth/profile/", "/api/async/auth/profile/")
+        self.assertSameResponse("/api/wallet/", "/api/async/wallet/")   # no wallet yet
+        ledger.deposit(self.user, "12.50")
+        self.assertSameResponse("/api/wallet/", "/api/async/wallet/")
+
+        page = self.assertSameResponse("/api/meetings/?page_size=3", "/api/async/meetings/?page_size=3").json()
+        cursor = page["next"].split("cursor=")[1]
+        self.assertSameResponse(f"/api/meetings/?page_size=3&cursor={cursor}",
+                                f"/api/async/meetings/?page_size=3&cursor={cursor}")
+
+        del self.client.defaults["HTTP_AUTHORIZATION"]
+        response = self.assertSameResponse("/api/wallet/", "/api/async/wallet/")
+        self.assertEqual(response.status_code, 401)
+        self.assertEqual(response["WWW-Authenticate"], 'Bearer realm="api"')
+
+    def test_login(self):
+        response = self.client.post(
+            "/api/async/auth/login/", {"email": self.user.email, "password": "secret-pass"}, content_type="application/json"
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(sorted(response.json()), ["access", "refresh"])
+        for body in ({"username": self.user.username, "password": "wrong"}, {"username": "nobody", "password": "x"}):
+            self.assertSameResponse("/api/auth/login/", "/api/async/auth/login/", "post",
+                                    data=body, content_type="application/json")
+
+    def test_sign_document(self):
+        path = f"/api/async/documents/{self.document.pk}/sign/"
+        self.assertEqual(self.client.post(path).json(), {"status": "Document 'Term sheet' signed"})
+        duplicate = self.client.post(path)
+        self.assertEqual((duplicate.status_code, duplicate.json()), (400, {"error": "You already signed this document."}))
+        self.assertEqual(self.client.post("/api/async/documents/999999/sign/").status_code, 404)
+        self.document.refresh_from_db()
+        self.assertEqual(self.document.status, "signed")
+
+    def test_asgi_application_setting(self):
+        from django.conf import settings
+        from django.utils.module_loading import import_string
+        from channels.routing import ProtocolTypeRouter
+
+        self.assertIsInstance(import_string(settings.ASGI_APPLICATION), ProtocolTypeRouter)
+
+
+@override_settings(PASSWORD_HASHERS=["django.contrib.auth.hashers.MD5PasswordHasher"])
+class LoginTests(TestCase):
+    def setUp(self):
+        self.user = make_user("login")
+        self.user.set_password("secret-pass")
+        self.user.save()
+
+    def login(self, **body):
+        return self.client.post("/api/auth/login/", body, content_type="application/json")
+
+    def test_one_query_by_username_or_email(self):
+        for body in ({"username": self.user.username}, {"email": self.user.email}):
+            with self.assertNumQueries(1):
+                response = self.login(password="secret-pass", **body)
+            self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.login(email=self.user.email, password="nope").status_code, 400)
+        self.assertEqual(self.login(email="nobody@example.com", password="nope").status_code, 400)
+        self.user.is_active = False
+        self.user.save()
+        self.assertEqual(self.login(username=self.user.username, password="secret-pass").status_code, 400)
+
+    @override_settings(PASSWORD_HASHERS=[
+        "django.contrib.auth.hashers.MD5PasswordHasher", "django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher",
+    ])
+    def test_outdated_hash_is_upgraded_on_login(self):
+        with self.settings(PASSWORD_HASHERS=["django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher"]):
+            self.user.set_password("secret-pass")
+            self.user.save()
+        self.assertTrue(self.user.password.startswith("pbkdf2_sha1$"))
+        with self.assertNumQueries(2):   # lookup + password UPDATE
+            self.assertEqual(self.login(username=self.user.username, password="secret-pass").status_code, 200)
+        self.user.refresh_from_db()
+        self.assertTrue(self.user.password.startswith("md5$"))
+        self.assertTrue(self.user.check_password("secret-pass"))
+
+    @override_settings(LOGIN_HASH_WORKERS=1, LOGIN_HASH_QUEUE=1)
+    def test_saturated_pool_rejects_with_retry_after(self):
+        from threading import Event
+        from . import credentials
+
+        release = Event()
+        busy = credentials.submit(release.wait)
+        try:
+            for path in ("/api/auth/login/", "/api/async/auth/login/"):
+                response = self.client.post(
+                    path, {"username": self.user.username, "password": "secret-pass"}, content_type="application/json"
+                )
+                self.assertEqual(response.status_code, 429)
+                self.assertEqual(response["Retry-After"], "1")
+        finally:
+            release.set()
+            busy.result()
+        self.assertEqual(self.login(username=self.user.username, password="secret-pass").status_code, 200)
+
+
+class CachedJWTAuthenticationTests(TestCase):
+    def setUp(self):
+        self.user = make_user("jwt")
+        tokens = tokens_for(self.user)
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {tokens['access']}")
+        self.access = tokens["access"]
+
+    def test_user_query_only_on_first_request(self):
+        with self.assertNumQueries(2):   # user + wallet
+            self.client.get("/api/wallet/")
+        with self.assertNumQueries(1):   # wallet only
+            self.assertEqual(self.client.get("/api/wallet/").json()["user"]["id"], self.user.pk)
+
+    def test_profile_update_and_deactivation_invalidate(self):
+        self.client.get("/api/auth/profile/")
+        self.client.patch("/api/auth/profile/", {"bio": "Angel investor"}, format="json")
+        with self.assertNumQueries(1):
+            self.assertEqual(self.client.get("/api/auth/profile/").json()["bio"], "Angel investor")
+
+        self.user.is_active = False
+        self.user.save()
+        self.assertEqual(self.client.get("/api/auth/profile/").status_code, 401)
+        self.assertEqual(self.client.get("/api/async/auth/profile/").status_code, 401)
+
+    @override_settings(JWT_USER_CACHE_SIZE=2)
+    def test_lru_bound(self):
+        cache = user_cache()
+        for n in range(3):
+            cache.put((str(n), 0), self.user)
+        self.assertIsNone(cache.get(("0", 0)))
+        self.assertEqual(cache.get(("2", 0)).pk, self.user.pk)
+        cache.invalidate(2)
+        self.assertIsNone(cache.get(("2", 0)))
+
+    def test_claims_only_mode(self):
+        request = APIRequestFactory().get("/", HTTP_AUTHORIZATION=f"Bearer {self.access}")
+        with self.assertNumQueries(0):
+            user, _ = ClaimsJWTAuthentication().authenticate(request)
+        self.assertEqual((user.pk, user.username, user.is_staff), (self.user.pk, self.user.username, False))
+        ledger.deposit(self.user, "3.00")
+        self.assertEqual(Wallet.objects.get(user=user).balance, Decimal("3.00"))
+
+
+class RevocationTests(TestCase):
+    def setUp(self):
+        self.user = make_user("revoke")
+        self.tokens = tokens_for(self.user)
+
+    def refresh(self, token):
+        return self.client.post("/api/auth/refresh/", {"refresh": token}, content_type="application/json")
+
+    def test_rotation_revokes_the_old_token(self):
+        response = self.refresh(self.tokens["refresh"])
+        self.assertEqual(response.status_code, 200)
+        rotated = response.json()["refresh"]
+        self.assertNotEqual(rotated, self.tokens["refresh"])
+        self.assertEqual(self.refresh(self.tokens["refresh"]).status_code, 401)   # replay
+        self.assertEqual(self.refresh(rotated).status_code, 200)
+        self.assertEqual(RevokedToken.objects.count(), 2)
+
+    def test_no_revocation_query_for_a_valid_token(self):
+        revocation.is_revoked("warm-up")   # first use loads the filter
+        with CaptureQueriesContext(connection) as ctx:
+            self.assertEqual(self.refresh(self.tokens["refresh"]).status_code, 200)
+        selects = [q["sql"] for q in ctx.captured_queries if q["sql"].startswith("SELECT")]
+        self.assertFalse([sql for sql in selects if "api_revokedtoken" in sql])
+
+    def test_logout(self):
+        response = self.client.post("/api/auth/logout/", {"refresh": self.tokens["refresh"]}, content_type="application/json")
+        self.assertEqual(response.status_code, 204)
+        self.assertEqual(self.refresh(self.tokens["refresh"]).status_code, 401)
+        self.assertEqual(
+            self.client.post("/api/auth/logout/", {"refresh": "garbage"}, content_type="application/json").status_code, 401
+        )
+
+    def test_inactive_user_cannot_refresh(self):
+        self.user.is_active = False
+        self.user.save()
+        response = self.refresh(self.tokens["refresh"])
+        self.assertEqual(response.status_code, 401)
+        self.assertIn("No active account", response.json()["detail"])
+
+    def test_bloom_filter(self):
+        bloom = revocation.BloomFilter(capacity=1000, error_rate=0.01)
+        keys = [f"jti-{n}" for n in range(1000)]
+        for key in keys:
+            bloom.add(key)
+        self.assertTrue(all(key in bloom for key in keys))
+        false_positives = sum(f"other-{n}" in bloom for n in range(10000))
+        self.assertLess(false_positives, 300)
+
+    @override_settings(REVOCATION_PRUNE_INTERVAL=0)
+    def test_expired_rows_are_pruned(self):
+        now = timezone.now()
+        RevokedToken.objects.create(jti="old", expires_at=now - timedelta(minutes=1))
+        RevokedToken.objects.create(jti="live", expires_at=now + timedelta(days=1))
+        self.assertTrue(revocation.is_revoked("live"))
+        self.assertEqual(list(RevokedToken.objects.values_list("jti", flat=True)), ["live"])
+        self.assertFalse(revocation.is_revoked("old"))
+
+
+class ResponseCacheTests(TestCase):
+    def setUp(self):
+        seed_rows(2)
+        self.client = APIClient()
+        self.meetings = list(Meeting.objects.order_by("id"))
+
+    def get(self, url, queries, **headers):
+        with self.assertNumQueries(queries):
+            return self.client.get(url, headers=headers)
+
+    def test_repeat_read_runs_no_queries(self):
+        first = self.get("/api/meetings/", 2)
+        second = self.get("/api/meetings/", 0)
+        self.assertEqual(second.content, first.content)
+        self.assertEqual(second["ETag"], first["ETag"])
+        self.assertEqual(self.get("/api/meetings/", 0, If_None_Match=first["ETag"]).status_code, 304)
+        self.get("/api/meetings/?page_size=1", 2)   # other query string, other entry
+
+    def test_saves_and_participant_changes_retire_entries(self):
+        a, b = self.meetings
+        self.get(f"/api/meetings/{a.pk}/", 2)
+        self.get("/api/meetings/", 2)
+
+        b.title = "Renamed"
+        b.save()
+        self.assertIn("Renamed", self.get("/api/meetings/", 2).content.decode())
+        self.get(f"/api/meetings/{b.pk}/", 2)
+
+        # Spelled differently, a pk is still the row signals retire
+        self.get(f"/api/meetings/0{b.pk}/", 2)
+        self.get(f"/api/meetings/0{b.pk}/", 0)
+        b.title = "Renamed again"
+        b.save()
+        self.assertEqual(self.get(f"/api/meetings/0{b.pk}/", 2).json()["title"], "Renamed again")
+        # Model-wide invalidations (bulk writes) retire details too
+        self.get(f"/api/meetings/{a.pk}/", 2)
+        Meeting.objects.filter(pk=a.pk).update(title="Bulk")
+        response_cache.invalidate(Meeting)
+        self.assertEqual(self.get(f"/api/meetings/{a.pk}/", 2).json()["title"], "Bulk")
+
+        late = make_user("late")
+        a.participants.add(late)
+        self.assertIn(late.pk, self.get(f"/api/meetings/{a.pk}/", 2).json()["participants"])
+
+        self.get("/api/video-rooms/?expand=meeting.participants", 2)
+        guest = a.participants.first()
+        guest.username = "renamed-guest"
+        guest.save()
+        self.assertIn("renamed-guest", self.get("/api/video-rooms/?expand=meeting.participants", 2).content.decode())
+
+    def test_writes_in_another_worker_retire_entries(self):
+        meeting = self.meetings[0]
+        self.get(f"/api/meetings/{meeting.pk}/", 2)
+        Meeting.objects.filter(pk=meeting.pk).update(title="Moved")
+        # Another process bumps the generation through its own handle on the shared store
+        other_worker = FileBasedCache(settings.RESPONSE_GENERATIONS_DIR, {})
+        other_worker.incr(response_cache.generation_key(Meeting, meeting.pk))
+        self.assertEqual(self.get(f"/api/meetings/{meeting.pk}/", 2).json()["title"], "Moved")
+
+    def test_bulk_ingest_retires_transaction_lists(self):
+        self.get("/api/transactions/", 1)
+        admin = User.objects.create(username="ops", email="ops@example.com", role="investor", is_staff=True)
+        self.client.force_authenticate(admin)
+        rows = [{"transaction_type": "deposit", "receiver": admin.pk, "amount": "5.00"}]
+        self.client.post("/api/transactions/bulk/", rows, format="json")
+        self.client.force_authenticate(None)
+        self.assertEqual(len(self.get("/api/transactions/", 1).json()["results"]), 3)
+
+    def test_authenticated_reads_are_cached_separately(self):
+        self.get("/api/documents/", 1)
+        self.client.force_authenticate(self.meetings[0].organizer)
+        response = self.get("/api/documents/", 1)
+        self.assertIn("Authorization", response["Vary"])
+        self.get("/api/documents/", 0)
+
+
+class ChunkedUploadTests(TestCase):
+    def setUp(self):
+        media, temp = tempfile.TemporaryDirectory(), tempfile.TemporaryDirectory()
+        self.addCleanup(media.cleanup)
+        self.addCleanup(temp.cleanup)
+        overrides = override_settings(MEDIA_ROOT=media.name, UPLOAD_TEMP_DIR=temp.name, UPLOAD_CHUNK_SIZE=4)
+        overrides.enable()
+        self.addCleanup(overrides.disable)
+        self.media = media.name
+        self.owner = make_user("uploader")
+        self.client = APIClient()
+        self.client.force_authenticate(self.owner)
+
+    def start(self, size, **extra):
+        response = self.client.post("/api/uploads/", {"title": "Data room", "size": size, **extra}, format="json")
+        self.assertEqual(response.status_code, 201, response.content)
+        return f"/api/uploads/{response.json()['id']}/"
+
+    def send(self, url, offset, data):
+        return self.client.patch(url, data, content_type="application/offset+octet-stream",
+                                 headers={"Upload-Offset": str(offset)})
+
+    def upload(self, content, parts=2, **extra):
+        url = self.start(len(content), **extra)
+        step = -(-len(content) // parts)
+        for offset in range(0, len(content), step):
+            self.assertEqual(self.send(url, offset, content[offset:offset + step]).status_code, 204)
+        return self.complete(url)
+
+    def complete(self, url, **body):
+        with self.captureOnCommitCallbacks(execute=True):
+            return self.client.post(f"{url}complete/", body, format="json")
+
+    def blobs(self):
+        return sorted(name for _, _, names in os.walk(os.path.join(self.media, "blobs")) for name in names)
+
+    def test_parts_resume_and_complete(self):
+        content = b"term sheet v1, " * 10
+        url = self.start(len(content))
+        self.assertEqual(self.send(url, 0, content[:50])["Upload-Offset"], "50")
+        conflict = self.send(url, 0, content[:50])   # a retried part
+        self.assertEqual((conflict.status_code, conflict["Upload-Offset"]), (409, "50"))
+        self.assertEqual(self.client.head(url)["Upload-Offset"], "50")
+        self.assertEqual(self.complete(url).status_code, 409)
+
+        self.send(url, 50, content[50:])
+        response = self.complete(url, sha256=hashlib.sha256(content).hexdigest())
+        self.assertEqual(response.status_code, 201, response.content)
+        document = Document.objects.get(pk=response.json()["id"])
+        self.assertEqual(document.sha256, hashlib.sha256(content).hexdigest())
+        self.assertEqual(document.file.name, f"blobs/{document.sha256[:2]}/{document.sha256}")
+        with document.file.open("rb") as stored:
+            self.assertEqual(stored.read(), content)
+        self.assertFalse(Upload.objects.exists())
+        self.assertEqual(os.listdir(settings.UPLOAD_TEMP_DIR), [])
+
+    def test_identical_content_is_stored_once(self):
+        content = b"%PDF-1.7 cap table" * 7
+        first = self.upload(content).json()
+        other = make_user("other-owner")
+        self.client.force_authenticate(other)
+        second = self.upload(content, parts=3).json()
+        self.client.force_authenticate(self.owner)
+        version = self.upload(content, document=first["id"]).json()
+        self.assertEqual((version["id"], version["version"]), (first["id"], 2))
+        self.assertEqual(len({first["file"], second["file"], version["file"]}), 1)
+        self.assertEqual(len(self.blobs()), 1)
+
+    def test_hash_survives_a_part_on_another_worker(self):
+        from . import uploads
+
+        content = bytes(range(256)) * 3
+        url = self.start(len(content))
+        self.send(url, 0, content[:300])
+        uploads.hashers.entries.clear()   # as if the next part reached another process
+        self.send(url, 300, content[300:])
+        response = self.complete(url)
+        self.assertEqual(response.json()["sha256"], hashlib.sha256(content).hexdigest())
+
+    def test_a_rolled_back_completion_can_be_retried(self):
+        content = b"side letter" * 5
+        url = self.start(len(content))
+        self.send(url, 0, content)
+        with mock.patch.object(versions, "record", side_effect=RuntimeError("disk full")):
+            with self.assertRaises(RuntimeError):
+                self.complete(url)
+        # Nothing moved: the part is still there and nothing points at a blob
+        self.assertEqual((self.blobs(), Document.objects.exists()), ([], False))
+        response = self.complete(url)
+        self.assertEqual(response.status_code, 201, response.content)
+        with Document.objects.get(pk=response.json()["id"]).file.open("rb") as stored:
+            self.assertEqual(stored.read(), content)
+        self.assertEqual(os.listdir(settings.UPLOAD_TEMP_DIR), [])
+
+    def test_rejections(self):
+        url = self.start(8)
+        self.assertEqual(self.send(url, 0, b"123456789").status_code, 409)   # past the declared size
+        mismatch = self.complete(url, sha256="0" * 64)
+        self.assertEqual(mismatch.status_code, 409)
+
+        url = self.start(4)
+        self.send(url, 0, b"1234")
+        self.assertEqual(self.complete(url, sha256="0" * 64).status_code, 409)
+        self.assertFalse(Upload.objects.filter(pk=url.split("/")[-2]).exists())
+
+        url = self.start(4)
+        self.client.force_authenticate(make_user("stranger"))
+        self.assertEqual(self.send(url, 0, b"1234").status_code, 404)
+        document = Document.objects.create(owner=self.owner, file="documents/x.pdf", title="x")
+        response = self.client.post("/api/uploads/", {"title": "x", "size": 1, "document": document.pk}, format="json")
+        self.assertEqual(response.status_code, 400)
+
+
+class DownloadTests(TestCase):
+    content = bytes(range(256)) * 40
+
+    def setUp(self):
+        media = tempfile.TemporaryDirectory()
+        self.addCleanup(media.cleanup)
+        overrides = override_settings(MEDIA_ROOT=media.name)
+        overrides.enable()
+        self.addCleanup(overrides.disable)
+        os.makedirs(os.path.join(media.name, "blobs"))
+        with open(os.path.join(media.name, "blobs", "deck"), "wb") as fh:
+            fh.write(self.content)
+        self.user = make_user("reader")
+        self.document = Document.objects.create(
+            owner=self.user, title="Deck.pdf", file="blobs/deck", sha256=hashlib.sha256(self.content).hexdigest()
+        )
+        self.etag = f'"{self.document.sha256}"'
+        self.url = f"/api/documents/{self.document.pk}/download/"
+        self.client.defaults["HTTP_AUTHORIZATION"] = f"Bearer {tokens_for(self.user)['access']}"
+
+    def get(self, **headers):
+        response = self.client.get(self.url, headers=headers)
+        body = b"".join(response.streaming_content) if response.streaming else response.content
+        return response, body
+
+    def test_whole_file_with_validators(self):
+        response, body = self.get(Accept="application/pdf")
+        self.assertEqual((response.status_code, body), (200, self.content))
+        self.assertEqual(response["Content-Length"], str(len(self.content)))
+        self.assertEqual(response["Content-Type"], "application/pdf")
+        self.assertEqual((response["ETag"], response["Accept-Ranges"]), (self.etag, "bytes"))
+        self.assertIn('filename="Deck.pdf"', response["Content-Disposition"])
+        self.assertEqual(self.get(If_None_Match=self.etag)[0].status_code, 304)
+
+    def test_ranges(self):
+        response, body = self.get(Range="bytes=100-199")
+        self.assertEqual((response.status_code, body), (206, self.content[100:200]))
+        self.assertEqual(response["Content-Range"], f"bytes 100-199/{len(self.content)}")
+        self.assertEqual(response["Content-Length"], "100")
+        self.assertEqual(self.get(Range="bytes=-10")[1], self.content[-10:])
+        self.assertEqual(self.get(Range="bytes=10000-")[1], self.content[10000:])
+        self.assertEqual(self.get(Range="bytes=0-1,5-6")[0].status_code, 200)   # multiple ranges: whole file
+
+        response, _ = self.get(Range=f"bytes={len(self.content)}-")
+        self.assertEqual((response.status_code, response["Content-Range"]), (416, f"bytes */{len(self.content)}"))
+
+        # If-Range: the range only while the file is the one the client started
+        self.assertEqual(self.get(Range="bytes=0-9", If_Range=self.etag)[0].status_code, 206)
+        response, body = self.get(Range="bytes=0-9", If_Range='"stale"')
+        self.assertEqual((response.status_code, body), (200, self.content))
+
+    async def test_asgi_streams_without_buffering(self):
+        response = await self.async_client.get(
+            self.url, headers={"Authorization": self.client.defaults["HTTP_AUTHORIZATION"], "Range": "bytes=5-"}
+        )
+        self.assertEqual(response.status_code, 206)
+        self.assertTrue(response.is_async)
+        self.assertEqual(b"".join([chunk async for chunk in response.streaming_content]), self.content[5:])
+
+    def test_access_and_missing(self):
+        self.assertEqual(self.client.get("/api/documents/999999/download/").status_code, 404)
+        self.document.file.storage.delete(self.document.file.name)
+        self.assertEqual(self.get()[0].status_code, 404)
+        del self.client.defaults["HTTP_AUTHORIZATION"]
+        self.assertEqual(self.get()[0].status_code, 401)
+
+    @override_settings(DOCUMENT_SENDFILE="x-accel-redirect", DOCUMENT_ACCEL_REDIRECT_PREFIX="/protected/")
+    def test_accel_redirect_hands_off_to_proxy(self):
+        response, body = self.get(Range="bytes=0-9")
+        self.assertEqual((response.status_code, body), (200, b""))
+        self.assertEqual(response["X-Accel-Redirect"], "/protected/blobs/deck")
+        self.assertEqual(response["ETag"], self.etag)
+
+
+class DocumentVersionTests(TestCase):
+    def setUp(self):
+        media, temp = tempfile.TemporaryDirectory(), tempfile.TemporaryDirectory()
+        self.addCleanup(media.cleanup)
+        self.addCleanup(temp.cleanup)
+        overrides = override_settings(MEDIA_ROOT=media.name, UPLOAD_TEMP_DIR=temp.name)
+        overrides.enable()
+        self.addCleanup(overrides.disable)
+        self.media = media.name
+        self.owner = make_user("redliner")
+        self.client = APIClient()
+        self.client.force_authenticate(self.owner)
+        versions.cache.clear()
+        rng = random.Random(7)
+        self.revisions = [bytes(rng.getrandbits(8) for _ in range(20000))]
+        for n in range(3):
+            clause = f"Clause {n}: the investor may appoint one director. ".encode() * 8
+            previous = self.revisions[-1]
+            self.revisions.append(previous[:5000 * (n + 1)] + clause + previous[5000 * (n + 1) + 100:])
+
+    def upload(self, content, document=None):
+        extra = {"document": document} if document else {}
+        response = self.client.post("/api/uploads/", {"title": "SHA.pdf", "size": len(content), **extra}, format="json")
+        url = f"/api/uploads/{response.json()['id']}/"
+        self.client.patch(url, content, content_type="application/offset+octet-stream", headers={"Upload-Offset": "0"})
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(f"{url}complete/", {}, format="json")
+        self.assertEqual(response.status_code, 201, response.content)
+        return response.json()["id"]
+
+    def history(self):
+        doc_id = self.upload(self.revisions[0])
+        for content in self.revisions[1:]:
+            self.upload(content, doc_id)
+        # Completing an upload leaves compaction to the periodic command
+        self.assertEqual(len(self.blobs()), len(self.revisions))
+        out = io.StringIO()
+        with self.captureOnCommitCallbacks(execute=True):
+            call_command("compact_versions", stdout=out)
+        self.assertIn("Compacted", out.getvalue())
+        return f"/api/documents/{doc_id}/versions/"
+
+    def blobs(self):
+        return sorted(name for _, _, names in os.walk(os.path.join(self.media, "blobs")) for name in names)
+
+    def test_older_versions_become_deltas_and_rebuild(self):
+        url = self.history()
+        with self.assertNumQueries(2):
+            rows = self.client.get(url).json()
+        self.assertEqual([row["number"] for row in rows], [4, 3, 2, 1])
+        self.assertEqual([row["kind"] for row in rows], ["snapshot", "delta", "delta", "delta"])
+        self.assertTrue(all(row["stored_size"] < row["size"] // 10 for row in rows[1:]))
+        # Only the current file is still stored in full
+        self.assertEqual(self.blobs(), [hashlib.sha256(self.revisions[-1]).hexdigest()])
+
+        versions.cache.clear()
+        for number, content in enumerate(self.revisions, start=1):
+            response = self.client.get(f"{url}{number}/")
+            self.assertEqual((response.status_code, b"".join(response)), (200, content))
+            self.assertEqual(response["ETag"], f'"{hashlib.sha256(content).hexdigest()}"')
+        self.assertIn('filename="SHA (v1).pdf"', self.client.get(f"{url}1/")["Content-Disposition"])
+        response = self.client.get(f"{url}1/", headers={"Range": "bytes=10-19"})
+        self.assertEqual((response.status_code, response.content), (206, self.revisions[0][10:20]))
+        self.assertEqual(self.client.get(f"{url}9/").status_code, 404)
+
+    @override_settings(DOCUMENT_SNAPSHOT_INTERVAL=2)
+    def test_snapshot_interval_bounds_the_chain(self):
+        rows = self.client.get(self.history()).json()
+        self.assertEqual([row["kind"] for row in rows], ["snapshot", "delta", "snapshot", "delta"])
+        self.assertEqual(len(self.blobs()), 2)
+
+    def test_diff(self):
+        url = self.history()
+        versions.cache.clear()
+        diff = self.client.get(f"{url}2/diff/3/").json()
+        # Adjacent versions: read from the stored delta, nothing rebuilt
+        self.assertEqual(versions.cache.size, 0)
+        self.assertEqual((diff["from"], diff["to"], diff["identical"]), (2, 3, False))
+        old, new = self.revisions[1], self.revisions[2]
+        for start, position, length in diff["matching_blocks"]:
+            self.assertEqual(old[start:start + length], new[position:position + length])
+        self.assertEqual(diff["unchanged_bytes"] + diff["added_bytes"], len(new))
+        self.assertEqual(diff["removed_bytes"], 100)
+
+        self.assertEqual(self.client.get(f"{url}3/diff/2/").json()["removed_bytes"], diff["added_bytes"])
+        self.assertGreater(self.client.get(f"{url}1/diff/4/").json()["unchanged_bytes"], 15000)
+        self.assertTrue(self.client.get(f"{url}4/diff/4/").json()["identical"])
+        # Files are ~20 KB: past the cap, only versions linked by a stored delta are compared
+        with override_settings(DOCUMENT_DIFF_MAX_SIZE=10000):
+            self.assertEqual(self.client.get(f"{url}1/diff/4/").status_code, 413)
+            self.assertEqual(self.client.get(f"{url}2/diff/3/").status_code, 200)
+
+    def test_versions_a_delta_would_not_shrink_are_checked_once(self):
+        doc_id = self.upload(self.revisions[0])
+        self.upload(bytes(reversed(self.revisions[0])), doc_id)   # nothing in common
+        for expected in ("Compacted 0 of 1 ", "Compacted 0 of 0 "):
+            out = io.StringIO()
+            call_command("compact_versions", stdout=out)
+            self.assertIn(expected, out.getvalue())
+        self.assertEqual(len(self.blobs()), 2)
+
+    def test_documents_from_before_history_get_a_first_version(self):
+        with open(os.path.join(self.media, "legacy.pdf"), "wb") as fh:
+            fh.write(b"%PDF legacy")
+        document = Document.objects.create(owner=self.owner, file="legacy.pdf", title="Legacy", version=3)
+        rows = self.client.get(f"/api/documents/{document.pk}/versions/").json()
+        self.assertEqual([(row["number"], row["kind"], row["size"]) for row in rows], [(3, "snapshot", 11)])
+        self.assertEqual(b"".join(self.client.get(f"/api/documents/{document.pk}/versions/3/")), b"%PDF legacy")
+
+
+class AvailabilityTests(TestCase):
+    def setUp(self):
+        self.day = timezone.now().replace(hour=0, minute=0, second=0, microsecond=0) + timedelta(days=1)
+        self.alice, self.bob, self.carol = make_user("alice"), make_user("bob"), make_user("carol")
+        self.client = APIClient()
+        self.client.force_authenticate(self.alice)
+
+    def at(self, hours):
+        return self.day + timedelta(hours=hours)
+
+    def meeting(self, organizer, start, end, participants=(), status="scheduled"):
+        meeting = Meeting.objects.create(title="Sync", organizer=organizer, start_time=self.at(start),
+                                         end_time=self.at(end), status=status)
+        meeting.participants.set(participants)
+        return meeting
+
+    def free_busy(self, users, start, end, **params):
+        query = {"users": ",".join(str(user.pk) for user in users), "start": self.at(start).isoformat(),
+                 "end": self.at(end).isoformat(), **params}
+        return self.client.get("/api/meetings/free-busy/", query)
+
+    def test_busy_intervals_are_merged_per_user_in_one_query(self):
+        self.meeting(self.alice, 9, 10, [self.bob])
+        self.meeting(self.bob, 9.5, 11)              # overlaps, as organizer
+        self.meeting(self.carol, 11, 12, [self.bob])  # touches
+        self.meeting(self.carol, 13, 14, [self.alice], status="canceled")
+        self.meeting(self.alice, 20, 30)              # runs past the window
+        with self.assertNumQueries(1):
+            body = self.free_busy([self.alice, self.bob, self.carol], 8, 22).json()
+        busy = {int(user): [[interval[0][11:16], interval[1][11:16]] for interval in intervals]
+                for user, intervals in body["busy"].items()}
+        hour = lambda h: self.at(h).isoformat()[11:16]
+        self.assertEqual(busy[self.alice.pk], [[hour(9), hour(10)], [hour(20), hour(22)]])
+        self.assertEqual(busy[self.bob.pk], [[hour(9), hour(12)]])
+        self.assertEqual(busy[self.carol.pk], [[hour(11), hour(12)]])
+        self.assertEqual(len(body["free"]), 2)   # 8-9 and 12-20
+
+        body = self.free_busy([self.alice, self.bob], 8, 22, duration="120").json()
+        self.assertEqual([[slot[0][11:16], slot[1][11:16]] for slot in body["free"]], [[hour(12), hour(20)]])
+
+    def test_free_busy_validates_its_window(self):
+        self.assertEqual(self.free_busy([], 8, 9).status_code, 400)
+        response = self.free_busy([self.alice], 9, 8)
+        self.assertEqual((response.status_code, list(response.json())), (400, ["end"]))
+        self.assertEqual(self.free_busy([self.alice], 0, 24 * 400).status_code, 400)
+        self.client.force_authenticate(None)
+        self.assertEqual(self.free_busy([self.alice], 8, 9).status_code, 401)
+
+    def test_create_and_update_refuse_double_booking(self):
+        taken = self.meeting(self.carol, 9, 10, [self.bob])
+        body = {"title": "Board", "participants": [self.bob.pk], "start_time": self.at(9.5), "end_time": self.at(10.5)}
+        response = self.client.post("/api/meetings/", body, format="json")
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(response.json()["conflicts"], [{"user": self.bob.pk, "meeting": taken.pk}])
+
+        body["start_time"] = self.at(10)   # back to back is fine
+        response = self.client.post("/api/meetings/", body, format="json")
+        self.assertEqual(response.status_code, 201, response.content)
+        created = response.json()
+        self.assertEqual(created["organizer"], self.alice.pk)
+
+        url = f"/api/meetings/{created['id']}/"
+        # Moving within its own slot does not clash with itself
+        self.assertEqual(self.client.patch(url, {"end_time": self.at(11)}, format="json").status_code, 200)
+        response = self.client.patch(url, {"start_time": self.at(8), "end_time": self.at(9.25)}, format="json")
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(response.json()["conflicts"], [{"user": self.bob.pk, "meeting": taken.pk}])
+        # A canceled meeting frees the slot
+        self.client.force_authenticate(self.carol)
+        self.assertEqual(self.client.patch(f"/api/meetings/{taken.pk}/", {"status": "canceled"}, format="json").status_code, 200)
+        self.client.force_authenticate(self.alice)
+        self.assertEqual(self.client.patch(url, {"start_time": self.at(8), "end_time": self.at(9.25)}, format="json").status_code, 200)
+        response = self.client.patch(url, {"end_time": self.at(7)}, format="json")
+        self.assertEqual((response.status_code, list(response.json())), (400, ["end_time"]))
+
+
+class RecurrenceTests(TestCase):
+    def setUp(self):
+        self.day = timezone.now().replace(hour=0, minute=0, second=0, microsecond=0) + timedelta(days=1)
+        self.alice, self.bob, self.carol = make_user("alice"), make_user("bob"), make_user("carol")
+        self.client = APIClient()
+        self.client.force_authenticate(self.alice)
+
+    def at(self, days, hours=0):
+        return self.day + timedelta(days=days, hours=hours)
+
+    def weekly(self, **rule):
+        meeting = Meeting.objects.create(title="Standup", organizer=self.alice, start_time=self.at(0, 9),
+                                         end_time=self.at(0, 10), recurrence="weekly", **rule)
+        meeting.participants.set([self.bob])
+        return meeting
+
+    def test_expansion_jumps_to_the_window_and_applies_exceptions(self):
+        rule = recurrence.Rule(self.at(0, 9), self.at(0, 10), "weekly", 2, None, None)
+        starts = [occurrence[1] for occurrence in recurrence.occurrences(rule, self.at(700), self.at(730))]
+        self.assertEqual(starts, [self.at(700, 9), self.at(714, 9), self.at(728, 9)])
+        self.assertTrue(recurrence.is_occurrence(rule, self.at(714, 9)))
+        self.assertFalse(recurrence.is_occurrence(rule, self.at(7, 9)))
+        self.assertIsNone(recurrence.series_end(rule))
+        self.assertEqual(recurrence.series_end(rule._replace(count=3)), self.at(28, 10))
+
+        # Monthly on the 31st lands on the last day of shorter months
+        start = timezone.make_aware(datetime(2030, 1, 31, 9))
+        monthly = recurrence.Rule(start, start + timedelta(hours=1), "monthly", 1, None, start.replace(month=5, day=1))
+        days = [occurrence[1].day for occurrence in recurrence.occurrences(monthly, start, start.replace(year=2031))]
+        self.assertEqual(days, [31, 28, 31, 30])
+
+        # 714 canceled, 728 moved back to 699
+        changes = (recurrence.Change(self.at(714, 9), True, None, None),
+                   recurrence.Change(self.at(728, 9), False, self.at(699, 9), self.at(699, 10)))
+        found = recurrence.expand(rule, self.at(690), self.at(730), changes)
+        self.assertEqual([occurrence[:2] for occurrence in found],
+                         [(self.at(728, 9), self.at(699, 9)), (self.at(700, 9), self.at(700, 9))])
+        hits = recurrence.expand.cache_info().hits
+        recurrence.expand(rule, self.at(690), self.at(730), changes)
+        self.assertEqual(recurrence.expand.cache_info().hits, hits + 1)
+
+    def test_calendar_lists_occurrences_and_exceptions_edit_them(self):
+        series = self.weekly(recurrence_count=10)
+        single = Meeting.objects.create(title="Board", organizer=self.bob, start_time=self.at(8, 12),
+                                        end_time=self.at(8, 13))
+        self.assertEqual(series.series_end, self.at(63, 10))
+        window = {"start": self.at(6).isoformat(), "end": self.at(22).isoformat()}
+        with self.assertNumQueries(4):   # single meetings, series, participants, exceptions
+            results = self.client.get("/api/meetings/", window).json()["results"]
+        self.assertEqual([(item["id"], item["start_time"][:10]) for item in results],
+                         [(series.pk, self.at(7).isoformat()[:10]), (single.pk, self.at(8).isoformat()[:10]),
+                          (series.pk, self.at(14).isoformat()[:10]), (series.pk, self.at(21).isoformat()[:10])])
+        # Keyset pages walk the same occurrences, two at a time
+        paged, url = [], "/api/meetings/?" + urlencode({**window, "page_size": 2})
+        while url:
+            page = self.client.get(url).json()
+            self.assertIsNone(page["previous"])
+            paged, url = paged + page["results"], page["next"]
+        self.assertEqual(paged, results)
+        # Only the meetings that make the page (and the one past it) are rendered
+        Meeting.objects.create(title="Retro", organizer=self.carol, start_time=self.at(20, 9), end_time=self.at(20, 10),
+                               recurrence="weekly", recurrence_count=2).participants.set([self.carol])
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get("/api/meetings/", {**window, "page_size": 1})
+        lookups = [query["sql"] for query in queries.captured_queries if "api_meeting_participants" in query["sql"]]
+        self.assertEqual(len(lookups), 1)
+        self.assertIn(f"IN ({series.pk}, {single.pk})", lookups[0])
+        self.assertIsNone(results[1]["occurrence"])
+        self.assertEqual(results[0]["participants"], [self.bob.pk])
+
+        url = f"/api/meetings/{series.pk}/exceptions/"
+        response = self.client.post(url, {"original_start": results[0]["occurrence"], "canceled": True}, format="json")
+        self.assertEqual(response.status_code, 201, response.content)
+        moved = {"original_start": results[2]["occurrence"], "start_time": self.at(15, 9), "end_time": self.at(15, 10)}
+        self.assertEqual(self.client.post(url, moved, format="json").status_code, 201)
+        # Replaced, not duplicated
+        moved["start_time"], moved["end_time"] = self.at(16, 9), self.at(16, 10)
+        self.assertEqual(self.client.post(url, moved, format="json").status_code, 200)
+        results = self.client.get("/api/meetings/", window).json()["results"]
+        self.assertEqual([item["start_time"][:10] for item in results if item["id"] == series.pk],
+                         [self.at(16).isoformat()[:10], self.at(21).isoformat()[:10]])
+
+        bad = {"original_start": self.at(15, 9), "canceled": True}
+        self.assertEqual(self.client.post(url, bad, format="json").status_code, 400)
+        self.client.force_authenticate(self.bob)
+        self.assertEqual(self.client.post(url, moved, format="json").status_code, 404)
+
+    def test_free_busy_conflicts_and_exports_see_occurrences(self):
+        series = self.weekly()   # never ends
+        query = {"users": str(self.bob.pk), "start": self.at(300).isoformat(), "end": self.at(315).isoformat()}
+        busy = self.client.get("/api/meetings/free-busy/", query).json()["busy"][str(self.bob.pk)]
+        self.assertEqual(len(busy), 2)
+
+        # A year out, the open-ended series still clashes
+        self.client.force_authenticate(self.carol)
+        body = {"title": "Pitch", "participants": [self.bob.pk], "start_time": self.at(350, 9.5), "end_time": self.at(350, 11)}
+        response = self.client.post("/api/meetings/", body, format="json")
+        self.assertEqual((response.status_code, response.json().get("conflicts")),
+                         (409, [{"user": self.bob.pk, "meeting": series.pk}]))
+        # A daily series clashes on the day the weekly one falls
+        body.update(start_time=self.at(2, 9.5), end_time=self.at(2, 11), recurrence="daily", recurrence_count=6)
+        self.assertEqual(self.client.post("/api/meetings/", body, format="json").status_code, 409)
+        body["recurrence_count"] = 5
+        self.assertEqual(self.client.post("/api/meetings/", body, format="json").status_code, 201)
+        body.update(end_time=self.at(4, 9), recurrence_count=None)
+        self.assertEqual(list(self.client.post("/api/meetings/", body, format="json").json()), ["end_time"])
+
+        rows = [json.loads(line) for line in b"".join(exports.export_stream(
+            "meetings", "ndjson", since=self.at(6), until=self.at(30))).splitlines()]
+        self.assertEqual([row["start_time"][:10] for row in rows if row["id"] == series.pk],
+                         [self.at(days).isoformat()[:10] for days in (7, 14, 21, 28)])
+        self.assertEqual(len(rows), 5)   # and the daily series' last day
+        self.assertEqual(rows[0]["occurrence"], self.at(7, 9).isoformat())
+
+
+class UserSearchTests(TestCase):
+    def setUp(self):
+        self.alice = make_user("alice")
+        self.fan = User.objects.create(username="fintechfan", email="fan@example.com", role="investor",
+                                       bio="Angel in consumer apps")
+        self.founder = User.objects.create(username="dana", email="dana@example.com", role="entrepreneur",
+                                           bio="Building a fintech platform", portfolio="Payments, lending")
+        self.client = APIClient()
+        self.client.force_authenticate(self.alice)
+
+    def find(self, q, **params):
+        response = self.client.get("/api/users/search/", {"q": q, **params})
+        self.assertEqual(response.status_code, 200, response.content)
+        return [user["username"] for user in response.json()["results"]]
+
+    def test_ranked_prefix_search_with_role_filter(self):
+        with self.assertNumQueries(2):   # the index, then the users
+            self.assertEqual(self.find("FinTech"), ["fintechfan", "dana"])   # a username hit weighs most
+        self.assertEqual(self.find("fin", role="entrepreneur"), ["dana"])
+        self.assertEqual(self.find("fintech lend"), ["dana"])
+        self.assertEqual(self.find('pay")* :'), ["dana"])   # only words reach the index
+        body = self.client.get("/api/users/search/", {"q": "fintech", "limit": 1}).json()
+        self.assertIn("offset=1", body["next"])
+        # Public profiles only: no email or preferences
+        self.assertEqual(sorted(body["results"][0]), ["bio", "id", "portfolio", "role", "username"])
+        self.assertEqual(self.client.get(body["next"]).json()["results"][0]["username"], "dana")
+
+        response = self.client.get("/api/users/search/", {"q": "  ", "role": "admin"})
+        self.assertEqual((response.status_code, sorted(response.json())), (400, ["q", "role"]))
+        self.client.force_authenticate(None)
+        self.assertEqual(self.client.get("/api/users/search/", {"q": "fintech"}).status_code, 401)
+
+    def test_signals_and_rebuild_keep_the_index_current(self):
+        self.client.force_authenticate(self.fan)
+        self.client.patch("/api/auth/profile/", {"bio": "Climate hardware"}, format="json")
+        self.assertEqual(self.find("climate"), ["fintechfan"])
+        with self.assertNumQueries(1):   # logins save last_login only: no reindex
+            self.fan.save(update_fields=["last_login"])
+        self.founder.delete()
+        self.assertEqual(self.find("lending"), [])
+
+        User.objects.bulk_create([User(username=f"bulk{i}", email=f"bulk{i}@example.com", role="investor",
+                                       bio="Seed stage agritech") for i in range(3)])
+        self.assertEqual(self.find("agritech"), [])
+        call_command("rebuild_search_index", stdout=io.StringIO())
+        self.assertEqual(sorted(self.find("agritech")), ["bulk0", "bulk1", "bulk2"])
+
+    def test_scan_backend_answers_the_same_without_an_index(self):
+        with override_settings(SEARCH_BACKEND="api.search.ScanBackend"):
+            self.assertEqual(sorted(self.find("fintech")), ["dana", "fintechfan"])
+            self.assertEqual(self.find("fintech", role="investor"), ["fintechfan"])
+
+
+class LedgerConcurrencyTests(TransactionTestCase):
+    def test_parallel_transfers_lose_no_updates(self):
+        # Verifies conservation, balance == sum(entries) and no negatives
+        out = io.StringIO()
+        call_command("stress_ledger", users=6, transfers=300, threads=8, initial=Decimal("50.00"), stdout=out)
+        self.assertIn("Ledger consistent", out.getvalue())
+
+
+class SignalingBenchmarkTests(SimpleTestCase):
+    def test_report_has_latency_throughput_and_memory(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "signaling.json")
+            call_command(
+                "bench_signaling", rooms=2, peers=3, rounds=1, candidates=2,
+                encoding="msgpack", output=path, stdout=io.StringIO(),
+            )
+            with open(path) as fh:
+                report = json.load(fh)
+        results = report["results"]
+        self.assertEqual(report["benchmark"], "signaling")
+        # 2 rooms x 3 pairs x 1 round x (offer + answer) x (1 + 2 candidates)
+        self.assertEqual(results["messages"], 36)
+        self.assertEqual(results["errors"], 0)
+        self.assertEqual(set(results["latency_ms"]), {"p50", "p95", "p99", "max"})
+        self.assertGreater(results["messages_per_sec"], 0)
+        self.assertIsNotNone(results["memory_per_connection_bytes"])
+
+
+class HttpBenchmarkTests(TestCase):
+    def test_seed_then_benchmark_reports_per_endpoint_metrics(self):
+        out = io.StringIO()
+        call_command(
+            "seed_benchmark_data", users=6, meetings=10, documents=4, transactions=30,
+            participants=3, signatures=2, batch_size=4, stdout=out,
+        )
+        self.assertEqual(Transaction.objects.count(), 30)
+        self.assertEqual(Meeting.objects.count(), 10)
+        self.assertFalse(Meeting.objects.filter(participants=None).exists())
+
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "http.json")
+            call_command(
+                "bench_http", iterations=2, warmup=0, output=path, baseline=os.path.join(tmp, "none.json"),
+                endpoints=["meetings-list", "transactions-list", "wallet"], stdout=out,
+            )
+            with open(path) as fh:
+                report = json.load(fh)
+        self.assertEqual(report["config"]["dataset"]["transactions"], 30)
+        transactions = report["results"]["transactions-list"]
+        self.assertEqual(transactions["status"], [200])
+        # One page query; the JWT user is already in CachedJWTAuthentication's cache
+        self.assertEqual(transactions["queries"], 1)
+        self.assertGreater(transactions["bytes"], 0)
+        self.assertEqual(set(transactions["latency_ms"]), {"p50", "p95", "p99", "max"})
+
+
+if __name__ == "__main__":
+    asyncio.run(test_ws())
@@ -0,0 +1,220 @@
+"""
+Resumable chunked uploads into content-addressed storage.
+
+Protocol (views in api.views, all owner-only):
+
+    POST   /api/uploads/                 {"title", "size", "document"?}  -> 201 {"id", "received": 0, ...}
+    PATCH  /api/uploads/<id>/            raw bytes, header Upload-Offset: <received>
+                                          -> 204, Upload-Offset: <new received>
+    HEAD   /api/uploads/<id>/            -> Upload-Offset / Upload-Length, to resume
+    POST   /api/uploads/<id>/complete/   {"sha256"?} -> 201 the Document
+    DELETE /api/uploads/<id>/            abort
+
+A part is appended to a file in UPLOAD_TEMP_DIR as it streams in,
+UPLOAD_CHUNK_SIZE bytes at a time, so neither a part nor the file is ever
+held in memory. A dropped connection keeps the bytes that arrived: the
+client asks for the offset and carries on from there. Parts must be
+sent in order. Each one is checked against `received` and advances it
+with a conditional UPDATE, and a file lock keeps two requests from
+writing the same upload at once.
+
+The SHA-256 is updated as bytes arrive, in the process that received them.
+If a part lands on another worker, or after a restart, completing the
+upload hashes the file from disk instead.
+
+On completion the file moves (no copy, on FileSystemStorage) to
+`blobs/<aa>/<sha256>`, once the rows naming it are committed. Content
+already stored under that name is kept and the part deleted, so
+identical files across versions and owners are stored once. Stored blobs
+are never deleted here: other documents may point at them. A new version
+joins the document's history (api.versions).
+"""
+import fcntl
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from datetime import timedelta
+from pathlib import Path
+
+from django.conf import settings
+from django.core.files import File
+from django.core.files.storage import default_storage
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from . import versions
+from .models import Document, Upload
+
+# In-flight hashers kept per process, least recently used dropped first
+MAX_HASHERS = 256
+
+
+class UploadError(Exception):
+    """A part or completion the upload's state does not allow; `offset` is where it stands."""
+
+    def __init__(self, message, offset=None):
+        super().__init__(message)
+        self.offset = offset
+
+
+class Hashers:
+    """upload id -> (offset hashed up to, sha256 object)."""
+
+    def __init__(self, size):
+        self.size = size
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+
+    def take(self, upload_id, offset):
+        """The hasher that has seen exactly `offset` bytes, or None."""
+        with self.lock:
+            entry = self.entries.pop(upload_id, None)
+        if offset == 0:
+            return hashlib.sha256()
+        return entry[1] if entry is not None and entry[0] == offset else None
+
+    def put(self, upload_id, offset, hasher):
+        with self.lock:
+            self.entries[upload_id] = (offset, hasher)
+            while len(self.entries) > self.size:
+                self.entries.popitem(last=False)
+
+    def discard(self, upload_id):
+        with self.lock:
+            self.entries.pop(upload_id, None)
+
+
+hashers = Hashers(MAX_HASHERS)
+
+
+def chunk_size():
+    return getattr(settings, "UPLOAD_CHUNK_SIZE", 1024 * 1024)
+
+
+def part_path(upload):
+    return Path(settings.UPLOAD_TEMP_DIR) / f"{upload.pk}.part"
+
+
+def blob_name(sha256):
+    return f"blobs/{sha256[:2]}/{sha256}"
+
+
+def write_part(upload, offset, stream):
+    """Append `stream` (file-like) at `offset`; returns the new `received`. Raises UploadError."""
+    if offset != upload.received:
+        raise UploadError("Upload-Offset does not match the bytes received.", upload.received)
+    path = part_path(upload)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "ab") as part:
+        try:
+            fcntl.flock(part, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            raise UploadError("Another part of this upload is being written.", upload.received)
+        # Authoritative under the lock: another worker may have moved on
+        received = Upload.objects.filter(pk=upload.pk).values_list("received", flat=True).first()
+        if received != offset:
+            raise UploadError("Upload-Offset does not match the bytes received.", received)
+        part.truncate(offset)   # drop the tail of a part that died mid-write
+        hasher = hashers.take(upload.pk, offset)
+        room, size, written = upload.size - offset, chunk_size(), 0
+        try:
+            while written <= room and (chunk := stream.read(min(size, room - written + 1))):
+                if written + len(chunk) > room:
+                    raise UploadError("The part runs past the declared size.", offset)
+                part.write(chunk)
+                if hasher is not None:
+                    hasher.update(chunk)
+                written += len(chunk)
+        finally:
+            # Whatever arrived is kept, so a dropped connection resumes where it stopped
+            part.flush()
+            os.fsync(part.fileno())
+            if written:
+                Upload.objects.filter(pk=upload.pk, received=offset).update(received=offset + written)
+                upload.received = offset + written
+            if hasher is not None:
+                hashers.put(upload.pk, upload.received, hasher)
+    return upload.received
+
+
+def file_sha256(path):
+    hasher = hashlib.sha256()
+    with open(path, "rb") as part:
+        while chunk := part.read(chunk_size()):
+            hasher.update(chunk)
+    return hasher.hexdigest()
+
+
+class PartFile(File):
+    # FileSystemStorage moves files that have a temporary path instead of copying them
+    def temporary_file_path(self):
+        return self.file.name
+
+
+def store(path, sha256):
+    """Move the file at `path` to blob_name(sha256), unless that content is already stored."""
+    name = blob_name(sha256)
+    if not default_storage.exists(name):
+        with open(path, "rb") as part:
+            stored = default_storage.save(name, PartFile(part))
+        if stored != name:   # another completion stored the same content meanwhile
+            default_storage.delete(stored)
+    path.unlink(missing_ok=True)
+
+
+def complete(upload, expected_sha256=None):
+    """Turn a fully received upload into a Document (or a new version of one). Raises UploadError."""
+    with transaction.atomic():
+        # Only one completion finds the row; the others wait here, then fail
+        upload = Upload.objects.select_for_update().filter(pk=upload.pk).first()
+        if upload is None:
+            raise UploadError("The upload was already completed or discarded.")
+        if upload.received != upload.size:
+            raise UploadError("The upload is incomplete.", upload.received)
+        path = part_path(upload)
+        if upload.size == 0:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.touch()
+        hasher = hashers.take(upload.pk, upload.size) if upload.size else hashlib.sha256()
+        sha256 = hasher.hexdigest() if hasher is not None else file_sha256(path)
+        hashers.discard(upload.pk)
+        matches = not expected_sha256 or expected_sha256.lower() == sha256
+        if matches:
+            # The rows name the blob now; the file moves there only once they
+            # are committed, so a rollback leaves the part for a retry
+            name = blob_name(sha256)
+            if upload.document_id is None:
+                document = Document.objects.create(owner=upload.owner, title=upload.title, file=name, sha256=sha256)
+            else:
+                document = Document.objects.select_for_update().get(pk=upload.document_id)
+                # The outgoing version is left a snapshot for compact_versions
+                versions.current(document)
+                document.file, document.sha256, document.title = name, sha256, upload.title
+                document.version = F("version") + 1
+                document.status = "draft"
+                document.save(update_fields=["file", "sha256", "title", "version", "status"])
+                document.refresh_from_db()
+            versions.record(document, upload.size, upload.owner)
+            upload.delete()
+            transaction.on_commit(lambda: store(path, sha256))
+    if not matches:
+        discard(upload)
+        raise UploadError("Checksum mismatch; the upload was discarded.")
+    return document
+
+
+def discard(upload):
+    hashers.discard(upload.pk)
+    part_path(upload).unlink(missing_ok=True)
+    upload.delete()
+
+
+def purge_expired():
+    """Discard uploads started more than UPLOAD_EXPIRY seconds ago; returns how many."""
+    cutoff = timezone.now() - timedelta(seconds=getattr(settings, "UPLOAD_EXPIRY", 86400))
+    expired = list(Upload.objects.filter(created_at__lt=cutoff))
+    for upload in expired:
+        discard(upload)
+    return len(expired)
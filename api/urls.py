@@ -3,16 +3,29 @@ from django.urls import path, include
 from rest_framework.routers import DefaultRouter
 from rest_framework_simplejwt.views import TokenRefreshView
 
+from . import async_views
 from .views import (
     RegisterView,
     LoginView,
+    LogoutView,
     ProfileView,
+    UserSearchView,
     MeetingViewSet,
     VideoRoomViewSet,
     DocumentViewSet,
     DocumentSignatureView,
+    DocumentDownloadView,
+    DocumentVersionListView,
+    DocumentVersionDetailView,
+    DocumentVersionDiffView,
     WalletView,
+    WalletBalanceView,
+    WalletStatementView,
     TransactionViewSet,
+    ExportView,
+    UploadListView,
+    UploadDetailView,
+    UploadCompleteView,
 )
 
 router = DefaultRouter()
@@ -26,13 +39,42 @@ urlpatterns = [
     path("auth/register/", RegisterView.as_view(), name="auth_register"),
     path("auth/login/",    LoginView.as_view(),    name="auth_login"),
     path("auth/refresh/",  TokenRefreshView.as_view(), name="token_refresh"),
+    path("auth/logout/",   LogoutView.as_view(),   name="auth_logout"),
     path("auth/profile/",  ProfileView.as_view(),  name="auth_profile"),
 
+    # Investor / entrepreneur discovery (api/search.py)
+    path("users/search/", UserSearchView.as_view(), name="user_search"),
+
     # Wallet
     path("wallet/", WalletView.as_view(), name="wallet"),
+    path("wallet/balance/", WalletBalanceView.as_view(), name="wallet_balance"),
+    path("wallet/statement/", WalletStatementView.as_view(), name="wallet_statement"),
+
+    # Streaming exports (staff)
+    path("exports/<str:dataset>/", ExportView.as_view(), name="export"),
+
+    # Resumable chunked uploads (api/uploads.py)
+    path("uploads/", UploadListView.as_view(), name="upload_list"),
+    path("uploads/<uuid:upload_id>/", UploadDetailView.as_view(), name="upload_detail"),
+    path("uploads/<uuid:upload_id>/complete/", UploadCompleteView.as_view(), name="upload_complete"),
 
-    # Document signing
+    # Document signing & download
     path("documents/<int:doc_id>/sign/", DocumentSignatureView.as_view(), name="document_sign"),
+    path("documents/<int:doc_id>/download/", DocumentDownloadView.as_view(), name="document_download"),
+
+    # Version history (api/versions.py)
+    path("documents/<int:doc_id>/versions/", DocumentVersionListView.as_view(), name="document_versions"),
+    path("documents/<int:doc_id>/versions/<int:number>/", DocumentVersionDetailView.as_view(),
+         name="document_version"),
+    path("documents/<int:doc_id>/versions/<int:number>/diff/<int:other>/", DocumentVersionDiffView.as_view(),
+         name="document_version_diff"),
+
+    # Async-native hot paths: same responses as the routes above, see api/async_views.py
+    path("async/auth/login/", async_views.login, name="async_auth_login"),
+    path("async/auth/profile/", async_views.profile, name="async_auth_profile"),
+    path("async/wallet/", async_views.wallet, name="async_wallet"),
+    path("async/meetings/", async_views.meetings, name="async_meetings"),
+    path("async/documents/<int:doc_id>/sign/", async_views.sign_document, name="async_document_sign"),
 
     # ViewSets (meetings, video-rooms, documents, transactions)
     path("", include(router.urls)),
@@ -0,0 +1,356 @@
+"""
+Document version history stored as reverse binary deltas.
+
+Every revision gets a DocumentVersion row. The newest version is always a
+snapshot, the same content-addressed blob as `Document.file`, so current
+downloads never rebuild anything. Once a newer version exists, `compact()`
+re-stores the one before it as a zlib-compressed delta that rebuilds it
+from its successor, and deletes the old full blob if nothing else points
+at it. Uploads only record versions; `manage.py compact_versions` does the
+compacting, outside any request. Every DOCUMENT_SNAPSHOT_INTERVAL-th version stays a
+snapshot, so rebuilding any version applies fewer deltas than that.
+
+Delta format, zlib-compressed: a run of operations,
+
+    0x00 <offset:u64> <length:u64>   copy from the base version
+    0x01 <length:u64> <bytes>        insert literal bytes
+
+found by indexing the base in BLOCK-byte blocks, extending every match
+both ways and trimming the shared prefix and suffix first, since redlines
+usually touch the middle of a file. Both versions are held in memory, so
+files over DOCUMENT_DELTA_MAX_SIZE, and deltas that would not save at
+least half the bytes, stay snapshots.
+
+Rebuilt versions are kept in a per-process LRU bounded by
+DOCUMENT_VERSION_CACHE_BYTES. Listing versions reads only rows. A diff
+between adjacent versions decodes the stored delta without rebuilding
+either side.
+"""
+import hashlib
+import struct
+import threading
+import zlib
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import transaction
+from django.db.models import F
+from django.db.models.functions import Mod
+from rest_framework.exceptions import APIException
+
+from .models import Document, DocumentVersion
+
+BLOCK = 32
+COPY, INSERT = 0, 1
+COPY_OP, INSERT_OP = struct.Struct(">BQQ"), struct.Struct(">BQ")
+# Doubling/halving bounds for comparing runs slice by slice
+MIN_RUN, MAX_RUN = 64, 1 << 20
+
+
+class VersionError(Exception):
+    pass
+
+
+class DiffTooLarge(APIException):
+    """413 for a diff that would delta-encode versions over DOCUMENT_DIFF_MAX_SIZE in the request."""
+    status_code = 413
+    default_detail = "These versions are too large to compare; compare each with the one next to it."
+    default_code = "diff_too_large"
+
+
+# -------------------------
+# Delta codec
+# -------------------------
+def match_length(a, i, b, j):
+    """Length of the common run of a[i:] and b[j:], compared slice by slice."""
+    limit, length, step = min(len(a) - i, len(b) - j), 0, MIN_RUN
+    while length < limit:
+        n = min(step, limit - length)
+        if a[i + length:i + length + n] == b[j + length:j + length + n]:
+            length, step = length + n, min(step * 2, MAX_RUN)
+        elif n == 1:
+            break
+        else:
+            step = max(1, n // 2)
+    return length
+
+
+def suffix_length(a, b, limit):
+    """Length of the common tail of `a` and `b`, at most `limit`."""
+    length, step = 0, MIN_RUN
+    while length < limit:
+        n = min(step, limit - length)
+        if a[len(a) - length - n:len(a) - length] == b[len(b) - length - n:len(b) - length]:
+            length, step = length + n, min(step * 2, MAX_RUN)
+        elif n == 1:
+            break
+        else:
+            step = max(1, n // 2)
+    return length
+
+
+def encode(base, target):
+    """A delta that rebuilds `target` from `base`."""
+    base, target = memoryview(base), memoryview(target)
+    out = bytearray()
+
+    def copy(offset, length):
+        if length:
+            out.extend(COPY_OP.pack(COPY, offset, length))
+
+    def insert(start, end):
+        if end > start:
+            out.extend(INSERT_OP.pack(INSERT, end - start))
+            out.extend(target[start:end])
+
+    prefix = match_length(base, 0, target, 0)
+    suffix = suffix_length(base, target, min(len(base), len(target)) - prefix)
+    index = {}
+    for offset in range(0, len(base) - BLOCK + 1, BLOCK):
+        index.setdefault(bytes(base[offset:offset + BLOCK]), offset)
+
+    copy(0, prefix)
+    position = literal = prefix
+    end = len(target) - suffix
+    while position + BLOCK <= end:
+        offset = index.get(bytes(target[position:position + BLOCK]))
+        if offset is None:
+            position += 1
+            continue
+        length = BLOCK + match_length(base, offset + BLOCK, target[:end], position + BLOCK)
+        back = 0
+        while position - back > literal and offset - back > 0 and base[offset - back - 1] == target[position - back - 1]:
+            back += 1
+        insert(literal, position - back)
+        copy(offset - back, length + back)
+        position = literal = position + length
+    insert(literal, end)
+    copy(len(base) - suffix, suffix)
+    return zlib.compress(bytes(out), 6)
+
+
+def operations(delta):
+    """(COPY, base offset, length) and (INSERT, bytes) in order."""
+    data = memoryview(zlib.decompress(delta))
+    position = 0
+    while position < len(data):
+        if data[position] == COPY:
+            _, offset, length = COPY_OP.unpack_from(data, position)
+            position += COPY_OP.size
+            yield COPY, offset, length
+        else:
+            _, length = INSERT_OP.unpack_from(data, position)
+            position += INSERT_OP.size
+            yield INSERT, data[position:position + length]
+            position += length
+
+
+def apply(base, delta):
+    base, out = memoryview(base), bytearray()
+    for op in operations(delta):
+        out.extend(base[op[1]:op[1] + op[2]] if op[0] == COPY else op[1])
+    return bytes(out)
+
+
+def matching_blocks(delta):
+    """(base offset, target offset, length) of every run the target copies from the base."""
+    blocks, position = [], 0
+    for op in operations(delta):
+        if op[0] == COPY:
+            blocks.append((op[1], position, op[2]))
+            position += op[2]
+        else:
+            position += len(op[1])
+    return blocks
+
+
+# -------------------------
+# Rebuilt versions
+# -------------------------
+class ContentCache:
+    """(version pk, blob) -> bytes, least recently used dropped first once over `max_bytes`."""
+
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self.size = 0
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, key):
+        with self.lock:
+            value = self.entries.get(key)
+            if value is not None:
+                self.entries.move_to_end(key)
+            return value
+
+    def put(self, key, value):
+        if len(value) > self.max_bytes:
+            return
+        with self.lock:
+            previous = self.entries.pop(key, None)
+            self.size += len(value) - (len(previous) if previous is not None else 0)
+            self.entries[key] = value
+            while self.size > self.max_bytes:
+                _, evicted = self.entries.popitem(last=False)
+                self.size -= len(evicted)
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+            self.size = 0
+
+
+cache = ContentCache(getattr(settings, "DOCUMENT_VERSION_CACHE_BYTES", 64 * 1024 * 1024))
+
+
+def read(name):
+    with default_storage.open(name, "rb") as fh:
+        return fh.read()
+
+
+def content(version):
+    """The bytes of `version`, rebuilt through newer versions to a snapshot."""
+    key = (version.pk, version.blob)   # pks come back after a rollback; blob names do not lie
+    data = cache.get(key)
+    if data is not None:
+        return data
+    if version.kind == "snapshot":
+        data = read(version.blob)
+    else:
+        data = apply(content(version.base), read(version.blob))
+        if version.sha256 and hashlib.sha256(data).hexdigest() != version.sha256:
+            raise VersionError(f"Version {version.number} of document {version.document_id} does not rebuild.")
+    cache.put(key, data)
+    return data
+
+
+# -------------------------
+# The chain
+# -------------------------
+def snapshot_interval():
+    return getattr(settings, "DOCUMENT_SNAPSHOT_INTERVAL", 8)
+
+
+def delta_name(version):
+    return f"deltas/{version.document_id}/{version.number}-{version.sha256[:16] or version.pk}.zdelta"
+
+
+def record(document, size, user=None):
+    """The row for `document` as it stands now, its newest version."""
+    return DocumentVersion.objects.create(
+        document=document, number=document.version, blob=document.file.name, sha256=document.sha256,
+        size=size, stored_size=size, title=document.title, created_by=user,
+    )
+
+
+def current(document):
+    """The newest version's row; documents from before version history get one now."""
+    version = DocumentVersion.objects.filter(document=document, number=document.version).first()
+    if version is None:
+        try:
+            size = default_storage.size(document.file.name)
+        except (FileNotFoundError, ValueError):
+            size = 0
+        version = record(document, size)
+    return version
+
+
+def release(name):
+    """Delete stored file `name` once committed, unless a document or snapshot still uses it."""
+    if Document.objects.filter(file=name).exists() or DocumentVersion.objects.filter(kind="snapshot", blob=name).exists():
+        return
+    transaction.on_commit(lambda: default_storage.delete(name))
+
+
+def compact(version):
+    """Re-store `version` as a delta from the next newer version; returns whether it did."""
+    if version.kind != "snapshot" or not version.size or version.number % snapshot_interval() == 0:
+        return False
+    newer = DocumentVersion.objects.filter(document_id=version.document_id, number=version.number + 1).first()
+    max_size = getattr(settings, "DOCUMENT_DELTA_MAX_SIZE", 64 * 1024 * 1024)
+    if newer is None or max(version.size, newer.size) > max_size:
+        return False
+    delta = encode(content(newer), content(version))
+    if len(delta) > version.stored_size // 2:
+        # Versions never change, so neither will the answer
+        DocumentVersion.objects.filter(pk=version.pk).update(compaction_declined=True)
+        version.compaction_declined = True
+        return False
+    name = default_storage.save(delta_name(version), ContentFile(delta))
+    with transaction.atomic():
+        compacted = DocumentVersion.objects.filter(pk=version.pk, kind="snapshot").update(
+            kind="delta", base=newer, blob=name, stored_size=len(delta)
+        )
+        if compacted:
+            release(version.blob)
+    if not compacted:
+        default_storage.delete(name)
+        return False
+    version.kind, version.base, version.blob, version.stored_size = "delta", newer, name, len(delta)
+    return True
+
+
+def pending():
+    """
+    Snapshots compact() may turn into deltas: older than the newest
+    version, off the interval and not already declined by compact().
+    """
+    max_size = getattr(settings, "DOCUMENT_DELTA_MAX_SIZE", 64 * 1024 * 1024)
+    return (
+        DocumentVersion.objects.filter(kind="snapshot", size__gt=0, size__lte=max_size, compaction_declined=False,
+                                       number__lt=F("document__version"))
+        .annotate(slot=Mod("number", snapshot_interval())).exclude(slot=0).order_by("pk")
+    )
+
+
+def compact_pending(limit=None):
+    """
+    compact() each pending version, oldest first; returns (checked,
+    compacted, failed) where failed lists (version, error). A version
+    whose delta would save too little is marked and not checked again.
+    """
+    checked, compacted, failed = 0, 0, []
+    for version in list(pending()[:limit]):
+        checked += 1
+        try:
+            compacted += compact(version)
+        except (VersionError, OSError) as exc:
+            failed.append((version, exc))
+    return checked, compacted, failed
+
+
+def diff(source, target):
+    """
+    What `target` keeps of `source`: (source offset, target offset, length)
+    runs plus byte counts. Reads no file when the hashes match, and only
+    the delta when one links the two. Other pairs are encoded on the spot,
+    so both must be within DOCUMENT_DIFF_MAX_SIZE (DiffTooLarge otherwise).
+    """
+    identical = bool(source.sha256) and source.sha256 == target.sha256
+    if identical:
+        blocks = [(0, 0, source.size)] if source.size else []
+    elif target.kind == "delta" and target.base_id == source.pk:
+        blocks = matching_blocks(read(target.blob))
+    elif source.kind == "delta" and source.base_id == target.pk:
+        # The stored delta runs the other way, rebuilding `source` from `target`
+        blocks = sorted(((s, t, n) for t, s, n in matching_blocks(read(source.blob))), key=lambda block: block[1])
+    else:
+        # Encoding runs in the request, at well under a megabyte a second
+        if max(source.size, target.size) > getattr(settings, "DOCUMENT_DIFF_MAX_SIZE", 1024 * 1024):
+            raise DiffTooLarge()
+        blocks = matching_blocks(encode(content(source), content(target)))
+
+    kept, end = 0, 0   # bytes of `source` inside some run; runs may overlap there
+    for start, _, length in sorted(blocks):
+        kept += max(0, start + length - max(start, end))
+        end = max(end, start + length)
+    unchanged = sum(length for _, _, length in blocks)
+    return {
+        "identical": identical,
+        "unchanged_bytes": unchanged,
+        "added_bytes": target.size - unchanged,
+        "removed_bytes": source.size - kept,
+        "matching_blocks": [list(block) for block in blocks],
+    }
@@ -1,18 +1,61 @@
+import os
+from datetime import timedelta
+from decimal import Decimal
+
 from rest_framework import viewsets, generics, permissions
+from rest_framework.decorators import action
+from rest_framework.exceptions import NotFound, PermissionDenied, ValidationError
 from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
 from rest_framework.views import APIView
-from rest_framework_simplejwt.tokens import RefreshToken
+from rest_framework_simplejwt.settings import api_settings as jwt_settings
+from django.conf import settings
 from django.contrib.auth import get_user_model
-from .models import Meeting, VideoRoom, Document, Transaction, Wallet, DocumentSignature
+from django.core.handlers.asgi import ASGIRequest
+from django.db import IntegrityError, transaction
+from django.http import StreamingHttpResponse
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from . import availability, downloads, exports, ingest, ledger, revocation, search, uploads, versions
+from .fieldsets import Fieldset, names
+from .response_cache import CachedResponseMixin
+from .authentication import tokens_for
+from .models import Meeting, MeetingException, VideoRoom, Document, DocumentVersion, Transaction, Wallet, DocumentSignature, Upload
 from .serializers import (
     UserSerializer,
+    PublicUserSerializer,
     RegisterSerializer,
     LoginSerializer,
+    LogoutSerializer,
     MeetingSerializer,
+    MeetingCreateSerializer,
+    MeetingExceptionSerializer,
     VideoRoomSerializer,
     DocumentSerializer,
+    UploadSerializer,
+    UploadCompleteSerializer,
+    DocumentVersionSerializer,
     TransactionSerializer,
+    TransactionCreateSerializer,
+    WalletAdjustmentSerializer,
+    StatementEntrySerializer,
     WalletSerializer,
+    FastMeetingSerializer,
+    FastDocumentSerializer,
+    FastTransactionSerializer,
+)
+from .pagination import (
+    MeetingPagination,
+    OccurrencePagination,
+    VideoRoomPagination,
+    DocumentPagination,
+    TransactionPagination,
+)
+from .querysets import (
+    meeting_queryset,
+    video_room_queryset,
+    document_queryset,
+    transaction_queryset,
 )
 
 User = get_user_model()
@@ -27,16 +70,34 @@ class RegisterView(generics.CreateAPIView):
 
 class LoginView(APIView):
     permission_classes = [permissions.AllowAny]
+    # Nothing here depends on who the caller already is: skip decoding (and
+    # querying the user of) any token the client still sends
+    authentication_classes = []
 
     def post(self, request):
         serializer = LoginSerializer(data=request.data)
         serializer.is_valid(raise_exception=True)
-        user = serializer.validated_data["user"]
-        refresh = RefreshToken.for_user(user)
-        return Response({
-            "refresh": str(refresh),
-            "access": str(refresh.access_token),
-        })
+        return Response(tokens_for(serializer.validated_data["user"]))
+
+
+class LogoutView(APIView):
+    """
+    POST {"refresh": ...}: revoke the refresh token (api.revocation), so it
+    can no longer be refreshed. Access tokens already issued from it stay
+    valid until they expire.
+    """
+    permission_classes = [permissions.AllowAny]
+    authentication_classes = []
+
+    def get_authenticate_header(self, request):
+        # An invalid token is a 401, as from the refresh endpoint
+        return f'{jwt_settings.AUTH_HEADER_TYPES[0]} realm="api"'
+
+    def post(self, request):
+        serializer = LogoutSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        revocation.revoke(serializer.validated_data["token"])
+        return Response(status=204)
 
 
 class ProfileView(generics.RetrieveUpdateAPIView):
@@ -47,17 +108,146 @@ class ProfileView(generics.RetrieveUpdateAPIView):
         return self.request.user
 
 
+# ---------------- DISCOVERY SEARCH ----------------
+
+class UserSearchView(APIView):
+    """
+    GET ?q=&role=&limit=&offset=: users whose username, bio or portfolio
+    match every word of `q` (as a prefix), best match first (api.search).
+    `role` narrows to investors or entrepreneurs. Public profiles only. One
+    index query and one query for the users, however many there are.
+    """
+    permission_classes = [permissions.IsAuthenticated]
+    page_size = 20
+
+    def get(self, request):
+        params, errors = request.query_params, {}
+        words = search.words(params.get("q", ""))
+        if not words:
+            errors["q"] = "At least one word to search for."
+        role = params.get("role") or None
+        if role is not None and role not in dict(User.ROLE_CHOICES):
+            errors["role"] = f"One of {', '.join(dict(User.ROLE_CHOICES))}."
+        try:
+            limit = min(int(params.get("limit") or self.page_size), settings.SEARCH_MAX_LIMIT)
+            offset = int(params.get("offset") or 0)
+        except ValueError:
+            errors["limit"] = "limit and offset must be integers."
+        else:
+            limit, offset = max(limit, 1), max(offset, 0)
+        if errors:
+            raise ValidationError(errors)
+
+        ids = search.backend().search(words, role, limit + 1, offset)
+        users = User.objects.only(*PublicUserSerializer.Meta.fields).in_bulk(ids[:limit])
+        url = request.build_absolute_uri()
+        return Response({
+            "next": replace_query_param(url, "offset", offset + limit) if len(ids) > limit else None,
+            "previous": replace_query_param(url, "offset", max(offset - limit, 0)) if offset else None,
+            # A user deleted since the index was read is skipped
+            "results": PublicUserSerializer([users[pk] for pk in ids[:limit] if pk in users], many=True).data,
+        })
+
+
 # ---------------- WALLET ----------------
 
 class WalletView(APIView):
     permission_classes = [permissions.IsAuthenticated]
 
     def get(self, request):
-        wallet, _ = Wallet.objects.get_or_create(user=request.user)
+        # Read-only: wallets are created by api.ledger on first posting,
+        # until then the balance is simply zero.
+        wallet = Wallet.objects.filter(user=request.user).first() or Wallet()
+        wallet.user = request.user
         serializer = WalletSerializer(wallet)
         return Response(serializer.data)
 
 
+def datetime_param(request, name):
+    """Optional ISO 8601 datetime query parameter; naive values use the current timezone."""
+    raw = request.query_params.get(name)
+    if not raw:
+        return None
+    value = parse_datetime(raw)
+    if value is None:
+        raise ValidationError({name: "Expected an ISO 8601 datetime."})
+    return timezone.make_aware(value) if timezone.is_naive(value) else value
+
+
+class WalletBalanceView(APIView):
+    """GET ?at=<datetime>: the balance at that moment (default: now)."""
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get(self, request):
+        at = datetime_param(request, "at")
+        wallet = Wallet.objects.filter(user=request.user).first()
+        if wallet is None:
+            balance = Decimal("0.00")
+        elif at is None:
+            balance = wallet.balance
+        else:
+            balance, _ = ledger.balance_as_of(wallet, when=at)
+        return Response({"at": at, "balance": f"{balance:.2f}"})
+
+
+class WalletStatementView(APIView):
+    """
+    GET ?from=&to=&after=&page_size=: ledger entries created in [from, to],
+    oldest first, each with the running balance. The opening balance comes
+    from the nearest checkpoint, so the cost is one page plus at most
+    LEDGER_CHECKPOINT_INTERVAL entries, however long the history.
+    """
+    permission_classes = [permissions.IsAuthenticated]
+    page_size = 100
+    max_page_size = 1000
+
+    def get(self, request):
+        start, end = datetime_param(request, "from"), datetime_param(request, "to")
+        try:
+            after = int(request.query_params["after"]) if request.query_params.get("after") else None
+            size = min(int(request.query_params.get("page_size") or self.page_size), self.max_page_size)
+        except ValueError:
+            raise ValidationError({"detail": "after and page_size must be integers."})
+        size = max(size, 1)
+
+        wallet = Wallet.objects.filter(user=request.user).first()
+        if wallet is None:
+            return Response({"opening_balance": "0.00", "closing_balance": "0.00", "entries": [], "next": None})
+
+        entries = wallet.entries.order_by("id")
+        if start is not None:
+            entries = entries.filter(created_at__gte=start)
+        if end is not None:
+            entries = entries.filter(created_at__lte=end)
+        if after is not None:
+            entries = entries.filter(id__gt=after)
+            opening, _ = ledger.balance_as_of(wallet, entry_id=after)
+        elif start is not None:
+            opening, _ = ledger.balance_as_of(wallet, when=start - timedelta(microseconds=1))
+        else:
+            opening = Decimal("0.00")
+
+        rows = list(entries.values(
+            "id", "transaction_id", "transaction__transaction_type", "amount", "created_at",
+        )[:size + 1])
+        more = len(rows) > size
+        rows = rows[:size]
+        balance = opening
+        for row in rows:
+            balance += row["amount"]
+            row["balance"] = balance
+
+        next_url = None
+        if more:
+            next_url = replace_query_param(request.build_absolute_uri(), "after", rows[-1]["id"])
+        return Response({
+            "opening_balance": f"{opening:.2f}",
+            "closing_balance": f"{balance:.2f}",
+            "entries": StatementEntrySerializer(rows, many=True).data,
+            "next": next_url,
+        })
+
+
 # ---------------- DOCUMENT SIGNING  ✅ FIXED ----------------
 
 class DocumentSignatureView(APIView):
@@ -69,12 +259,13 @@ class DocumentSignatureView(APIView):
         except Document.DoesNotExist:
             return Response({"error": "Document not found"}, status=404)
 
-        # Prevent duplicate sign by the same user
-        if DocumentSignature.objects.filter(document=document, signed_by=request.user).exists():
+        # Single INSERT; the (document, signed_by) unique constraint rejects duplicates
+        try:
+            with transaction.atomic():
+                DocumentSignature.objects.create(document=document, signed_by=request.user)
+        except IntegrityError:
             return Response({"error": "You already signed this document."}, status=400)
 
-        DocumentSignature.objects.create(document=document, signed_by=request.user)
-
         # Optionally mark document as signed
         if document.status != "signed":
             document.status = "signed"
@@ -83,6 +274,153 @@ class DocumentSignatureView(APIView):
         return Response({"status": f"Document '{document.title}' signed"})
 
 
+class DocumentDownloadView(APIView):
+    """
+    GET/HEAD: the document's file, with Range / If-Range / If-None-Match.
+    Readable by the same users who may sign it; see api/downloads.py.
+    """
+    permission_classes = [permissions.IsAuthenticated]
+    content_negotiation_class = downloads.AnyAccept
+
+    def get(self, request, doc_id):
+        document = Document.objects.only("id", "title", "file", "sha256").filter(id=doc_id).first()
+        if document is None:
+            raise NotFound("Document not found.")
+        return downloads.serve(
+            request._request, document.file.name, downloads.download_name(document.title, document.file.name), document.sha256
+        )
+
+
+# ---------------- VERSION HISTORY ----------------
+# Older versions are stored as deltas: see api/versions.py
+
+def document_versions(doc_id, *numbers):
+    """The document and its versions `numbers` (all of them, newest first, if none)."""
+    document = Document.objects.only("id", "title", "file", "sha256", "version").filter(id=doc_id).first()
+    if document is None:
+        raise NotFound("Document not found.")
+    rows = DocumentVersion.objects.filter(document=document)
+    if numbers:
+        rows = rows.filter(number__in=numbers)
+    rows = {row.number: row for row in rows}
+    if document.version in (numbers or (document.version,)) and document.version not in rows:
+        rows[document.version] = versions.current(document)   # from before version history
+    missing = [number for number in numbers if number not in rows]
+    if missing:
+        raise NotFound(f"Version {missing[0]} not found.")
+    return document, [rows[number] for number in numbers or sorted(rows, reverse=True)]
+
+
+class DocumentVersionListView(APIView):
+    """GET: the document's versions, newest first, without reading any file."""
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get(self, request, doc_id):
+        _, rows = document_versions(doc_id)
+        return Response(DocumentVersionSerializer(rows, many=True).data)
+
+
+class DocumentVersionDetailView(APIView):
+    """GET/HEAD: the file as it was at version `number`, with the same validators as a download."""
+    permission_classes = [permissions.IsAuthenticated]
+    content_negotiation_class = downloads.AnyAccept
+
+    def get(self, request, doc_id, number):
+        document, (version,) = document_versions(doc_id, number)
+        stem, ext = os.path.splitext(downloads.download_name(version.title, document.file.name))
+        filename = f"{stem} (v{version.number}){ext}"
+        if version.kind == "snapshot":
+            return downloads.serve(request._request, version.blob, filename, version.sha256)
+        return downloads.serve_content(request._request, versions.content(version), filename, version.sha256)
+
+
+class DocumentVersionDiffView(APIView):
+    """GET: which byte runs version `other` keeps of version `number`, and how much changed."""
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get(self, request, doc_id, number, other):
+        _, (source, target) = document_versions(doc_id, number, other)
+        return Response({"from": source.number, "to": target.number, **versions.diff(source, target)})
+
+
+# ---------------- CHUNKED UPLOADS ----------------
+# Resumable upload protocol: see api/uploads.py
+
+def owned_upload(request, upload_id):
+    upload = Upload.objects.filter(pk=upload_id, owner=request.user).first()
+    if upload is None:
+        raise NotFound("Upload not found.")
+    return upload
+
+
+def upload_conflict(exc):
+    response = Response({"detail": str(exc), "received": exc.offset}, status=409)
+    if exc.offset is not None:
+        response["Upload-Offset"] = str(exc.offset)
+    return response
+
+
+class UploadListView(generics.CreateAPIView):
+    """POST {"title", "size", "document"?}: start an upload; parts go to /api/uploads/<id>/."""
+    serializer_class = UploadSerializer
+    permission_classes = [permissions.IsAuthenticated]
+
+    def perform_create(self, serializer):
+        serializer.save(owner=self.request.user)
+
+
+class UploadDetailView(APIView):
+    """
+    GET/HEAD: progress, also as Upload-Offset / Upload-Length headers.
+    PATCH: the next part as the raw body, with Upload-Offset set to the
+    bytes received so far. DELETE: abort.
+    """
+    permission_classes = [permissions.IsAuthenticated]
+
+    def progress(self, upload, status=200):
+        response = Response(UploadSerializer(upload).data, status=status)
+        response["Upload-Offset"] = str(upload.received)
+        response["Upload-Length"] = str(upload.size)
+        return response
+
+    def get(self, request, upload_id):
+        return self.progress(owned_upload(request, upload_id))
+
+    def patch(self, request, upload_id):
+        upload = owned_upload(request, upload_id)
+        try:
+            offset = int(request.headers["Upload-Offset"])
+        except (KeyError, ValueError):
+            raise ValidationError({"Upload-Offset": "This header is required: the bytes received so far."})
+        try:
+            # The raw body, read in chunks; request.data would buffer it whole
+            uploads.write_part(upload, offset, request._request)
+        except uploads.UploadError as exc:
+            return upload_conflict(exc)
+        response = Response(status=204)
+        response["Upload-Offset"] = str(upload.received)
+        return response
+
+    def delete(self, request, upload_id):
+        uploads.discard(owned_upload(request, upload_id))
+        return Response(status=204)
+
+
+class UploadCompleteView(APIView):
+    """POST {"sha256"?}: store the finished upload and return its Document."""
+    permission_classes = [permissions.IsAuthenticated]
+
+    def post(self, request, upload_id):
+        upload = owned_upload(request, upload_id)
+        serializer = UploadCompleteSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        try:
+            document = uploads.complete(upload, serializer.validated_data.get("sha256"))
+        except uploads.UploadError as exc:
+            return upload_conflict(exc)
+        return Response(DocumentSerializer(document, context={"request": request}).data, status=201)
+
+
 # ---------------- PERMISSION CLASSES ----------------
 
 class ReadOnlyOrAuthenticated(permissions.BasePermission):
@@ -96,27 +434,297 @@ class ReadOnlyOrAuthenticated(permissions.BasePermission):
         return request.user and request.user.is_authenticated
 
 
-# ---------------- VIEWSETS ----------------
+# ---------------- FAST LIST PATH ----------------
 
-class MeetingViewSet(viewsets.ModelViewSet):
-    queryset = Meeting.objects.all()
+class FastListMixin:
+    """
+    Opt-in fast read path for `list`. When `fast_serializer_class` is set the
+    page is fetched as `.values()` rows and rendered by a FastReadSerializer,
+    which produces the same JSON as `serializer_class`.
+    """
+    fast_serializer_class = None
+
+    def list(self, request, *args, **kwargs):
+        if self.fast_serializer_class is None:
+            return super().list(request, *args, **kwargs)
+
+        serializer = self.fast_serializer_class(context=self.get_serializer_context())
+        # Keyset pages read their cursor from the rows, whatever `?fields=` leaves out
+        keys = [name.lstrip("-") for name in getattr(self.paginator, "ordering", ())]
+        queryset = serializer.values(self.filter_queryset(self.get_queryset()), extra=keys)
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            return self.get_paginated_response(serializer.to_representation(page))
+        return Response(serializer.to_representation(queryset))
+
+
+class FieldsetMixin:
+    """
+    `?fields=` and `?expand=` on reads (api.fieldsets): the serializers
+    render the requested shape and `queryset_builder` joins only what it
+    needs. Writes respond in the default shape.
+    """
+    queryset_builder = None
+
+    @property
+    def fieldset(self):
+        if not hasattr(self.request, "fieldset"):
+            read = self.request.method in permissions.SAFE_METHODS
+            self.request.fieldset = Fieldset.from_request(self.request) if read else Fieldset()
+        return self.request.fieldset
+
+    def get_queryset(self):
+        return self.queryset_builder(self.fieldset)
+
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        context["fieldset"] = self.fieldset
+        return context
+
+
+# ---------------- VIEWSETS ----------------
+# `query_budget` declares the maximum number of SQL queries each action may
+# run, independent of page size. api.tests.QueryBudgetTests enforces it.
+# `cache_models` lists the models nested in the responses, whose changes
+# retire cached reads (api.response_cache).
+
+class MeetingViewSet(CachedResponseMixin, FieldsetMixin, FastListMixin, viewsets.ModelViewSet):
+    queryset = meeting_queryset()
+    queryset_builder = staticmethod(meeting_queryset)
     serializer_class = MeetingSerializer
+    fast_serializer_class = FastMeetingSerializer
+    pagination_class = MeetingPagination
     permission_classes = [ReadOnlyOrAuthenticated]
+    query_budget = {"list": 2, "retrieve": 2}
+    cache_models = (User,)
+
+    def get_serializer_class(self):
+        if self.action in ("create", "update", "partial_update"):
+            return MeetingCreateSerializer
+        return MeetingSerializer
+
+    def perform_create(self, serializer):
+        serializer.save(organizer=self.request.user)
+
+    def list(self, request, *args, **kwargs):
+        if "start" in request.query_params or "end" in request.query_params:
+            return self.cached(self.calendar, request, None, *args, **kwargs)
+        return super().list(request, *args, **kwargs)
+
+    def calendar(self, request, *args, **kwargs):
+        """
+        ?start=&end=: every meeting overlapping the window, recurring ones
+        once per occurrence (api.recurrence), in keyset pages by start.
+        """
+        errors = {}
+        start, end = window_params(request.query_params, errors)
+        if errors:
+            raise ValidationError(errors)
+        serializer = self.fast_serializer_class(context=self.get_serializer_context())
+        paginator = OccurrencePagination()
+        page = paginator.paginate_occurrences(serializer, self.filter_queryset(self.get_queryset()), start, end, request)
+        return paginator.get_paginated_response([occurrence for _, _, occurrence in page])
+
+    @action(detail=True, methods=["post"], url_path="exceptions", permission_classes=[permissions.IsAuthenticated])
+    def exceptions(self, request, pk=None):
+        """
+        POST {"original_start", "canceled"} or {"original_start", "start_time",
+        "end_time"}: cancel or move one occurrence of a recurring meeting;
+        organizer only. Replaces any earlier exception for that occurrence.
+        """
+        meeting = Meeting.objects.filter(pk=pk, organizer=request.user).first()
+        if meeting is None:
+            raise NotFound("Meeting not found.")
+        serializer = MeetingExceptionSerializer(data=request.data, context={"request": request, "meeting": meeting})
+        serializer.is_valid(raise_exception=True)
+        data = serializer.validated_data
+        with transaction.atomic():
+            if not data.get("canceled") and meeting.status != "canceled":
+                users = {meeting.organizer_id, *meeting.participants.values_list("pk", flat=True)}
+                availability.ensure_free(sorted(users), data["start_time"], data["end_time"], exclude=meeting.pk)
+            exception, created = MeetingException.objects.update_or_create(
+                meeting=meeting, original_start=data["original_start"],
+                defaults={"canceled": data.get("canceled", False),
+                          "start_time": data.get("start_time"), "end_time": data.get("end_time")},
+            )
+        return Response(MeetingExceptionSerializer(exception).data, status=201 if created else 200)
+
+    @action(detail=False, methods=["get"], url_path="free-busy", permission_classes=[permissions.IsAuthenticated])
+    def free_busy(self, request):
+        """
+        ?users=1,2,3&start=<ISO 8601>&end=<ISO 8601>[&duration=<minutes>]:
+        each user's merged busy intervals in the window, and the slots
+        (at least `duration` long) when all of them are free.
+        """
+        user_ids, start, end, duration = free_busy_params(request.query_params)
+        busy = availability.busy(user_ids, start, end)
+        return Response({
+            "start": start,
+            "end": end,
+            "busy": {str(user_id): intervals for user_id, intervals in busy.items()},
+            "free": availability.free(busy, start, end, duration),
+        })
 
 
-class VideoRoomViewSet(viewsets.ModelViewSet):
-    queryset = VideoRoom.objects.all()
+def free_busy_params(params):
+    errors = {}
+    try:
+        user_ids = sorted({int(name) for name in names(params, "users")})
+    except ValueError:
+        user_ids, errors["users"] = [], "A comma-separated list of user ids."
+    if not user_ids and "users" not in errors:
+        errors["users"] = "At least one user id is required."
+    elif len(user_ids) > settings.FREEBUSY_MAX_USERS:
+        errors["users"] = f"At most {settings.FREEBUSY_MAX_USERS} users per request."
+    start, end = window_params(params, errors)
+    duration = params.get("duration")
+    if duration is not None:
+        if not duration.isdigit():
+            errors["duration"] = "Minutes, as a whole number."
+        else:
+            duration = timedelta(minutes=int(duration))
+    if errors:
+        raise ValidationError(errors)
+    return user_ids, start, end, duration
+
+
+def window_params(params, errors):
+    """?start=&end=, at most FREEBUSY_MAX_DAYS apart; problems are added to `errors`."""
+    window = {}
+    for key in ("start", "end"):
+        value = parse_datetime(params.get(key, ""))
+        if value is None:
+            errors[key] = "An ISO 8601 date-time is required."
+        else:
+            window[key] = value if timezone.is_aware(value) else timezone.make_aware(value)
+    if len(window) == 2 and not timedelta(0) < window["end"] - window["start"] <= timedelta(days=settings.FREEBUSY_MAX_DAYS):
+        errors["end"] = f"Must be after start, and at most {settings.FREEBUSY_MAX_DAYS} days later."
+    return window.get("start"), window.get("end")
+
+
+class VideoRoomViewSet(CachedResponseMixin, FieldsetMixin, viewsets.ModelViewSet):
+    queryset = video_room_queryset()
+    queryset_builder = staticmethod(video_room_queryset)
     serializer_class = VideoRoomSerializer
+    pagination_class = VideoRoomPagination
     permission_classes = [ReadOnlyOrAuthenticated]
+    query_budget = {"list": 2, "retrieve": 2}
+    cache_models = (Meeting, User)
 
 
-class DocumentViewSet(viewsets.ModelViewSet):
-    queryset = Document.objects.all()
+class DocumentViewSet(CachedResponseMixin, FieldsetMixin, FastListMixin, viewsets.ModelViewSet):
+    queryset = document_queryset()
+    queryset_builder = staticmethod(document_queryset)
     serializer_class = DocumentSerializer
+    fast_serializer_class = FastDocumentSerializer
+    pagination_class = DocumentPagination
     permission_classes = [ReadOnlyOrAuthenticated]
+    query_budget = {"list": 1, "retrieve": 1}
+    cache_models = (User,)
 
 
-class TransactionViewSet(viewsets.ModelViewSet):
-    queryset = Transaction.objects.all()
+class TransactionViewSet(CachedResponseMixin, FieldsetMixin, FastListMixin, viewsets.ModelViewSet):
+    queryset = transaction_queryset()
+    queryset_builder = staticmethod(transaction_queryset)
     serializer_class = TransactionSerializer
+    fast_serializer_class = FastTransactionSerializer
+    pagination_class = TransactionPagination
     permission_classes = [ReadOnlyOrAuthenticated]
+    query_budget = {"list": 1, "retrieve": 1}
+    cache_models = (User,)
+    # Postings are immutable: corrections are new transactions
+    http_method_names = ["get", "post", "head", "options"]
+
+    def get_serializer_class(self):
+        if self.action == "create":
+            return TransactionCreateSerializer
+        return TransactionSerializer
+
+    def create(self, request, *args, **kwargs):
+        """
+        Transfer from the requesting user through the ledger; the response
+        carries the sender's new balance. Deposits and withdrawals move money
+        in or out of the system, so only staff post them (`adjust`, `bulk`).
+        """
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        data = serializer.validated_data
+        if data["transaction_type"] != "transfer":
+            raise PermissionDenied("Deposits and withdrawals are posted by staff.")
+        try:
+            txn, balances = ledger.transfer(request.user, data["receiver"], data["amount"])
+        except ledger.LedgerError as exc:
+            return Response({"error": str(exc)}, status=400)
+        return self.posted(txn, balances[request.user.pk])
+
+    @action(detail=False, methods=["post"], url_path="adjust", permission_classes=[permissions.IsAdminUser])
+    def adjust(self, request):
+        """
+        Deposit into or withdraw from one user's wallet (staff only). Body:
+        {"transaction_type": "deposit" | "withdraw", "user", "amount"}; the
+        response carries that user's new balance.
+        """
+        serializer = WalletAdjustmentSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        data = serializer.validated_data
+        post = ledger.deposit if data["transaction_type"] == "deposit" else ledger.withdraw
+        try:
+            txn, balances = post(data["user"], data["amount"])
+        except ledger.LedgerError as exc:
+            return Response({"error": str(exc)}, status=400)
+        return self.posted(txn, balances[data["user"].pk])
+
+    def posted(self, txn, balance):
+        body = TransactionSerializer(txn, context=self.get_serializer_context()).data
+        body["balance"] = str(balance)
+        return Response(body, status=201)
+
+    @action(detail=False, methods=["post"], url_path="bulk", permission_classes=[permissions.IsAdminUser])
+    def bulk(self, request):
+        """
+        Settlement import (staff only). Body: a JSON array of
+        {"transaction_type", "sender", "receiver", "amount"} objects, or the
+        same objects as NDJSON (`Content-Type: application/x-ndjson`), which
+        is read line by line and never held in memory whole. Rows are posted
+        in batches of `?batch_size=` (default 1000); invalid rows are
+        reported by position without stopping the import.
+        """
+        try:
+            batch_size = min(max(int(request.query_params.get("batch_size", 1000)), 1), 10000)
+        except ValueError:
+            raise ValidationError({"batch_size": "A valid integer is required."})
+
+        if request.content_type.startswith("application/x-ndjson"):
+            rows = ingest.ndjson_rows(request._request)
+        else:
+            rows = request.data
+            if not isinstance(rows, list):
+                raise ValidationError({"detail": "Expected a JSON array of transactions."})
+        return Response(ingest.ingest(rows, batch_size=batch_size))
+
+
+class ExportView(APIView):
+    """
+    GET /api/exports/<dataset>/?output=csv|ndjson&since=&until= (staff only).
+    Streams every row of transactions, meetings or documents in id order,
+    optionally limited to [since, until) on the dataset's date column.
+    Rows are fetched and rendered a chunk at a time, so memory stays flat
+    however large the table.
+    """
+    permission_classes = [permissions.IsAdminUser]
+
+    def get(self, request, dataset):
+        if dataset not in exports.EXPORTS:
+            raise NotFound(f"Unknown export {dataset!r}; choose from {', '.join(exports.EXPORTS)}.")
+        # `format` is taken by DRF's format suffixes
+        output = request.query_params.get("output", "csv")
+        if output not in exports.OUTPUTS:
+            raise ValidationError({"output": f"Choose from {', '.join(exports.OUTPUTS)}."})
+        stream = exports.export_stream(
+            dataset, output, since=datetime_param(request, "since"), until=datetime_param(request, "until"),
+        )
+        if isinstance(request._request, ASGIRequest):
+            stream = exports.aiter_sync(stream)
+        response = StreamingHttpResponse(stream, content_type=exports.OUTPUTS[output])
+        response["Content-Disposition"] = f'attachment; filename="{dataset}.{output}"'
+        return response
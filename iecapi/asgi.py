@@ -1,13 +1,18 @@
 import os
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "iecapi.settings")
+
 from django.core.asgi import get_asgi_application
+
+# Set up Django (apps, models) before anything below imports a model
+django_asgi_app = get_asgi_application()
+
 from channels.routing import ProtocolTypeRouter, URLRouter
 from channels.auth import AuthMiddlewareStack
 import api.routing
 
-os.environ.setdefault("DJANGO_SETTINGS_MODULE", "iecapi.settings")
-
 application = ProtocolTypeRouter({
-    "http": get_asgi_application(),
+    "http": django_asgi_app,
     "websocket": AuthMiddlewareStack(
         URLRouter(
             api.routing.websocket_urlpatterns
@@ -1,6 +1,7 @@
 from pathlib import Path
 from datetime import timedelta
 import os
+import tempfile
 from dotenv import load_dotenv
 
 # Load environment variables from .env
@@ -35,13 +36,31 @@ INSTALLED_APPS = [
     'payments',
 ]
 
-ASGI_APPLICATION = "api.asgi.application"
+ASGI_APPLICATION = "iecapi.asgi.application"
 
-CHANNEL_LAYERS = {
-    "default": {
-        "BACKEND": "channels.layers.InMemoryChannelLayer",
-    },
-}
+# 📡 Channel layer
+# Set CHANNEL_BROKER_HOSTS (e.g. "broker-1:6390,broker-2:6390") to share
+# signaling across daphne processes/hosts; run `python manage.py runbroker`
+# on each broker host. Without it, a single-process in-memory layer is used.
+CHANNEL_BROKER_HOSTS = [h for h in os.getenv("CHANNEL_BROKER_HOSTS", "").split(",") if h]
+
+if CHANNEL_BROKER_HOSTS:
+    CHANNEL_LAYERS = {
+        "default": {
+            "BACKEND": "api.broker.BrokerChannelLayer",
+            "CONFIG": {
+                "hosts": CHANNEL_BROKER_HOSTS,
+                "capacity": int(os.getenv("CHANNEL_CAPACITY", "100")),
+                "expiry": int(os.getenv("CHANNEL_EXPIRY", "60")),
+            },
+        },
+    }
+else:
+    CHANNEL_LAYERS = {
+        "default": {
+            "BACKEND": "channels.layers.InMemoryChannelLayer",
+        },
+    }
 
 # 🌍 Middleware
 MIDDLEWARE = [
@@ -78,7 +97,19 @@ WSGI_APPLICATION = 'iecapi.wsgi.application'
 DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
+        # Point DATABASE_NAME at a scratch file for seeded benchmark runs
+        'NAME': os.getenv("DATABASE_NAME", BASE_DIR / 'db.sqlite3'),
+        'OPTIONS': {
+            # SQLite has no SELECT ... FOR UPDATE: take the write lock when an
+            # atomic block starts so api.ledger postings serialize instead of
+            # failing on lock upgrade, and wait for it rather than erroring.
+            'transaction_mode': 'IMMEDIATE',
+            'timeout': 20,
+        },
+        # File-backed test database: the in-memory one uses shared-cache
+        # locking, which fails concurrent writers at once ("table is locked")
+        # instead of honouring the timeout, so threaded tests could not run.
+        'TEST': {'NAME': os.path.join(tempfile.gettempdir(), 'iecapi_test.sqlite3')},
     }
 }
 
@@ -103,16 +134,48 @@ STATIC_ROOT = BASE_DIR / "staticfiles"
 MEDIA_URL = '/media/'
 MEDIA_ROOT = BASE_DIR / "media"
 
+# 📤 Chunked uploads (api/uploads.py): parts in progress live outside MEDIA_ROOT
+UPLOAD_TEMP_DIR = os.getenv("UPLOAD_TEMP_DIR", BASE_DIR / "uploads")
+UPLOAD_CHUNK_SIZE = 1024 * 1024                                               # bytes read/written at a time
+UPLOAD_MAX_SIZE = int(os.getenv("UPLOAD_MAX_SIZE", str(2 * 1024 ** 3)))      # per file
+UPLOAD_EXPIRY = int(os.getenv("UPLOAD_EXPIRY", "86400"))                     # seconds, see purge_uploads
+
+# 📥 Document downloads (api/downloads.py): "" streams from Django (sendfile under gunicorn);
+# "x-accel-redirect" hands the file to nginx at an `internal` location aliased to MEDIA_ROOT;
+# "x-sendfile" hands Apache/lighttpd the file's path
+DOCUMENT_SENDFILE = os.getenv("DOCUMENT_SENDFILE", "")
+DOCUMENT_ACCEL_REDIRECT_PREFIX = os.getenv("DOCUMENT_ACCEL_REDIRECT_PREFIX", "/protected-media/")
+
+# 🗂️ Version history (api/versions.py): older versions are stored as deltas from the next one
+DOCUMENT_SNAPSHOT_INTERVAL = 8                   # every 8th version stays a full file
+DOCUMENT_DELTA_MAX_SIZE = 64 * 1024 * 1024       # larger files are never delta-encoded (both held in memory)
+DOCUMENT_DIFF_MAX_SIZE = 1024 * 1024             # larger versions are diffed only against a neighbour (413)
+DOCUMENT_VERSION_CACHE_BYTES = 64 * 1024 * 1024  # rebuilt versions kept per process
+
+# 📅 Free/busy (api/availability.py): bounds on one /api/meetings/free-busy/ request
+FREEBUSY_MAX_USERS = 1000
+FREEBUSY_MAX_DAYS = 366
+# Recurring meetings (api/recurrence.py): series without end are checked for conflicts and exported this far ahead
+RECURRENCE_HORIZON_DAYS = 366
+
+# 🔎 User discovery search (api/search.py): None picks FTS5 on SQLite, tsvector on PostgreSQL
+SEARCH_BACKEND = os.getenv("SEARCH_BACKEND") or None
+SEARCH_MAX_LIMIT = 100
+
 # 🔧 DRF + JWT Settings
 REST_FRAMEWORK = {
     'DEFAULT_SCHEMA_CLASS': 'drf_spectacular.openapi.AutoSchema',
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        # simplejwt with a per-process user cache, see api/authentication.py
+        'api.authentication.CachedJWTAuthentication',
         'rest_framework.authentication.SessionAuthentication', # for browsable API login
     ),
     'DEFAULT_PERMISSION_CLASSES': (
         'rest_framework.permissions.AllowAny',
     ),
+    # Keyset pagination: constant cost per page, see api/pagination.py
+    'DEFAULT_PAGINATION_CLASS': 'api.pagination.KeysetPagination',
+    'PAGE_SIZE': 50,
 }
 
 SIMPLE_JWT = {
@@ -121,8 +184,58 @@ SIMPLE_JWT = {
     "ROTATE_REFRESH_TOKENS": True,
     "BLACKLIST_AFTER_ROTATION": True,
     "AUTH_HEADER_TYPES": ("Bearer",),
+    # Rotation revokes through api.revocation, not the token_blacklist app
+    "TOKEN_REFRESH_SERIALIZER": "api.serializers.RotatingTokenRefreshSerializer",
+}
+
+# 🚫 Refresh-token revocation (api/revocation.py): Bloom filter sizing, and
+# how often each process syncs the filter / prunes expired rows (seconds)
+REVOCATION_FILTER_CAPACITY = int(os.getenv("REVOCATION_FILTER_CAPACITY", "100000"))
+REVOCATION_FALSE_POSITIVE_RATE = 0.001
+REVOCATION_SYNC_INTERVAL = float(os.getenv("REVOCATION_SYNC_INTERVAL", "1"))
+REVOCATION_PRUNE_INTERVAL = float(os.getenv("REVOCATION_PRUNE_INTERVAL", "3600"))
+
+# 👤 CachedJWTAuthentication: users kept per process (0 disables), seconds each
+JWT_USER_CACHE_SIZE = int(os.getenv("JWT_USER_CACHE_SIZE", "10000"))
+JWT_USER_CACHE_TTL = float(os.getenv("JWT_USER_CACHE_TTL", "60"))
+
+# 🗄️ Caches. "responses" backs api/response_cache.py: local memory per
+# process, or a directory every worker shares when RESPONSE_CACHE_DIR is set.
+# Its generation counters must be seen by every worker, so
+# "response_generations" is always a directory (on one host; point it at
+# Redis or the database cache when workers run on several).
+RESPONSE_CACHE_DIR = os.getenv("RESPONSE_CACHE_DIR")
+RESPONSE_CACHE_TTL = int(os.getenv("RESPONSE_CACHE_TTL", "300"))
+RESPONSE_GENERATIONS_DIR = os.getenv("RESPONSE_GENERATIONS_DIR") or os.path.join(
+    RESPONSE_CACHE_DIR or tempfile.gettempdir(), "iecapi-response-generations"
+)
+
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+    },
+    "responses": {
+        "BACKEND": (
+            "django.core.cache.backends.filebased.FileBasedCache" if RESPONSE_CACHE_DIR
+            else "django.core.cache.backends.locmem.LocMemCache"
+        ),
+        "LOCATION": RESPONSE_CACHE_DIR or "responses",
+        "TIMEOUT": RESPONSE_CACHE_TTL,
+        "OPTIONS": {"MAX_ENTRIES": int(os.getenv("RESPONSE_CACHE_MAX_ENTRIES", "10000"))},
+    },
+    "response_generations": {
+        "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+        "LOCATION": RESPONSE_GENERATIONS_DIR,
+        "TIMEOUT": None,
+        "OPTIONS": {"MAX_ENTRIES": 100000},
+    },
 }
 
+# 🔑 Login hashing pool (api/credentials.py): threads, and checks admitted
+# at once before logins get 429. 0 = min(4, CPUs) threads, 8 per thread.
+LOGIN_HASH_WORKERS = int(os.getenv("LOGIN_HASH_WORKERS", "0"))
+LOGIN_HASH_QUEUE = int(os.getenv("LOGIN_HASH_QUEUE", "0"))
+
 # 🔐 Custom user
 AUTH_USER_MODEL = 'api.User'
 